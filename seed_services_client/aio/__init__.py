@@ -0,0 +1,18 @@
+"""Asyncio clients for the Seed Services."""
+
+from .identity_store import IdentityStoreApiClient
+from .stage_based_messaging import StageBasedMessagingApiClient
+from .control_interface import ControlInterfaceApiClient
+from .hub import HubApiClient
+from .message_sender import MessageSenderApiClient
+from .scheduler import SchedulerApiClient
+from .service_rating import ServiceRatingApiClient
+from .seed_services import HTTPServiceError, Transport
+from .coalescing import SingleFlight
+
+__all__ = [
+    'IdentityStoreApiClient', 'StageBasedMessagingApiClient',
+    'ControlInterfaceApiClient', 'HubApiClient', 'MessageSenderApiClient',
+    'SchedulerApiClient', 'ServiceRatingApiClient', 'HTTPServiceError',
+    'Transport', 'SingleFlight'
+]
@@ -0,0 +1,61 @@
+import asyncio
+import copy
+
+
+class InFlight(object):
+    def __init__(self):
+        self.future = None
+        self.followers = 0
+
+
+class SingleFlight(object):
+    """
+    Asyncio equivalent of
+    :class:`seed_services_client.coalescing.SingleFlight`, for coroutines
+    running on the same event loop.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = {}
+
+    async def do(self, key, func):
+        """
+        Returns the result of ``await func()``, or of the call already in
+        flight for ``key``.
+        """
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced += 1
+            in_flight.followers += 1
+            # Shielded so that a cancelled follower doesn't cancel the call
+            _, result = await asyncio.shield(in_flight.future)
+            return copy.deepcopy(result)
+
+        self.calls += 1
+        in_flight = self._in_flight[key] = InFlight()
+        in_flight.future = asyncio.ensure_future(
+            self.call(key, in_flight, func))
+        result, _ = await asyncio.shield(in_flight.future)
+        return result
+
+    async def call(self, key, in_flight, func):
+        """
+        Makes the call, and returns its result along with a copy of it for
+        the followers, taken before any caller can change the result.
+        """
+        try:
+            result = await func()
+        finally:
+            del self._in_flight[key]
+        if in_flight.followers:
+            return result, copy.deepcopy(result)
+        return result, None
+
+    def stats(self):
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._in_flight),
+        }
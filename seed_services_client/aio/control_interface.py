@@ -0,0 +1,64 @@
+from .seed_services import SeedServicesApiClient
+from .utils import get_paginated_response
+
+
+class ControlInterfaceApiClient(SeedServicesApiClient):
+    """
+    Asyncio client for Control Interface Service.
+
+    :param str auth_token:
+
+        An access token.
+
+    :param str api_url:
+        The full URL of the API.
+
+    """
+
+    async def get_user_service_tokens(self, params=None, **kwargs):
+        return {"results": get_paginated_response(
+                self.session, '/userservicetoken/', params=params, **kwargs)}
+
+    async def generate_user_service_tokens(self, user):
+        return await self.session.post('/userservicetoken/generate/',
+                                       data=user)
+
+    async def get_service(self, service):
+        # return None on 404 becuase that means a service not found
+        result = await self.session.get('/service/%s/' % service,
+                                        expected_response_codes=[404, 200])
+        if "detail" in result and result["detail"] == "Not found.":
+            return None
+        return result
+
+    async def get_services(self, params=None, **kwargs):
+        return {"results": get_paginated_response(
+                self.session, '/service/', params=params, **kwargs)}
+
+    async def get_service_status(self, service, **kwargs):
+        params = {"service": service, "ordering": "-created_at"}
+        return {"results": get_paginated_response(
+                self.session, '/status/', params=params, **kwargs)}
+
+    async def get_user_dashboards(self, user_id, **kwargs):
+        params = {
+            "user_id": user_id
+        }
+        return {"results": get_paginated_response(
+                self.session, '/userdashboard/', params=params, **kwargs)}
+
+    async def get_dashboard(self, dashboard):
+        return await self.session.get('/dashboard/%s/' % dashboard)
+
+    async def get_definition_page(self, definition):
+        return await self.session.get('/definition/%s/' % definition)
+
+    async def create_auditlog(self, auditlog):
+        return await self.session.post('/auditlog/', data=auditlog)
+
+    async def get_auditlogs(self, params=None, **kwargs):
+        """
+        Filter params can include 'identity_id', 'subscription_id'
+        """
+        return {"results": get_paginated_response(self.session, '/auditlog/',
+                params=params, **kwargs)}
@@ -0,0 +1,74 @@
+from .seed_services import SeedServicesApiClient
+from .utils import get_paginated_response
+
+
+class HubApiClient(SeedServicesApiClient):
+    """
+    Asyncio client for Hub Service (registration and changes).
+
+    :param str auth_token:
+
+        An access token.
+
+    :param str api_url:
+        The full URL of the API.
+
+    """
+
+    async def get_registrations(self, params=None, **kwargs):
+        """
+        Filter params can include
+        'stage', 'mother_id', 'validated', 'source', 'created_before'
+        'created_after' """
+        return {"results": get_paginated_response(self.session,
+                '/registrations/', params=params, **kwargs)}
+
+    async def get_registration(self, registration):
+        return await self.session.get('/registrations/%s/' % registration)
+
+    async def create_registration(self, registration):
+        return await self.session.post('/registration/', data=registration)
+
+    async def update_registration(self, registration, data=None):
+        return await self.session.patch('/registration/%s/' % registration,
+                                        data=data)
+
+    async def get_changes(self, params=None, **kwargs):
+        """
+        Filter params can include
+        'action', 'mother_id', 'validated', 'source', 'created_before'
+        'created_after' """
+        return {"results": get_paginated_response(self.session, '/changes/',
+                params=params, **kwargs)}
+
+    async def get_change(self, change):
+        return await self.session.get('/changes/%s/' % change)
+
+    async def create_change(self, change):
+        return await self.session.post('/change/', data=change)
+
+    async def trigger_report_generation(self, params=None):
+        """
+        Calls the Hub endpoint for generating reports """
+        return await self.session.post('/reports/', data=params)
+
+    async def create_optout_admin(self, optout):
+        """
+        Calls the hub endpoint for a optout from admin apps"""
+        return await self.session.post('/optout_admin/', data=optout)
+
+    async def create_change_admin(self, change):
+        """
+        Calls the hub endpoint for a change from admin apps"""
+        return await self.session.post('/change_admin/', data=change)
+
+    async def get_report_tasks(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session,
+                '/reporttasks/', params=params, **kwargs)}
+
+    async def get_user_details(self, params=None):
+        return await self.session.get('/user_details/', params=params)
+
+    async def get_states(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session, '/states/',
+                params=params, **kwargs)}
@@ -0,0 +1,74 @@
+from .seed_services import SeedServicesApiClient
+from .utils import get_paginated_response
+
+
+class IdentityStoreApiClient(SeedServicesApiClient):
+    """
+    Asyncio client for Identity Store Service.
+
+    :param str auth_token:
+        An access token.
+
+    :param str api_url:
+        The full URL of the API.
+
+    :param JSONServiceClient session:
+        An instance of JSONServiceClient to use
+
+    """
+
+    async def get_identities(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session, '/identities/',
+                params=params, **kwargs)}
+
+    async def search_identities(self, field, value, **kwargs):
+        # this is used for searching 'details' field to avoid DRF lacks
+        # use "details__preferred_language" for example field
+        params = {field: value}
+        return {"results": get_paginated_response(self.session,
+                '/identities/search/', params=params, **kwargs)}
+
+    async def get_identity(self, identity):
+        # return None on 404 becuase that means an identity not found
+        result = await self.session.get('/identities/%s/' % identity,
+                                        expected_response_codes=[404, 200])
+        if "detail" in result and result["detail"] == "Not found.":
+            return None
+        return result
+
+    async def get_identity_by_address(self, address_type, address_value,
+                                      **kwargs):
+        params = {"details__addresses__%s" % address_type: address_value}
+        return {"results": get_paginated_response(self.session,
+                '/identities/search/', params=params, **kwargs)}
+
+    async def get_identity_address(self, identity_id, address_type='msisdn',
+                                   params=None):
+        if params is None:
+            params = {'default': True}
+
+        response = await self.session.get(
+            '/identities/{0}/addresses/{1}'.format(identity_id, address_type),
+            params=params)
+
+        if len(response["results"]) > 0:
+            return response["results"][0]["address"]
+        else:
+            return None
+
+    async def update_identity(self, identity, data=None):
+        return await self.session.patch('/identities/%s/' % identity,
+                                        data=data)
+
+    async def create_identity(self, identity):
+        return await self.session.post('/identities/', data=identity)
+
+    async def get_optouts(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session,
+                '/optouts/search/', params=params, **kwargs)}
+
+    async def create_optout(self, optout):
+        return await self.session.post('/optout/', data=optout)
+
+    async def create_optin(self, optin):
+        return await self.session.post('/optin/', data=optin)
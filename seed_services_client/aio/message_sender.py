@@ -0,0 +1,39 @@
+from .seed_services import SeedServicesApiClient
+from .utils import get_paginated_response
+
+
+class MessageSenderApiClient(SeedServicesApiClient):
+    """
+    Asyncio client for Message Sender Service.
+
+    :param str auth_token:
+        An access token.
+
+    :param str api_url:
+        The full URL of the API.
+
+    :param JSONServiceClient session:
+        An instance of JSONServiceClient to use
+
+    """
+
+    async def create_outbound(self, payload):
+        return await self.session.post('/outbound/', data=payload)
+
+    async def get_outbounds(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session, '/outbound/',
+                params=params, **kwargs)}
+
+    async def create_inbound(self, payload):
+        return await self.session.post('/inbound/', data=payload)
+
+    async def get_inbounds(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session, '/inbound/',
+                params=params, **kwargs)}
+
+    async def get_failed_tasks(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session,
+                '/failed-tasks/', params=params, **kwargs)}
+
+    async def requeue_failed_tasks(self):
+        return await self.session.post('/failed-tasks/')
@@ -0,0 +1,32 @@
+from .seed_services import SeedServicesApiClient
+from .utils import get_paginated_response
+
+
+class SchedulerApiClient(SeedServicesApiClient):
+    """
+    Asyncio client for Scheduler Service.
+    """
+
+    async def get_schedules(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session, '/schedule/',
+                params=params, **kwargs)}
+
+    async def get_schedule(self, schedule_id):
+        return await self.session.get('/schedule/%s/' % schedule_id)
+
+    async def create_schedule(self, schedule):
+        return await self.session.post('/schedule/', data=schedule)
+
+    async def update_schedule(self, schedule_id, schedule):
+        return await self.session.patch('/schedule/%s/' % schedule_id,
+                                        data=schedule)
+
+    async def delete_schedule(self, schedule_id):
+        return await self.session.delete('/schedule/%s/' % schedule_id)
+
+    async def get_failed_tasks(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session,
+                '/failed-tasks/', params=params, **kwargs)}
+
+    async def requeue_failed_tasks(self):
+        return await self.session.post('/failed-tasks/')
@@ -0,0 +1,378 @@
+import asyncio
+
+from demands import HTTPServiceError as BaseHTTPServiceError
+
+from ..__version__ import __version__ as client_version
+from ..coalescing import get_request_key
+from ..json_codec import get_codec
+from ..utils import get_endpoint_timeout, resolve_endpoint_timeouts
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+class Response(object):
+    """
+    The status, headers and body of an aiohttp response, kept once the
+    response is closed, with the attributes of a :class:`requests.Response`
+    that the clients and their callers use.
+    """
+
+    def __init__(self, url, status_code, headers, content, codec):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.codec = codec
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', 'replace')
+
+    def json(self):
+        return self.codec.loads(self.content)
+
+
+class HTTPServiceError(BaseHTTPServiceError):
+    """
+    Raised when an unexpected response is received. Subclasses
+    :class:`demands.HTTPServiceError`, with a :class:`Response` as its
+    ``response``, so that errors from the blocking and the asyncio clients
+    can be handled in the same way.
+    """
+
+    @property
+    def url(self):
+        return self.response.url
+
+    @property
+    def status_code(self):
+        return self.response.status_code
+
+
+class Transport(object):
+    """
+    A pooled HTTP transport that is shared between asyncio clients.
+
+    :param int limit:
+        (optional) The maximum number of simultaneous connections, defaults
+        to 100.
+
+    :param int limit_per_host:
+        (optional) The maximum number of simultaneous connections to a single
+        host, defaults to 0 for no limit.
+
+    """
+
+    def __init__(self, limit=100, limit_per_host=0):
+        if aiohttp is None:
+            raise ImportError(
+                'aiohttp is required for the asyncio clients, install '
+                'seed-services-client[aio]')
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._session = None
+        self._loop = None
+
+    @property
+    def session(self):
+        """
+        The :class:`aiohttp.ClientSession` for the running event loop.
+        """
+        loop = asyncio.get_event_loop()
+        if self._session is None or self._loop is not loop:
+            self._session = None
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+_default_transport = None
+
+
+def get_default_transport():
+    """
+    Returns the transport shared by all clients that aren't given one.
+    """
+    global _default_transport
+    if _default_transport is None:
+        _default_transport = Transport()
+    return _default_transport
+
+
+def encode_params(params):
+    """
+    Converts query parameters to the strings that requests would send for
+    them, since aiohttp only accepts strings and numbers. Lists and tuples
+    are sent as repeated parameters, and None values are left out.
+    """
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        params = params.items()
+    encoded = []
+    for key, values in params:
+        if not isinstance(values, (list, tuple)):
+            values = [values]
+        for value in values:
+            if value is None:
+                continue
+            if isinstance(value, bytes):
+                value = value.decode('utf-8')
+            elif not isinstance(value, str):
+                value = str(value)
+            encoded.append((key, value))
+    return encoded
+
+
+def client_timeout(timeout):
+    """
+    Converts a number of seconds, or a ``(connect, read)`` tuple of seconds,
+    to a :class:`aiohttp.ClientTimeout`.
+    """
+    if isinstance(timeout, (tuple, list)):
+        connect, read = timeout
+        return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+    return aiohttp.ClientTimeout(total=timeout)
+
+
+class JSONServiceClient(object):
+    """
+    Asyncio equivalent of :class:`demands.JSONServiceClient`, that sends its
+    requests over a shared :class:`Transport`.
+
+    :param str url:
+        The full URL of the API.
+
+    :param dict headers:
+        (optional) Headers to send with each request.
+
+    :param Transport transport:
+        (optional) The transport to use, defaults to the shared transport.
+
+    :param timeout:
+        (optional) The number of seconds for a request to timeout, or a
+        ``(connect, read)`` tuple of seconds.
+
+    :param tuple endpoint_timeouts:
+        (optional) Timeouts for specific endpoints, as resolved by
+        :func:`seed_services_client.utils.resolve_endpoint_timeouts`.
+
+    :param RetryPolicy retry_policy:
+        (optional) The policy for retrying requests, defaults to not
+        retrying.
+
+    :param json_codec:
+        (optional) The codec to encode and decode JSON with, as accepted by
+        :func:`seed_services_client.json_codec.get_codec`.
+
+    :param SingleFlight single_flight:
+        (optional) Coalesces identical GETs that are made at the same time
+        into a single request.
+
+    :param RateLimiter rate_limiter:
+        (optional) Limits the rate of requests, waiting without blocking the
+        event loop until each request may be sent.
+
+    """
+
+    content_type = 'application/json;charset=utf-8'
+
+    def __init__(self, url, headers=None, transport=None, timeout=None,
+                 retry_policy=None, endpoint_timeouts=(), json_codec=None,
+                 single_flight=None, rate_limiter=None):
+        self.url = url
+        self.headers = dict(headers or {})
+        if transport is None:
+            transport = get_default_transport()
+        self.transport = transport
+        self.timeout = timeout
+        self.endpoint_timeouts = endpoint_timeouts
+        self.retry_policy = retry_policy
+        self.json_codec = None if json_codec is None else get_codec(json_codec)
+        self.single_flight = single_flight
+        self.rate_limiter = rate_limiter
+
+    def get_codec(self):
+        return self.json_codec or get_codec()
+
+    def build_url(self, path):
+        if path:
+            return '%s/%s' % (self.url.rstrip('/'), path.lstrip('/'))
+        return self.url
+
+    async def request(self, method, path, **kwargs):
+        if self.single_flight is None or method.upper() != 'GET':
+            return await self.send_request(method, path, **kwargs)
+        return await self.single_flight.do(
+            get_request_key(method, path, kwargs),
+            lambda: self.send_request(method, path, **kwargs))
+
+    async def send_request(self, method, path, params=None, data=None,
+                           files=None, expected_response_codes=(),
+                           timeout=None):
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve(method, path)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        headers = dict(self.headers)
+        if files is not None:
+            body = aiohttp.FormData()
+            for name, value in files.items():
+                if isinstance(value, (tuple, list)):
+                    body.add_field(name, value[1], filename=value[0])
+                else:
+                    body.add_field(name, value)
+        elif data is not None:
+            body = self.get_codec().dumps(data)
+            headers['Content-Type'] = self.content_type
+        else:
+            body = None
+
+        if timeout is None:
+            timeout = get_endpoint_timeout(
+                self.endpoint_timeouts, method, self.build_url(path),
+                default=self.timeout)
+        if timeout is not None:
+            timeout = client_timeout(timeout)
+        params = encode_params(params)
+
+        policy = self.retry_policy
+        retries = 0
+        while True:
+            can_retry = policy is not None and all([
+                retries < (policy.total or 0),
+                policy.is_method_retryable(method)])
+            try:
+                response = await self.send(
+                    method, path, params, body, headers, timeout)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not can_retry:
+                    raise
+                retries += 1
+                await asyncio.sleep(policy.get_retry_backoff_time(retries))
+                continue
+
+            status = response.status_code
+            retry_after = response.headers.get('Retry-After')
+            if can_retry and policy.is_retry(
+                    method, status, retry_after is not None):
+                retries += 1
+                delay = policy.get_retry_backoff_time(retries)
+                if retry_after is not None and \
+                        policy.respect_retry_after_header:
+                    delay = policy.parse_retry_after(retry_after)
+                await asyncio.sleep(delay)
+                continue
+
+            expected = status in expected_response_codes
+            if status >= 300 and not expected:
+                raise HTTPServiceError(response)
+            if not response.content:
+                return None
+            try:
+                return response.json()
+            except ValueError:
+                return response.content
+
+    async def send(self, method, path, params, body, headers, timeout):
+        """
+        Sends a single request, returning its :class:`Response`.
+        """
+        async with self.transport.session.request(
+                method, self.build_url(path), params=params, data=body,
+                headers=headers, timeout=timeout) as response:
+            content = await response.read()
+            return Response(str(response.url), response.status,
+                            response.headers, content, self.get_codec())
+
+    async def get(self, path, **kwargs):
+        return await self.request('GET', path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request('POST', path, **kwargs)
+
+    async def put(self, path, **kwargs):
+        return await self.request('PUT', path, **kwargs)
+
+    async def patch(self, path, **kwargs):
+        return await self.request('PATCH', path, **kwargs)
+
+    async def delete(self, path, **kwargs):
+        return await self.request('DELETE', path, **kwargs)
+
+
+class SeedServicesApiClient(object):
+    """
+    Base asyncio API client for seed services.
+
+    :param str auth_token:
+        An access token.
+
+    :param str api_url:
+        The full URL of the API.
+
+    :param JSONServiceClient session:
+        An instance of :class:`JSONServiceClient` to use
+
+    :param Transport transport:
+        (optional) The transport to send requests over, defaults to the
+        transport shared by all clients
+
+    :param timeout:
+        (optional) The number of seconds for a request to timeout, or a
+        ``(connect, read)`` tuple of seconds, defaults to 65 seconds
+
+    :param dict endpoint_timeouts:
+        (optional) Timeouts to use instead of ``timeout`` for some endpoints,
+        keyed by the path prefix of the endpoint, or by an ``(HTTP method,
+        path prefix)`` tuple.
+
+    :param RetryPolicy retry_policy:
+        (optional) The policy for retrying requests, defaults to not
+        retrying.
+
+    :param json_codec:
+        (optional) The codec to encode and decode JSON with, as accepted by
+        :func:`seed_services_client.json_codec.get_codec`.
+
+    :param SingleFlight single_flight:
+        (optional) Coalesces identical GETs that are made at the same time
+        into a single request, see
+        :class:`seed_services_client.aio.coalescing.SingleFlight`.
+
+    :param RateLimiter rate_limiter:
+        (optional) Limits the rate of requests to the service, see
+        :class:`seed_services_client.ratelimit.RateLimiter`. The same
+        instance can be shared with blocking clients.
+
+    """
+
+    def __init__(self, auth_token, api_url, session=None, transport=None,
+                 timeout=65, retry_policy=None, endpoint_timeouts=None,
+                 json_codec=None, single_flight=None, rate_limiter=None):
+        if session is None:
+            headers = {
+                'Authorization': 'Token ' + auth_token,
+                'User-Agent': 'seed-services-client v{0}'.format(
+                    client_version),
+            }
+            session = JSONServiceClient(
+                api_url, headers=headers, transport=transport,
+                timeout=timeout, retry_policy=retry_policy,
+                endpoint_timeouts=resolve_endpoint_timeouts(
+                    api_url, endpoint_timeouts or {}),
+                json_codec=json_codec, single_flight=single_flight,
+                rate_limiter=rate_limiter)
+        self.session = session
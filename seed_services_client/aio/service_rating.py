@@ -0,0 +1,45 @@
+from .seed_services import SeedServicesApiClient
+from .utils import get_paginated_response
+
+
+class ServiceRatingApiClient(SeedServicesApiClient):
+    """
+    Asyncio client for Service Rating Service.
+    """
+
+    # Invites
+    async def get_invites(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session,
+                '/invite/', params=params, **kwargs)}
+
+    async def get_invite(self, invite_id):
+        return await self.session.get('/invite/%s/' % invite_id)
+
+    async def create_invite(self, invite):
+        return await self.session.post('/invite/', data=invite)
+
+    async def update_invite(self, invite_id, data=None):
+        return await self.session.patch('/invite/%s/' % invite_id, data=data)
+
+    async def delete_invite(self, invite_id):
+        # Ratings should be deleted first for FK reasons
+        await self.session.delete('/invite/%s/' % invite_id)
+        return {"success": True}
+
+    # Ratings
+    async def get_ratings(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session,
+                '/rating/', params=params, **kwargs)}
+
+    async def get_rating(self, rating_id):
+        return await self.session.get('/rating/%s/' % rating_id)
+
+    async def create_rating(self, rating):
+        return await self.session.post('/rating/', data=rating)
+
+    async def update_rating(self, rating_id, data=None):
+        return await self.session.patch('/rating/%s/' % rating_id, data=data)
+
+    async def delete_rating(self, rating_id):
+        await self.session.delete('/rating/%s/' % rating_id)
+        return {"success": True}
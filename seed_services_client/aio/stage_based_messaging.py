@@ -0,0 +1,85 @@
+from .seed_services import SeedServicesApiClient
+from .utils import get_paginated_response
+
+
+class StageBasedMessagingApiClient(SeedServicesApiClient):
+    """
+    Asyncio client for Stage Based Messaging Service.
+
+    :param str auth_token:
+        An access token.
+
+    :param str api_url:
+        The full URL of the API.
+
+    :param JSONServiceClient session:
+        An instance of JSONServiceClient to use
+
+    """
+
+    async def get_schedules(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session, '/schedule/',
+                params=params, **kwargs)}
+
+    async def get_schedule(self, schedule_id):
+        return await self.session.get('/schedule/%s/' % schedule_id)
+
+    async def get_messagesets(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session, '/messageset/',
+                params=params, **kwargs)}
+
+    async def get_messageset(self, messageset_id):
+        return await self.session.get('/messageset/%s/' % messageset_id)
+
+    async def get_messageset_languages(self):
+        return await self.session.get('/messageset_languages/')
+
+    async def get_subscription(self, subscription):
+        return await self.session.get('/subscriptions/%s/' % subscription)
+
+    async def get_subscriptions(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session,
+                '/subscriptions/', params=params, **kwargs)}
+
+    async def get_messages(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session, '/message/',
+                params=params, **kwargs)}
+
+    async def get_message(self, message_id):
+        return await self.session.get('/message/%s/' % message_id)
+
+    async def delete_message(self, message_id):
+        return await self.session.delete('/message/%s/' % message_id)
+
+    async def update_message(self, message_id, data=None):
+        return await self.session.patch(
+            '/message/{0}/'.format(message_id),
+            data=data)
+
+    async def delete_binarycontent(self, binarycontent_id):
+        return await self.session.delete(
+            '/binarycontent/%s/' % binarycontent_id)
+
+    async def create_message(self, message):
+        return await self.session.post('/message/', data=message)
+
+    async def create_binarycontent(self, content):
+        return await self.session.post('/binarycontent/', files=content)
+
+    async def update_subscription(self, subscription, data=None):
+        return await self.session.patch('/subscriptions/%s/' % subscription,
+                                        data=data)
+
+    async def create_subscription(self, subscription):
+        return await self.session.post('/subscriptions/', data=subscription)
+
+    async def resend_subscription(self, subscription):
+        return await self.session.post(
+            '/subscriptions/%s/resend' % subscription)
+
+    async def get_failed_tasks(self, params=None, **kwargs):
+        return {"results": get_paginated_response(self.session,
+                '/failed-tasks/', params=params, **kwargs)}
+
+    async def requeue_failed_tasks(self):
+        return await self.session.post('/failed-tasks/')
@@ -0,0 +1,86 @@
+import asyncio
+
+from ..utils import get_page_urls
+
+
+async def get_pages(session, url, params=None, **kwargs):
+    """
+    Get each page of a response in turn. Returns an asynchronous iterator
+    that returns each of the decoded pages.
+    """
+    while url is not None:
+        # We remove part of the url that the session already has
+        url = url.replace(session.url, '')
+        data = await session.get(url, params=params, **kwargs)
+        yield data
+        url = data.get('next', None)
+        # params are included in the next url
+        params = None
+
+
+async def get_fanned_out_pages(session, url, params=None, concurrency=10,
+                               **kwargs):
+    """
+    Get each page of a response, fetching all the pages after the first
+    one concurrently. Returns an asynchronous iterator that returns each of
+    the decoded pages in order.
+
+    Falls back to following the ``next`` link of each page in turn if the
+    urls of the pages can't be built from the first page.
+    """
+    data = await session.get(url, params=params, **kwargs)
+    yield data
+
+    urls = get_page_urls(data)
+    if urls is None:
+        async for data in get_pages(session, data.get('next', None),
+                                    **kwargs):
+            yield data
+        return
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(page_url):
+        async with semaphore:
+            return await session.get(
+                page_url.replace(session.url, ''), **kwargs)
+
+    urls = iter(urls)
+    pending = []
+    try:
+        while True:
+            for page_url in urls:
+                pending.append(asyncio.ensure_future(fetch(page_url)))
+                if len(pending) >= concurrency * 2:
+                    break
+            if not pending:
+                return
+            yield await pending.pop(0)
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def get_paginated_response(session, url, params=None, concurrency=0,
+                                 **kwargs):
+    """
+    Get the results of all pages of a response. Returns an asynchronous
+    iterator that returns each of the items.
+
+    :param int concurrency:
+        (optional) The number of pages to fetch concurrently. If this is
+        greater than 0 and the first page has a total ``count``, the urls of
+        the remaining pages are built up front and fetched concurrently.
+        Defaults to 0, which follows the ``next`` link of each page in turn.
+    """
+    if concurrency > 0:
+        pages = get_fanned_out_pages(
+            session, url, params=params, concurrency=concurrency, **kwargs)
+    else:
+        pages = get_pages(session, url, params=params, **kwargs)
+    try:
+        async for data in pages:
+            for result in data.get('results', []):
+                yield result
+    finally:
+        await pages.aclose()
@@ -0,0 +1,479 @@
+import collections
+import threading
+import time
+
+from .coalescing import SingleFlight
+
+# Returned by LRUCache.get when there is no entry for a key, so that cached
+# None values can be told apart from missing entries
+MISSING = object()
+
+
+class LRUCache(object):
+    """
+    A thread safe cache with a bounded size, that evicts its least recently
+    used entries first and expires entries after a time to live.
+
+    Entries can be tagged when they are set, so that all the entries with a
+    tag can be invalidated at once.
+
+    :param int maxsize:
+        (optional) The maximum number of entries to keep, defaults to 10000.
+
+    :param float ttl:
+        (optional) The number of seconds to keep each entry for, defaults to
+        None for no expiry.
+
+    Cached values are shared between callers, and should be treated as read
+    only.
+    """
+
+    def __init__(self, maxsize=10000, ttl=None, clock=time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        """
+        Returns the value for ``key``, or ``default`` if there is no entry
+        for it or the entry has expired.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value, tag = entry
+            if expires_at is not None and expires_at <= self.clock():
+                self._untag(key, tag)
+                self.misses += 1
+                return default
+            # Move the entry to the most recently used end
+            self._entries[key] = entry
+            self.hits += 1
+            return value
+
+    def set(self, key, value, tag=None, ttl=None):
+        """
+        Sets the value for ``key``, tagged with ``tag``. ``ttl`` overrides the
+        time to live of the cache for this entry.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        expires_at = None if ttl is None else self.clock() + ttl
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._untag(key, old[2])
+            self._entries[key] = (expires_at, value, tag)
+            if tag is not None:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                old_key, old = self._entries.popitem(last=False)
+                self._untag(old_key, old[2])
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._untag(key, entry[2])
+
+    def invalidate_tag(self, tag):
+        """
+        Removes all of the entries tagged with ``tag``.
+        """
+        with self._lock:
+            for key in self._tags.pop(tag, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _untag(self, key, tag):
+        if tag is None:
+            return
+        keys = self._tags.get(tag)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+    def stats(self):
+        """
+        Returns the number of ``hits``, ``misses`` and ``evictions`` of the
+        cache, along with its current ``size``.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class AddressIndex(object):
+    """
+    A thread safe index of the ids of the identities that each address
+    belongs to, keyed by ``(address type, address)``.
+
+    Entries set from search results list every identity with the address.
+    Entries filled in from single identities only list the identities that
+    have been seen with the address, which is enough for addresses that
+    belong to a single identity. Addresses without any identities aren't
+    kept, so that they are searched for again.
+
+    :param int maxsize:
+        (optional) The maximum number of addresses to keep, evicting the
+        least recently used first. Defaults to None for no limit.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self._identity_ids = collections.OrderedDict()
+        self._addresses = {}
+        self._lock = threading.Lock()
+
+    def get(self, address_type, address):
+        """
+        Returns a tuple of the ids of the identities with the address, or
+        None if the address isn't in the index.
+        """
+        key = (address_type, address)
+        with self._lock:
+            identity_ids = self._identity_ids.pop(key, None)
+            if identity_ids is not None:
+                self._identity_ids[key] = identity_ids
+            return identity_ids
+
+    def set(self, address_type, address, identity_ids):
+        """
+        Sets the ids of all of the identities with the address. The address
+        is removed from the index if there aren't any.
+        """
+        key = (address_type, address)
+        identity_ids = tuple(identity_ids)
+        with self._lock:
+            self._remove_key(key)
+            if identity_ids:
+                self._add(key, identity_ids)
+
+    def add_identity(self, identity):
+        """
+        Adds the addresses in the details of ``identity`` to the index,
+        replacing the addresses that it was indexed under before.
+        """
+        details = identity.get('details') or {}
+        addresses = details.get('addresses') or {}
+        with self._lock:
+            self._discard_identity(identity['id'])
+            for address_type, values in addresses.items():
+                for address in values or {}:
+                    key = (address_type, address)
+                    identity_ids = self._identity_ids.pop(key, ())
+                    if identity['id'] not in identity_ids:
+                        identity_ids += (identity['id'],)
+                    self._add(key, identity_ids)
+
+    def remove_identity(self, identity_id):
+        """
+        Removes all of the addresses of an identity from the index.
+        """
+        with self._lock:
+            for key in list(self._addresses.get(identity_id, ())):
+                self._remove_key(key)
+
+    def remove(self, address_type, address):
+        with self._lock:
+            self._remove_key((address_type, address))
+
+    def clear(self):
+        with self._lock:
+            self._identity_ids.clear()
+            self._addresses.clear()
+
+    def _add(self, key, identity_ids):
+        self._identity_ids[key] = identity_ids
+        for identity_id in identity_ids:
+            self._addresses.setdefault(identity_id, set()).add(key)
+        while self.maxsize is not None and \
+                len(self._identity_ids) > self.maxsize:
+            self._remove_key(next(iter(self._identity_ids)))
+
+    def _discard_identity(self, identity_id):
+        # Takes the identity out of its entries, leaving the other
+        # identities with the same addresses
+        for key in self._addresses.pop(identity_id, ()):
+            identity_ids = tuple(
+                i for i in self._identity_ids.get(key, ()) if i != identity_id)
+            if identity_ids:
+                self._identity_ids[key] = identity_ids
+            else:
+                self._identity_ids.pop(key, None)
+
+    def _remove_key(self, key):
+        for identity_id in self._identity_ids.pop(key, ()):
+            keys = self._addresses.get(identity_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._addresses[identity_id]
+
+    def __len__(self):
+        return len(self._identity_ids)
+
+
+class CatalogCache(object):
+    """
+    A thread safe cache for reference data that rarely changes, which is
+    loaded when it is first asked for and kept for a time to live.
+
+    Once an entry is older than its time to live, but not yet older than
+    ``ttl + stale_ttl``, the stale value is returned straight away while a
+    background thread loads a fresh one.
+
+    :param float ttl:
+        (optional) The number of seconds that entries are fresh for,
+        defaults to 300.
+
+    :param float stale_ttl:
+        (optional) The number of seconds after that that stale entries are
+        returned for while they are refreshed, defaults to 3600. Set it to 0
+        to always load expired entries before returning them.
+
+    Cached values are shared between callers, and should be treated as read
+    only.
+    """
+
+    def __init__(self, ttl=300, stale_ttl=3600, clock=time.time):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """
+        Returns the value for ``key``, calling ``loader`` to load it if
+        there is no fresh or stale value for it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            loaded_at, value = entry
+            age = self.clock() - loaded_at
+            if age < self.ttl:
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.refresh_in_background(key, loader)
+                return value
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock(), value)
+
+    def refresh_in_background(self, key, loader):
+        """
+        Loads a fresh value for ``key`` on a background thread, unless one
+        is already being loaded. The stale value is kept if loading fails.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.set(key, loader())
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        thread = threading.Thread(target=refresh)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def invalidate(self, key=None):
+        """
+        Removes the entry for ``key``, or all of the entries if no key is
+        given, so that they are loaded again the next time they're asked for.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class MessageIndex(object):
+    """
+    A thread safe index of the messages of message sets, keyed by
+    ``(messageset, sequence_number, lang)``. All of the messages of a
+    message set are loaded into it at once.
+
+    :param float refresh_interval:
+        (optional) The number of seconds after which the messages of a
+        message set are refreshed, by fetching only the messages updated
+        since they were last loaded. Defaults to None, which never refreshes
+        them.
+
+    :param str watermark_param:
+        (optional) The messages filter for messages updated at or after a
+        time, defaults to ``updated_at__gte``.
+
+    Messages that are deleted by other clients aren't noticed by a refresh.
+    Invalidate their message set to load all of its messages again.
+    """
+
+    def __init__(self, refresh_interval=None,
+                 watermark_param='updated_at__gte', clock=time.time):
+        self.refresh_interval = refresh_interval
+        self.watermark_param = watermark_param
+        self.clock = clock
+        self._messages = {}
+        self._keys = {}
+        self._loaded = {}
+        self._lock = threading.Lock()
+        self._refreshes = SingleFlight()
+
+    @staticmethod
+    def get_key(message):
+        return (message['messageset'], message['sequence_number'],
+                message['lang'])
+
+    def get(self, messageset, sequence_number, lang):
+        """
+        Returns the message, or None if the message set has no such
+        message.
+        """
+        return self._messages.get((messageset, sequence_number, lang))
+
+    def is_loaded(self, messageset):
+        return messageset in self._loaded
+
+    def needs_refresh(self, messageset):
+        """
+        Returns whether the message set needs to be loaded, because it isn't
+        loaded or it was loaded more than ``refresh_interval`` ago.
+        """
+        with self._lock:
+            loaded = self._loaded.get(messageset)
+        if loaded is None:
+            return True
+        if self.refresh_interval is None:
+            return False
+        return self.clock() - loaded[0] >= self.refresh_interval
+
+    def get_refresh_params(self, messageset):
+        """
+        Returns the filters to fetch the messages of a message set that have
+        changed since it was loaded, or all of them if it isn't loaded.
+        """
+        params = {'messageset': messageset}
+        with self._lock:
+            _, watermark = self._loaded.get(messageset, (None, None))
+        if watermark is not None:
+            params[self.watermark_param] = watermark
+        return params
+
+    def refresh(self, messageset, fetch):
+        """
+        Loads the messages returned by ``fetch(params)``, called with the
+        filters from :meth:`get_refresh_params`. Concurrent refreshes of the
+        same message set are coalesced into one.
+        """
+        def load():
+            params = self.get_refresh_params(messageset)
+            self.load(messageset, fetch(params))
+
+        self._refreshes.do(messageset, load)
+
+    def load(self, messageset, messages):
+        """
+        Adds the messages of a message set, and marks it as loaded. The
+        messages are read before the index is locked, so lookups aren't held
+        up while they're fetched.
+        """
+        messages = list(messages)
+        loaded_at = self.clock()
+        with self._lock:
+            _, watermark = self._loaded.get(messageset, (None, None))
+            for message in messages:
+                self._add(message)
+                updated_at = message.get('updated_at')
+                # ISO 8601 timestamps in the same timezone sort as strings
+                if updated_at and updated_at > (watermark or ''):
+                    watermark = updated_at
+            self._loaded[messageset] = (loaded_at, watermark)
+
+    def add(self, message):
+        """
+        Adds or updates a message, if its message set is loaded. Any entry
+        for the message under its old key is removed either way, in case it
+        was moved out of a loaded message set.
+        """
+        if not message:
+            return
+        with self._lock:
+            self._remove(message['id'])
+            if message.get('messageset') in self._loaded:
+                self._add(message)
+
+    def _add(self, message):
+        self._remove(message['id'])
+        key = self.get_key(message)
+        self._messages[key] = message
+        self._keys[message['id']] = key
+
+    def remove(self, message_id):
+        with self._lock:
+            self._remove(message_id)
+
+    def _remove(self, message_id):
+        key = self._keys.pop(message_id, None)
+        if key is not None:
+            self._messages.pop(key, None)
+
+    def invalidate(self, messageset=None):
+        """
+        Removes the messages of a message set, or of all of them if no
+        message set is given, so that they are loaded again when they're
+        next needed.
+        """
+        with self._lock:
+            if messageset is None:
+                self._messages.clear()
+                self._keys.clear()
+                self._loaded.clear()
+                return
+            self._loaded.pop(messageset, None)
+            for message_id, key in list(self._keys.items()):
+                if key[0] == messageset:
+                    del self._keys[message_id]
+                    del self._messages[key]
+
+    def __len__(self):
+        return len(self._messages)
@@ -0,0 +1,94 @@
+import copy
+import threading
+
+
+class InFlight(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight(object):
+    """
+    Coalesces identical calls that are made at the same time, so that only
+    the first one is made and the others wait for and share its result.
+
+    The first caller gets the result itself, and each of the other callers
+    gets its own deep copy of a copy taken before the result was returned
+    to the first caller, so that none of them can change the result that
+    another sees. An exception raised by the call is raised to all of them.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """
+        Returns the result of ``func()``, or of the call already in flight
+        for ``key``.
+        """
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                in_flight = self._in_flight[key] = InFlight()
+                self.calls += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                in_flight.followers += 1
+                leader = False
+
+        if not leader:
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return copy.deepcopy(in_flight.result)
+
+        result = None
+        try:
+            result = func()
+            return result
+        except Exception as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                followers = in_flight.followers
+            if followers and in_flight.error is None:
+                # Copied before the first caller gets the result, so that it
+                # can't change it before the followers copy it
+                in_flight.result = copy.deepcopy(result)
+            in_flight.done.set()
+
+    def stats(self):
+        """
+        Returns the number of ``calls`` that were made, and the number of
+        calls that were ``coalesced`` into them.
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._in_flight),
+            }
+
+
+def get_request_key(method, path, kwargs):
+    """
+    Returns a key for a request, that is the same for requests that would
+    get the same response.
+    """
+    params = kwargs.get('params') or {}
+    return (
+        method.upper(),
+        path,
+        tuple(sorted((k, str(v)) for k, v in params.items())),
+        tuple(sorted((k, repr(v)) for k, v in kwargs.items()
+                     if k != 'params')),
+    )
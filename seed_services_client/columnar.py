@@ -0,0 +1,178 @@
+import array
+
+from .utils import get_field
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+try:
+    import pandas
+except ImportError:  # pragma: no cover
+    pandas = None
+
+try:
+    array.array('q')
+    INT_TYPECODE = 'q'
+except ValueError:  # pragma: no cover
+    # Python 2 doesn't have long long arrays
+    INT_TYPECODE = 'l'
+
+# The array typecode and null value for each column type. Other column types
+# are kept in lists.
+TYPECODES = {
+    'int': (INT_TYPECODE, 0),
+    'float': ('d', float('nan')),
+    'bool': ('B', 0),
+}
+
+NUMPY_DTYPES = {
+    'int': 'i8',
+    'float': 'f8',
+    'bool': 'u1',
+}
+
+
+class ColumnCollector(object):
+    """
+    Collects fields of the items of a paginated response into a column per
+    field, without keeping the items themselves.
+
+    :param list fields:
+        The fields to collect.
+
+    :param dict types:
+        (optional) The type of each field, one of ``'int'``, ``'float'`` or
+        ``'bool'`` for fields kept in typed arrays, or ``'str'`` or
+        ``'object'`` for fields kept in lists. Fields default to
+        ``'object'``.
+
+    Items can be dictionaries, or records like
+    :class:`seed_services_client.models.Model` or the namedtuples returned
+    when asking for ``fields``.
+
+    The typed columns are exported without copying them, so no more items
+    can be added once they have been exported.
+    """
+
+    def __init__(self, fields, types=None):
+        self.fields = tuple(fields)
+        self.types = dict((field, 'object') for field in self.fields)
+        self.types.update(types or {})
+        self.columns = {}
+        self.valid = {}
+        self.nulls = dict((field, 0) for field in self.fields)
+        for field in self.fields:
+            if self.types[field] in TYPECODES:
+                typecode, _ = TYPECODES[self.types[field]]
+                self.columns[field] = array.array(typecode)
+                self.valid[field] = bytearray()
+            else:
+                self.columns[field] = []
+        self.length = 0
+
+    def append(self, item):
+        for field in self.fields:
+            value = get_field(item, field)
+            column = self.columns[field]
+            if field in self.valid:
+                if value is None:
+                    column.append(TYPECODES[self.types[field]][1])
+                    self.valid[field].append(0)
+                    self.nulls[field] += 1
+                else:
+                    column.append(value)
+                    self.valid[field].append(1)
+            else:
+                column.append(value)
+        self.length += 1
+
+    def extend(self, results):
+        for item in results:
+            self.append(item)
+        return self
+
+    def __len__(self):
+        return self.length
+
+    def get_typed_values(self, field):
+        """
+        Returns the values of a typed column as a NumPy array, and a mask of
+        its missing values, or None if it has none.
+        """
+        values = numpy.frombuffer(
+            self.columns[field], dtype=NUMPY_DTYPES[self.types[field]])
+        if self.types[field] == 'bool':
+            values = values.view(numpy.bool_)
+        mask = None
+        if self.nulls[field]:
+            mask = numpy.frombuffer(self.valid[field], dtype='u1') == 0
+        return values, mask
+
+    def to_numpy(self):
+        """
+        Returns a dictionary of a NumPy array for each field. Typed columns
+        with missing values are returned as masked arrays.
+        """
+        if numpy is None:
+            raise ImportError('numpy is required to export to NumPy')
+        arrays = {}
+        for field in self.fields:
+            column = self.columns[field]
+            if field in self.valid:
+                values, mask = self.get_typed_values(field)
+                if mask is not None:
+                    values = numpy.ma.masked_array(values, mask=mask)
+            else:
+                values = numpy.empty(len(column), dtype=object)
+                values[:] = column
+            arrays[field] = values
+        return arrays
+
+    def to_arrow(self):
+        """
+        Returns a :class:`pyarrow.Table` with a column for each field.
+        """
+        if pyarrow is None:
+            raise ImportError('pyarrow is required to export to Arrow')
+        arrays = []
+        for field in self.fields:
+            column = self.columns[field]
+            if field in self.valid:
+                values, mask = self.get_typed_values(field)
+                arrays.append(pyarrow.array(values, mask=mask))
+            elif self.types[field] == 'str':
+                arrays.append(pyarrow.array(column, type=pyarrow.string()))
+            else:
+                arrays.append(pyarrow.array(column))
+        return pyarrow.Table.from_arrays(arrays, names=list(self.fields))
+
+    def to_pandas(self):
+        """
+        Returns a :class:`pandas.DataFrame` with a column for each field,
+        built through Arrow if it is installed.
+        """
+        if pandas is None:
+            raise ImportError('pandas is required to export to pandas')
+        if pyarrow is not None:
+            return self.to_arrow().to_pandas()
+        return pandas.DataFrame(self.to_numpy(), columns=list(self.fields))
+
+
+def collect_columns(results, fields, types=None):
+    """
+    Collects ``fields`` from each of ``results`` into a
+    :class:`ColumnCollector`, for example::
+
+        outbounds = client.get_outbounds()['results']
+        df = collect_columns(
+            outbounds, ['to_addr', 'delivered', 'attempts'],
+            types={'delivered': 'bool', 'attempts': 'int'}).to_pandas()
+    """
+    return ColumnCollector(fields, types=types).extend(results)
@@ -0,0 +1,7 @@
+import sys
+
+collect_ignore = []
+
+if sys.version_info < (3, 6):
+    # The asyncio clients use syntax that isn't available on older versions
+    collect_ignore.extend(['aio', 'tests/aio'])
@@ -1,8 +1,8 @@
-from demands import JSONServiceClient
+from .seed_services import SeedServicesApiClient
 from .utils import get_paginated_response
 
 
-class ControlInterfaceApiClient(object):
+class ControlInterfaceApiClient(SeedServicesApiClient):
     """
     Client for Control Interface Service.
 
@@ -13,18 +13,14 @@ class ControlInterfaceApiClient(object):
     :param str api_url:
         The full URL of the API.
 
-    """
+    :param JSONServiceClient session:
+        An instance of JSONServiceClient to use
 
-    def __init__(self, auth_token, api_url, session=None):
-        headers = {'Authorization': 'Token ' + auth_token}
-        if session is None:
-            session = JSONServiceClient(url=api_url,
-                                        headers=headers)
-        self.session = session
+    """
 
-    def get_user_service_tokens(self, params=None):
+    def get_user_service_tokens(self, params=None, **kwargs):
         return {"results": get_paginated_response(
-                self.session, '/userservicetoken/', params=params)}
+                self.session, '/userservicetoken/', params=params, **kwargs)}
 
     def generate_user_service_tokens(self, user):
         return self.session.post('/userservicetoken/generate/', data=user)
@@ -37,34 +33,36 @@ class ControlInterfaceApiClient(object):
             return None
         return result
 
-    def get_services(self, params=None):
+    def get_services(self, params=None, **kwargs):
         return {"results": get_paginated_response(
-                self.session, '/service/', params=params)}
+                self.session, '/service/', params=params, **kwargs)}
 
-    def get_service_status(self, service):
+    def get_service_status(self, service, **kwargs):
         params = {"service": service, "ordering": "-created_at"}
         return {"results": get_paginated_response(
-                self.session, '/status/', params=params)}
+                self.session, '/status/', params=params, **kwargs)}
 
-    def get_user_dashboards(self, user_id):
+    def get_user_dashboards(self, user_id, **kwargs):
         params = {
             "user_id": user_id
         }
         return {"results": get_paginated_response(
-                self.session, '/userdashboard/', params=params)}
+                self.session, '/userdashboard/', params=params, **kwargs)}
 
     def get_dashboard(self, dashboard):
-        return self.session.get('/dashboard/%s/' % dashboard)
+        return self.session.get('/dashboard/%s/' % dashboard,
+                                conditional=True)
 
     def get_definition_page(self, definition):
-        return self.session.get('/definition/%s/' % definition)
+        return self.session.get('/definition/%s/' % definition,
+                                conditional=True)
 
     def create_auditlog(self, auditlog):
         return self.session.post('/auditlog/', data=auditlog)
 
-    def get_auditlogs(self, params=None):
+    def get_auditlogs(self, params=None, **kwargs):
         """
         Filter params can include 'identity_id', 'subscription_id'
         """
         return {"results": get_paginated_response(self.session, '/auditlog/',
-                params=params)}
+                params=params, **kwargs)}
@@ -1,8 +1,9 @@
-from demands import JSONServiceClient
+from .models import Change, Registration
+from .seed_services import SeedServicesApiClient
 from .utils import get_paginated_response
 
 
-class HubApiClient(object):
+class HubApiClient(SeedServicesApiClient):
     """
     Client for Hub Service (registration and changes).
 
@@ -13,25 +14,23 @@ class HubApiClient(object):
     :param str api_url:
         The full URL of the API.
 
-    """
+    :param JSONServiceClient session:
+        An instance of JSONServiceClient to use
 
-    def __init__(self, auth_token, api_url, session=None):
-        headers = {'Authorization': 'Token ' + auth_token}
-        if session is None:
-            session = JSONServiceClient(url=api_url,
-                                        headers=headers)
-        self.session = session
+    """
 
-    def get_registrations(self, params=None):
+    def get_registrations(self, params=None, model=False, **kwargs):
         """
         Filter params can include
         'stage', 'mother_id', 'validated', 'source', 'created_before'
         'created_after' """
+        model = Registration if model else None
         return {"results": get_paginated_response(self.session,
-                '/registrations/', params=params)}
+                '/registrations/', params=params, model=model, **kwargs)}
 
-    def get_registration(self, registration):
-        return self.session.get('/registrations/%s/' % registration)
+    def get_registration(self, registration, model=False):
+        result = self.session.get('/registrations/%s/' % registration)
+        return Registration.from_dict(result) if model else result
 
     def create_registration(self, registration):
         return self.session.post('/registration/', data=registration)
@@ -40,16 +39,17 @@ class HubApiClient(object):
         return self.session.patch('/registration/%s/' % registration,
                                   data=data)
 
-    def get_changes(self, params=None):
+    def get_changes(self, params=None, model=False, **kwargs):
         """
         Filter params can include
         'action', 'mother_id', 'validated', 'source', 'created_before'
         'created_after' """
         return {"results": get_paginated_response(self.session, '/changes/',
-                params=params)}
+                params=params, model=Change if model else None, **kwargs)}
 
-    def get_change(self, change):
-        return self.session.get('/changes/%s/' % change)
+    def get_change(self, change, model=False):
+        result = self.session.get('/changes/%s/' % change)
+        return Change.from_dict(result) if model else result
 
     def create_change(self, change):
         return self.session.post('/change/', data=change)
@@ -69,13 +69,13 @@ class HubApiClient(object):
         Calls the hub endpoint for a change from admin apps"""
         return self.session.post('/change_admin/', data=change)
 
-    def get_report_tasks(self, params=None):
+    def get_report_tasks(self, params=None, **kwargs):
         return {"results": get_paginated_response(self.session,
-                '/reporttasks/', params=params)}
+                '/reporttasks/', params=params, **kwargs)}
 
     def get_user_details(self, params=None):
         return self.session.get('/user_details/', params=params)
 
-    def get_states(self, params=None):
+    def get_states(self, params=None, **kwargs):
         return {"results": get_paginated_response(self.session, '/states/',
-                params=params)}
+                params=params, **kwargs)}
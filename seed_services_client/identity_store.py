@@ -1,5 +1,14 @@
+from .cache import MISSING
+from .models import Identity
 from .seed_services import SeedServicesApiClient
-from .utils import get_paginated_response
+from .utils import (
+    concurrent_chain,
+    concurrent_map,
+    get_field,
+    get_paginated_response,
+    throttle,
+    unique,
+)
 
 
 class IdentityStoreApiClient(SeedServicesApiClient):
@@ -15,62 +24,325 @@ class IdentityStoreApiClient(SeedServicesApiClient):
     :param JSONServiceClient session:
         An instance of JSONServiceClient to use
 
+    :param LRUCache identity_cache:
+        (optional) A cache for identities and their addresses, that is
+        checked before requesting them. Identities that aren't found are
+        cached too. Entries for an identity are invalidated when it is
+        updated, or opted out or in, through this client.
+
+    :param AddressIndex address_index:
+        (optional) An index of the identities that addresses belong to,
+        filled in from searches by address and from fetched identities, that
+        is checked before searching by address. Needs ``identity_cache``:
+        the identities are taken from it, and addresses whose identities
+        aren't all cached are searched for again, so that a lookup never
+        costs more requests than a search. An identity's addresses are
+        removed from it when it is updated through this client.
+
     """
 
-    def __init__(self, auth_token, api_url, session=None, **kwargs):
+    def __init__(self, auth_token, api_url, session=None,
+                 identity_cache=None, address_index=None, **kwargs):
+        if address_index is not None and identity_cache is None:
+            raise ValueError('address_index needs an identity_cache')
         super(IdentityStoreApiClient, self).__init__(
             auth_token, api_url, session=session, **kwargs)
+        self.identity_cache = identity_cache
+        self.address_index = address_index
+
+    def get_cached(self, key):
+        if self.identity_cache is None:
+            return MISSING
+        return self.identity_cache.get(key)
+
+    def set_cached(self, key, identity_id, value):
+        if self.identity_cache is not None:
+            self.identity_cache.set(key, value, tag=identity_id)
+
+    def invalidate_cached(self, identity_id):
+        if self.identity_cache is not None and identity_id is not None:
+            self.identity_cache.invalidate_tag(identity_id)
 
-    def get_identities(self, params=None):
+    def get_identities(self, params=None, model=False, **kwargs):
         return {"results": get_paginated_response(self.session, '/identities/',
-                params=params)}
+                params=params, model=Identity if model else None, **kwargs)}
 
-    def search_identities(self, field, value):
+    def search_identities(self, field, value, model=False, **kwargs):
         # this is used for searching 'details' field to avoid DRF lacks
         # use "details__preferred_language" for example field
         params = {field: value}
+        model = Identity if model else None
         return {"results": get_paginated_response(self.session,
-                '/identities/search/', params=params)}
+                '/identities/search/', params=params, model=model, **kwargs)}
 
-    def get_identity(self, identity):
-        # return None on 404 becuase that means an identity not found
-        result = self.session.get('/identities/%s/' % identity,
-                                  expected_response_codes=[404, 200])
-        if "detail" in result and result["detail"] == "Not found.":
-            return None
+    def search_identities_bulk(self, field, values, concurrency=10,
+                               **kwargs):
+        """
+        Searches for identities matching any of ``values`` for ``field``,
+        running up to ``concurrency`` of the searches at a time.
+
+        The results of the searches are merged as they arrive, in no
+        particular order, and each identity is only returned once even if
+        it matches more than one value. Identities are told apart by their
+        ids, so ``fields`` must include ``id`` if it is given.
+        """
+        fields = kwargs.get('fields')
+        if fields is not None and 'id' not in fields:
+            raise ValueError("fields must include 'id' to merge searches")
+
+        def search(value):
+            return self.search_identities(field, value, **kwargs)["results"]
+
+        def merged():
+            seen = set()
+            for identity in concurrent_chain(search, unique(values),
+                                             concurrency=concurrency):
+                identity_id = get_field(identity, "id")
+                if identity_id not in seen:
+                    seen.add(identity_id)
+                    yield identity
+
+        return {"results": merged()}
+
+    def get_identity(self, identity, model=False):
+        key = ('identity', identity)
+        result = self.get_cached(key)
+        if result is MISSING:
+            # return None on 404 becuase that means an identity not found
+            result = self.session.get('/identities/%s/' % identity,
+                                      expected_response_codes=[404, 200])
+            if "detail" in result and result["detail"] == "Not found.":
+                result = None
+            elif self.address_index is not None:
+                self.address_index.add_identity(result)
+            self.set_cached(key, identity, result)
+
+        if model and result is not None:
+            return Identity.from_dict(result)
         return result
 
-    def get_identity_by_address(self, address_type, address_value):
-        params = {"details__addresses__%s" % address_type: address_value}
-        return {"results": get_paginated_response(self.session,
-                '/identities/search/', params=params)}
+    def get_identities_bulk(self, identity_ids, concurrency=10):
+        """
+        Gets many identities at once, with up to ``concurrency`` requests in
+        flight at a time. Duplicate ids are only requested once.
+
+        Returns a dictionary with the ``results``, a dictionary of identities
+        (or None where an identity wasn't found) keyed by id, and the
+        ``errors``, a dictionary of the exception raised for each id that
+        couldn't be fetched.
+        """
+        results = {}
+        errors = {}
+        for identity_id, future in concurrent_map(
+                self.get_identity, unique(identity_ids),
+                concurrency=concurrency, ordered=False):
+            try:
+                results[identity_id] = future.result()
+            except Exception as e:
+                errors[identity_id] = e
+        return {"results": results, "errors": errors}
+
+    def get_identity_by_address(self, address_type, address_value,
+                                model=False, **kwargs):
+        results = None
+        # Arguments like fields change the form of the results, which the
+        # index only has whole identities for
+        if self.address_index is not None and not kwargs:
+            identities = self.get_indexed_identities(
+                address_type, address_value)
+            if identities is not None:
+                results = iter(identities)
+
+        if results is None:
+            params = {"details__addresses__%s" % address_type: address_value}
+            results = get_paginated_response(self.session,
+                                             '/identities/search/',
+                                             params=params, **kwargs)
+            if self.address_index is not None:
+                results = self.index_search_results(
+                    address_type, address_value, results,
+                    cache_identities=not kwargs)
+
+        if model:
+            results = (Identity.from_dict(result) for result in results)
+        return {"results": results}
+
+    def get_indexed_identities(self, address_type, address_value):
+        """
+        Returns the cached identities that the address index has for an
+        address, or None if the address isn't indexed, or any of the
+        identities aren't cached, are gone or no longer have the address.
+        """
+        identity_ids = self.address_index.get(address_type, address_value)
+        if identity_ids is None:
+            return None
+        identities = []
+        for identity_id in identity_ids:
+            identity = self.get_cached(('identity', identity_id))
+            if identity is MISSING:
+                # Searching costs less than fetching each identity
+                return None
+            if identity is None or not self.has_address(
+                    identity, address_type, address_value):
+                self.address_index.remove(address_type, address_value)
+                return None
+            identities.append(identity)
+        return identities
+
+    @staticmethod
+    def has_address(identity, address_type, address_value):
+        details = identity.get('details') or {}
+        addresses = details.get('addresses') or {}
+        return address_value in (addresses.get(address_type) or {})
+
+    def index_search_results(self, address_type, address_value, results,
+                             cache_identities=True):
+        """
+        Returns each of the results of a search by address, adding the ids of
+        all of the identities to the address index once the search is done.
+        Addresses that no identities have aren't indexed, and neither are
+        results without ids.
+
+        If ``cache_identities`` is set, the results are whole identities,
+        which are added to the identity cache for later index lookups.
+        """
+        identity_ids = []
+        for identity in results:
+            identity_id = get_field(identity, "id")
+            identity_ids.append(identity_id)
+            if cache_identities and identity_id is not None:
+                self.set_cached(('identity', identity_id), identity_id,
+                                identity)
+            yield identity
+        if None not in identity_ids:
+            self.address_index.set(address_type, address_value, identity_ids)
 
     def get_identity_address(self, identity_id, address_type='msisdn',
                              params=None):
         if params is None:
             params = {'default': True}
 
+        key = ('address', identity_id, address_type,
+               tuple(sorted((k, str(v)) for k, v in params.items())))
+        address = self.get_cached(key)
+        if address is not MISSING:
+            return address
+
         response = self.session.get(
             '/identities/{0}/addresses/{1}'.format(identity_id, address_type),
             params=params)
 
         if len(response["results"]) > 0:
-            return response["results"][0]["address"]
+            address = response["results"][0]["address"]
         else:
-            return None
+            address = None
+        self.set_cached(key, identity_id, address)
+        return address
+
+    @staticmethod
+    def get_default_address(identity, address_type='msisdn'):
+        """
+        Returns the default address of ``address_type`` from the details of
+        an identity, or the first one if none of them are the default,
+        skipping addresses that have opted out. Returns None if there isn't
+        one.
+        """
+        addresses = identity['details']['addresses'].get(address_type) or {}
+        found = None
+        for address, flags in addresses.items():
+            flags = flags or {}
+            if flags.get('optedout'):
+                continue
+            if flags.get('default'):
+                return address
+            if found is None:
+                found = address
+        return found
+
+    def get_identity_addresses(self, identity_ids, address_type='msisdn',
+                               concurrency=10):
+        """
+        Gets the default address of ``address_type`` for many identities at
+        once.
+
+        Returns a dictionary with the ``results``, a dictionary of the
+        addresses (or None where an identity has no address, or wasn't
+        found) keyed by identity id, and the ``errors``, a dictionary of the
+        exception raised for each id whose address couldn't be fetched.
+
+        Addresses are taken from cached identities where possible. The rest
+        are fetched with up to ``concurrency`` requests in flight at a time.
+        """
+        results = {}
+        errors = {}
+        remaining = []
+        for identity_id in unique(identity_ids):
+            identity = self.get_cached(('identity', identity_id))
+            if identity is None:
+                # Cached as not found
+                results[identity_id] = None
+            elif identity is not MISSING and \
+                    'addresses' in identity.get('details', {}):
+                results[identity_id] = self.get_default_address(
+                    identity, address_type)
+            else:
+                remaining.append(identity_id)
+
+        def get_address(identity_id):
+            return self.get_identity_address(identity_id, address_type)
+
+        for identity_id, future in concurrent_map(
+                get_address, remaining, concurrency=concurrency,
+                ordered=False):
+            try:
+                results[identity_id] = future.result()
+            except Exception as e:
+                errors[identity_id] = e
+        return {"results": results, "errors": errors}
 
     def update_identity(self, identity, data=None):
-        return self.session.patch('/identities/%s/' % identity, data=data)
+        result = self.session.patch('/identities/%s/' % identity, data=data)
+        self.invalidate_cached(identity)
+        if self.address_index is not None:
+            self.address_index.remove_identity(identity)
+        return result
 
     def create_identity(self, identity):
         return self.session.post('/identities/', data=identity)
 
-    def get_optouts(self, params=None):
+    def create_identities_bulk(self, identities, concurrency=10,
+                               rate_limit=None):
+        """
+        Creates many identities at once, with up to ``concurrency`` requests
+        in flight at a time, and at most ``rate_limit`` requests a second if
+        it is set.
+
+        ``identities`` is read lazily, so it can be a generator over more
+        identities than fit in memory. Returns an iterator that returns a
+        dictionary for each identity, in the same order, with the ``data``
+        it was created from and either the created identity as the
+        ``result`` or the exception raised as the ``error``.
+        """
+        create = self.create_identity
+        if rate_limit is not None:
+            create = throttle(create, rate_limit)
+        for data, future in concurrent_map(create, identities,
+                                           concurrency=concurrency):
+            try:
+                yield {"data": data, "result": future.result(), "error": None}
+            except Exception as e:
+                yield {"data": data, "result": None, "error": e}
+
+    def get_optouts(self, params=None, **kwargs):
         return {"results": get_paginated_response(self.session,
-                '/optouts/search/', params=params)}
+                '/optouts/search/', params=params, **kwargs)}
 
     def create_optout(self, optout):
-        return self.session.post('/optout/', data=optout)
+        result = self.session.post('/optout/', data=optout)
+        self.invalidate_cached(optout.get('identity'))
+        return result
 
     def create_optin(self, optin):
-        return self.session.post('/optin/', data=optin)
+        result = self.session.post('/optin/', data=optin)
+        self.invalidate_cached(optin.get('identity'))
+        return result
@@ -0,0 +1,108 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+
+class StdlibCodec(object):
+    """
+    Encodes and decodes JSON with the standard library ``json`` module.
+    """
+
+    name = 'json'
+
+    def dumps(self, obj):
+        return json.dumps(obj, default=str)
+
+    def loads(self, data):
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+
+class OrjsonCodec(object):
+    """
+    Encodes and decodes JSON with ``orjson``.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError('orjson is not installed')
+
+    def dumps(self, obj):
+        return orjson.dumps(obj, default=str,
+                            option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+class UjsonCodec(object):
+    """
+    Encodes and decodes JSON with ``ujson``. Needs ujson 5 or later, for
+    the ``default`` argument.
+    """
+
+    name = 'ujson'
+
+    def __init__(self):
+        if ujson is None:
+            raise ImportError('ujson is not installed')
+
+    def dumps(self, obj):
+        return ujson.dumps(obj, default=str)
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+
+CODECS = {
+    'json': StdlibCodec,
+    'orjson': OrjsonCodec,
+    'ujson': UjsonCodec,
+}
+
+# The codecs that 'auto' picks from, fastest first
+AUTO_CODECS = ('orjson', 'ujson', 'json')
+
+_default_codec = StdlibCodec()
+
+
+def get_codec(codec=None):
+    """
+    Returns the codec for ``codec``, which can be a codec, the name of one
+    of the :data:`CODECS`, ``'auto'`` for the fastest codec installed, or
+    None for the default codec.
+    """
+    if codec is None:
+        return _default_codec
+    if codec == 'auto':
+        for name in AUTO_CODECS:
+            try:
+                return CODECS[name]()
+            except ImportError:
+                pass
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError('Unknown JSON codec %r' % (codec,))
+        return CODECS[codec]()
+    return codec
+
+
+def set_default_codec(codec):
+    """
+    Sets the codec used by all of the clients that aren't given one, as
+    accepted by :func:`get_codec`. The standard library ``json`` module is
+    used until this is called.
+    """
+    global _default_codec
+    _default_codec = get_codec(codec) if codec is not None else StdlibCodec()
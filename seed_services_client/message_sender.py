@@ -1,3 +1,4 @@
+from .models import Inbound, Outbound
 from .seed_services import SeedServicesApiClient
 from .utils import get_paginated_response
 
@@ -20,20 +21,20 @@ class MessageSenderApiClient(SeedServicesApiClient):
     def create_outbound(self, payload):
         return self.session.post('/outbound/', data=payload)
 
-    def get_outbounds(self, params=None):
+    def get_outbounds(self, params=None, model=False, **kwargs):
         return {"results": get_paginated_response(self.session, '/outbound/',
-                params=params)}
+                params=params, model=Outbound if model else None, **kwargs)}
 
     def create_inbound(self, payload):
         return self.session.post('/inbound/', data=payload)
 
-    def get_inbounds(self, params=None):
+    def get_inbounds(self, params=None, model=False, **kwargs):
         return {"results": get_paginated_response(self.session, '/inbound/',
-                params=params)}
+                params=params, model=Inbound if model else None, **kwargs)}
 
-    def get_failed_tasks(self, params=None):
+    def get_failed_tasks(self, params=None, **kwargs):
         return {"results": get_paginated_response(self.session,
-                '/failed-tasks/', params=params)}
+                '/failed-tasks/', params=params, **kwargs)}
 
     def requeue_failed_tasks(self):
         return self.session.post('/failed-tasks/')
@@ -0,0 +1,183 @@
+import json
+
+
+class JSONField(object):
+    """
+    A field that is kept JSON encoded in the slot ``slot``, and only decoded
+    when it is read. Each read decodes a new copy of the value, so changes to
+    it need to be set on the field again to be kept.
+    """
+
+    def __init__(self, slot):
+        self.slot = slot
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        try:
+            value = object.__getattribute__(obj, self.slot)
+        except AttributeError:
+            return None
+        return json.loads(value)
+
+    def __set__(self, obj, value):
+        setattr(obj, self.slot, json.dumps(
+            value, separators=(',', ':'), default=str))
+
+
+def get_slots(fields, json_fields=()):
+    """
+    Returns the ``__slots__`` for a model with ``fields``, where each of the
+    ``json_fields`` is kept encoded in a slot named with a leading
+    underscore.
+    """
+    return tuple('_' + name if name in json_fields else name
+                 for name in fields)
+
+
+class Model(object):
+    """
+    Base class for compact records of the resources returned by the seed
+    services, which keep their fields in ``__slots__`` instead of in a
+    dictionary per record. Nested fields like ``details`` and ``metadata``
+    are kept JSON encoded until they are read.
+
+    Fields that a record doesn't have read as None. Fields that the model
+    doesn't know about are kept as they are, so that :meth:`to_dict` returns
+    the same dictionary that the record was created from.
+    """
+
+    __slots__ = ('_extra',)
+
+    fields = ()
+    json_fields = ()
+
+    def __init__(self, data=None, **kwargs):
+        if data is not None:
+            kwargs.update(data)
+        extra = None
+        for name, value in kwargs.items():
+            if name in self.fields:
+                setattr(self, name, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[name] = value
+        self._extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data)
+
+    def __getattr__(self, name):
+        # Only called for fields whose slots haven't been set
+        if name in type(self).fields:
+            return None
+        raise AttributeError(name)
+
+    def to_dict(self):
+        """
+        Returns the record as a dictionary, like the one returned by the
+        seed service.
+        """
+        data = {}
+        for name in self.fields:
+            slot = '_' + name if name in self.json_fields else name
+            try:
+                object.__getattribute__(self, slot)
+            except AttributeError:
+                continue
+            data[name] = getattr(self, name)
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<%s %s>' % (type(self).__name__, getattr(self, 'id', None))
+
+
+class Identity(Model):
+    fields = ('id', 'version', 'details', 'communicate_through', 'operator',
+              'created_at', 'created_by', 'updated_at', 'updated_by')
+    json_fields = ('details',)
+    __slots__ = get_slots(fields, json_fields)
+    details = JSONField('_details')
+
+
+class Subscription(Model):
+    fields = ('id', 'version', 'identity', 'messageset',
+              'next_sequence_number', 'lang', 'active', 'completed',
+              'schedule', 'process_status', 'metadata', 'url',
+              'created_at', 'created_by', 'updated_at', 'updated_by')
+    json_fields = ('metadata',)
+    __slots__ = get_slots(fields, json_fields)
+    metadata = JSONField('_metadata')
+
+
+class Outbound(Model):
+    fields = ('id', 'version', 'to_addr', 'to_identity', 'content',
+              'delivered', 'resend', 'attempts', 'channel', 'metadata',
+              'last_sent_time', 'url', 'created_at', 'created_by',
+              'updated_at', 'updated_by')
+    json_fields = ('metadata',)
+    __slots__ = get_slots(fields, json_fields)
+    metadata = JSONField('_metadata')
+
+
+class Inbound(Model):
+    fields = ('id', 'message_id', 'in_reply_to', 'to_addr', 'from_addr',
+              'from_identity', 'content', 'transport_name', 'transport_type',
+              'helper_metadata', 'url', 'created_at', 'created_by',
+              'updated_at', 'updated_by')
+    json_fields = ('helper_metadata',)
+    __slots__ = get_slots(fields, json_fields)
+    helper_metadata = JSONField('_helper_metadata')
+
+
+class Registration(Model):
+    fields = ('id', 'external_id', 'reg_type', 'registrant_id', 'validated',
+              'data', 'source', 'created_at', 'created_by', 'updated_at',
+              'updated_by')
+    json_fields = ('data',)
+    __slots__ = get_slots(fields, json_fields)
+    data = JSONField('_data')
+
+
+class Change(Model):
+    fields = ('id', 'registrant_id', 'action', 'data', 'validated', 'source',
+              'created_at', 'created_by', 'updated_at', 'updated_by')
+    json_fields = ('data',)
+    __slots__ = get_slots(fields, json_fields)
+    data = JSONField('_data')
+
+
+class Schedule(Model):
+    fields = ('id', 'frequency', 'triggered', 'cron_definition',
+              'interval_definition', 'celery_cron_definition',
+              'celery_interval_definition', 'endpoint', 'payload',
+              'next_send_at', 'enabled', 'created_at', 'created_by',
+              'updated_at', 'updated_by')
+    json_fields = ('payload',)
+    __slots__ = get_slots(fields, json_fields)
+    payload = JSONField('_payload')
+
+
+class Message(Model):
+    fields = ('id', 'messageset', 'sequence_number', 'lang', 'text_content',
+              'binary_content', 'metadata', 'created_at', 'updated_at')
+    json_fields = ('metadata',)
+    __slots__ = get_slots(fields, json_fields)
+    metadata = JSONField('_metadata')
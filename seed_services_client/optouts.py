@@ -0,0 +1,207 @@
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+
+
+class BloomFilter(object):
+    """
+    A Bloom filter over strings, which can say for certain that a string
+    has not been added to it, using only a few bits per string.
+
+    :param int capacity:
+        (optional) The number of strings that the filter is sized for,
+        defaults to 10000.
+
+    :param float error_rate:
+        (optional) The rate of false positives once ``capacity`` strings have
+        been added, defaults to 0.001.
+    """
+
+    def __init__(self, capacity=10000, error_rate=0.001):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        num_bits = -self.capacity * math.log(error_rate) / (math.log(2) ** 2)
+        self.num_bits = int(math.ceil(num_bits))
+        self.num_hashes = max(
+            int(round(self.num_bits / float(self.capacity) * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _indexes(self, value):
+        digest = hashlib.md5(value.encode('utf-8')).hexdigest()
+        h1, h2 = int(digest[:16], 16), int(digest[16:], 16)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, value):
+        for index in self._indexes(value):
+            self.bits[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, value):
+        bits = self.bits
+        for index in self._indexes(value):
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+        return True
+
+
+class OptOutSnapshot(object):
+    """
+    A local copy of the opt outs in the identity store, for checking whether
+    an address or identity has opted out without a request for every check.
+
+    Addresses and identities are kept in exact sets, with a Bloom filter in
+    front of the addresses, so that the usual check for an address that
+    hasn't opted out doesn't touch the larger set.
+
+    :param IdentityStoreApiClient client:
+        The client to fetch the opt outs with.
+
+    :param dict params:
+        (optional) Filters for the opt outs to include, for example
+        ``{'optout_type': 'stop'}``.
+
+    :param str watermark_param:
+        (optional) The search filter for opt outs created at or after a
+        time, used to only fetch new opt outs when refreshing. Defaults to
+        ``created_at__gte``.
+
+    :param int capacity:
+        (optional) The number of addresses to size the Bloom filter for
+        initially, defaults to 10000. The filter is rebuilt with double the
+        capacity whenever it fills up.
+
+    Opt ins aren't listed by the identity store, so addresses or identities
+    that opt back in must be removed with :meth:`remove`.
+    """
+
+    def __init__(self, client, params=None, watermark_param='created_at__gte',
+                 capacity=10000, error_rate=0.001):
+        self.client = client
+        self.params = dict(params or {})
+        self.watermark_param = watermark_param
+        self.error_rate = error_rate
+        self.watermark = None
+        self.addresses = set()
+        self.identities = set()
+        self.bloom = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Fetches the opt outs created since the last refresh, or all of them
+        on the first refresh. Returns the number of opt outs fetched.
+
+        The watermark is only moved on once every opt out has been fetched,
+        so the opt outs of a refresh that fails part way through are fetched
+        again by the next one.
+        """
+        with self._lock:
+            params = dict(self.params)
+            watermark = self.watermark
+            if watermark is not None:
+                params[self.watermark_param] = watermark
+            count = 0
+            for optout in self.client.get_optouts(params=params)['results']:
+                self._add(optout)
+                watermark = self.get_watermark(watermark, optout)
+                count += 1
+            self.watermark = watermark
+            return count
+
+    def add(self, optout):
+        """
+        Adds an opt out, as returned by the identity store, to the snapshot.
+        """
+        with self._lock:
+            self._add(optout)
+            self.watermark = self.get_watermark(self.watermark, optout)
+
+    @staticmethod
+    def get_watermark(watermark, optout):
+        created_at = optout.get('created_at')
+        # ISO 8601 timestamps in the same timezone sort as strings
+        if created_at and created_at > (watermark or ''):
+            return created_at
+        return watermark
+
+    def _add(self, optout):
+        if optout.get('address'):
+            self._add_address(optout['address'])
+        if optout.get('identity'):
+            self.identities.add(optout['identity'])
+
+    def _add_address(self, address):
+        self.addresses.add(address)
+        if len(self.addresses) > self.bloom.capacity:
+            bloom = BloomFilter(self.bloom.capacity * 2, self.error_rate)
+            for value in self.addresses:
+                bloom.add(value)
+            self.bloom = bloom
+        else:
+            self.bloom.add(address)
+
+    def remove(self, address=None, identity=None):
+        """
+        Removes an address or identity that has opted back in.
+        """
+        with self._lock:
+            self.addresses.discard(address)
+            self.identities.discard(identity)
+
+    def is_opted_out(self, address=None, identity=None):
+        """
+        Returns whether the address or the identity has opted out.
+        """
+        if identity is not None and identity in self.identities:
+            return True
+        if address is None or address not in self.bloom:
+            return False
+        return address in self.addresses
+
+    def save(self, path):
+        """
+        Saves the snapshot to a file, replacing the file in a single step so
+        that readers never see a partly written snapshot. Waits for any
+        refresh in progress to finish first.
+        """
+        with self._lock:
+            data = {
+                'watermark': self.watermark,
+                'params': self.params,
+                'addresses': sorted(self.addresses),
+                'identities': sorted(self.identities),
+            }
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            getattr(os, 'replace', os.rename)(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def load(self, path):
+        """
+        Loads a snapshot saved with :meth:`save`, so that the next refresh
+        only fetches the opt outs created since it was saved. Raises
+        ``ValueError`` if it was saved with different filters.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        if data['params'] != self.params:
+            raise ValueError(
+                'Snapshot saved with params %r, not %r' % (
+                    data['params'], self.params))
+        with self._lock:
+            self.bloom = BloomFilter(
+                max(len(data['addresses']) * 2, self.bloom.capacity),
+                self.error_rate)
+            self.addresses = set()
+            for address in data['addresses']:
+                self._add_address(address)
+            self.identities = set(data['identities'])
+            self.watermark = data['watermark']
@@ -0,0 +1,125 @@
+import threading
+import time
+
+
+class TokenBucket(object):
+    """
+    A thread safe token bucket, that lets through ``rate`` requests a second
+    on average, and bursts of up to ``capacity`` requests.
+
+    Requests over the rate reserve their tokens ahead of time and wait for
+    them, so that waiting requests are let through evenly spaced in the
+    order that they arrived.
+
+    :param float rate:
+        The number of tokens added to the bucket each second.
+
+    :param float capacity:
+        (optional) The maximum number of tokens in the bucket, defaults to
+        ``rate``, or 1 if that is less than 1.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.time):
+        if capacity is None:
+            capacity = max(rate, 1)
+        self.rate = float(rate)
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated_at = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """
+        Takes ``tokens`` from the bucket, and returns the number of seconds
+        to wait for before they are available.
+        """
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+
+class RateLimiter(object):
+    """
+    Limits the rate of requests to a service, with a token bucket for all
+    requests and separate token buckets for some endpoints.
+
+    :param float rate:
+        (optional) The number of requests a second to allow, for requests
+        that don't have a limit in ``limits``. Defaults to None for no limit.
+
+    :param float capacity:
+        (optional) The largest burst of requests to allow, see
+        :class:`TokenBucket`.
+
+    :param dict limits:
+        (optional) Limits for specific endpoints, keyed by the path prefix of
+        the endpoint relative to the API url, or by an ``(HTTP method, path
+        prefix)`` tuple. Each limit is a rate, or a ``(rate, capacity)``
+        tuple. For example ``{('POST', '/outbound/'): 10}``. The most
+        specific limit that matches a request is used.
+
+    The same limiter can be given to many clients to limit the rate of all
+    of their requests together.
+    """
+
+    def __init__(self, rate=None, capacity=None, limits=None,
+                 clock=time.time, sleep=time.sleep):
+        self.sleep = sleep
+        self.bucket = None
+        if rate is not None:
+            self.bucket = TokenBucket(rate, capacity, clock=clock)
+
+        self.buckets = []
+        for endpoint, limit in (limits or {}).items():
+            if isinstance(endpoint, (tuple, list)):
+                method, prefix = endpoint
+                method = method.upper()
+            else:
+                method, prefix = None, endpoint
+            if not isinstance(limit, (tuple, list)):
+                limit = (limit, None)
+            self.buckets.append((
+                method, '/' + prefix.lstrip('/'),
+                TokenBucket(limit[0], limit[1], clock=clock)))
+        # Check the longest prefixes, and then those with a method, first
+        self.buckets.sort(key=lambda b: (len(b[1]), b[0] is not None),
+                          reverse=True)
+
+    def get_bucket(self, method, path):
+        """
+        Returns the bucket for a request, or None if it isn't limited.
+        """
+        method = method.upper()
+        path = '/' + (path or '').lstrip('/')
+        for bucket_method, prefix, bucket in self.buckets:
+            if bucket_method not in (None, method):
+                continue
+            if path.startswith(prefix):
+                return bucket
+        return self.bucket
+
+    def reserve(self, method, path):
+        """
+        Takes a token for a request, and returns the number of seconds to
+        wait for before sending it.
+        """
+        bucket = self.get_bucket(method, path)
+        if bucket is None:
+            return 0
+        return bucket.reserve()
+
+    def acquire(self, method, path):
+        """
+        Blocks until a request may be sent.
+        """
+        delay = self.reserve(method, path)
+        if delay > 0:
+            self.sleep(delay)
@@ -0,0 +1,107 @@
+import random
+
+from urllib3.util.retry import Retry
+
+# urllib3 1.26 renamed method_whitelist to allowed_methods
+if hasattr(Retry, 'DEFAULT_ALLOWED_METHODS'):
+    METHODS_ARG = 'allowed_methods'
+else:  # pragma: no cover
+    METHODS_ARG = 'method_whitelist'
+
+BACKOFF_MAX = getattr(Retry, 'DEFAULT_BACKOFF_MAX',
+                      getattr(Retry, 'BACKOFF_MAX', 120))
+
+
+class RetryPolicy(Retry):
+    """
+    Retry policy for requests to the seed services. Failed requests are
+    retried with an exponential backoff between attempts, and with random
+    jitter so that many clients don't all retry at the same moment.
+
+    :param int total:
+        (optional) The number of times to retry a request, defaults to 3.
+
+    :param float backoff_factor:
+        (optional) Retries back off for ``backoff_factor * 2 ** (n - 1)``
+        seconds after the ``n``th consecutive failure, defaults to 0.5.
+
+    :param float jitter:
+        (optional) The fraction of each backoff that is randomly taken off,
+        between 0 for no jitter and 1 for the full backoff, defaults to 0.5.
+
+    :param status_forcelist:
+        (optional) The response status codes to retry, defaults to 429, 502,
+        503 and 504.
+
+    :param bool respect_retry_after_header:
+        (optional) Whether to wait for as long as the ``Retry-After`` header
+        of a response asks, defaults to True.
+
+    :param bool retry_non_idempotent:
+        (optional) Whether to retry requests with methods that aren't
+        idempotent, such as POST and PATCH, defaults to False.
+
+    Once the retries for a status code are used up, the last response is
+    returned so that it is handled like any other unexpected response.
+    """
+
+    DEFAULT_STATUS_CODES = frozenset([429, 502, 503, 504])
+    IDEMPOTENT_METHODS = frozenset(
+        ['DELETE', 'GET', 'HEAD', 'OPTIONS', 'PUT', 'TRACE'])
+
+    def __init__(self, total=3, backoff_factor=0.5, jitter=0.5,
+                 status_forcelist=DEFAULT_STATUS_CODES,
+                 respect_retry_after_header=True, retry_non_idempotent=False,
+                 **kwargs):
+        if METHODS_ARG not in kwargs:
+            if retry_non_idempotent:
+                kwargs[METHODS_ARG] = False
+            else:
+                kwargs[METHODS_ARG] = self.IDEMPOTENT_METHODS
+        kwargs.setdefault('raise_on_status', False)
+        super(RetryPolicy, self).__init__(
+            total=total, backoff_factor=backoff_factor,
+            status_forcelist=status_forcelist,
+            respect_retry_after_header=respect_retry_after_header, **kwargs)
+        self.jitter = jitter
+
+    def new(self, **kwargs):
+        kwargs.setdefault('jitter', self.jitter)
+        return super(RetryPolicy, self).new(**kwargs)
+
+    def add_jitter(self, backoff):
+        return backoff * (1 - self.jitter * random.random())
+
+    def get_backoff_time(self):
+        return self.add_jitter(super(RetryPolicy, self).get_backoff_time())
+
+    def get_retry_backoff_time(self, retry_number):
+        """
+        Returns the number of seconds to back off for before the given retry,
+        for callers that keep count of their own retries.
+        """
+        if retry_number <= 1:
+            return 0
+        backoff = self.backoff_factor * (2 ** (retry_number - 1))
+        return self.add_jitter(min(BACKOFF_MAX, backoff))
+
+    def is_method_retryable(self, method):
+        methods = getattr(self, METHODS_ARG)
+        return not methods or method.upper() in methods
+
+
+def get_retry_key(retry):
+    """
+    Returns a hashable key for the settings of a retry policy, that is the
+    same for separate policies with the same settings. ``Retry`` instances
+    are otherwise only equal to themselves. Anything that isn't a ``Retry``,
+    like a number of retries, is returned as is.
+    """
+    if not isinstance(retry, Retry):
+        return retry
+    settings = []
+    for name, value in sorted(vars(retry).items()):
+        if isinstance(value, (list, set)):
+            value = frozenset(value)
+        settings.append((name, value))
+    return (type(retry), tuple(settings))
@@ -1,3 +1,4 @@
+from .models import Schedule
 from .seed_services import SeedServicesApiClient
 from .utils import get_paginated_response
 
@@ -7,12 +8,14 @@ class SchedulerApiClient(SeedServicesApiClient):
     Client for Scheduler Service.
     """
 
-    def get_schedules(self, params=None):
+    def get_schedules(self, params=None, model=False, **kwargs):
         return {"results": get_paginated_response(self.session, '/schedule/',
-                params=params)}
+                params=params, model=Schedule if model else None, **kwargs)}
 
-    def get_schedule(self, schedule_id):
-        return self.session.get('/schedule/%s/' % schedule_id)
+    def get_schedule(self, schedule_id, model=False):
+        result = self.session.get('/schedule/%s/' % schedule_id,
+                                  conditional=True)
+        return Schedule.from_dict(result) if model else result
 
     def create_schedule(self, schedule):
         return self.session.post('/schedule/', data=schedule)
@@ -24,9 +27,9 @@ class SchedulerApiClient(SeedServicesApiClient):
     def delete_schedule(self, schedule_id):
         return self.session.delete('/schedule/%s/' % schedule_id)
 
-    def get_failed_tasks(self, params=None):
+    def get_failed_tasks(self, params=None, **kwargs):
         return {"results": get_paginated_response(self.session,
-                '/failed-tasks/', params=params)}
+                '/failed-tasks/', params=params, **kwargs)}
 
     def requeue_failed_tasks(self):
         return self.session.post('/failed-tasks/')
@@ -1,24 +1,260 @@
 import copy
+import threading
 
 from demands import HTTPServiceClient, JSONServiceClient
 from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import (
+    HTTPConnectionPool,
+    HTTPSConnectionPool,
+)
 
 from .__version__ import __version__ as client_version
+from .cache import MISSING
+from .coalescing import get_request_key
+from .json_codec import get_codec
+from .retry import get_retry_key
+from .transport import default_registry
+from .utils import get_endpoint_timeout, resolve_endpoint_timeouts
+
+
+class CountingConnectionPoolMixin(object):
+    """
+    Keeps count of the connections of a connection pool that are in use, and
+    of the connections that were discarded because the pool was full.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(CountingConnectionPoolMixin, self).__init__(*args, **kwargs)
+        self.num_in_use = 0
+        self.num_discarded = 0
+        self._stats_lock = threading.Lock()
+
+    def _get_conn(self, *args, **kwargs):
+        conn = super(CountingConnectionPoolMixin, self)._get_conn(
+            *args, **kwargs)
+        with self._stats_lock:
+            self.num_in_use += 1
+        return conn
+
+    def _put_conn(self, conn):
+        with self._stats_lock:
+            self.num_in_use = max(self.num_in_use - 1, 0)
+            if conn is not None and self.pool is not None and \
+                    self.pool.full():
+                self.num_discarded += 1
+        return super(CountingConnectionPoolMixin, self)._put_conn(conn)
+
+    def stats(self):
+        idle = 0
+        maxsize = 0
+        if self.pool is not None:
+            maxsize = self.pool.maxsize
+            idle = len([conn for conn in list(self.pool.queue)
+                        if conn is not None])
+        return {
+            'maxsize': maxsize,
+            'in_use': self.num_in_use,
+            'idle': idle,
+            'discarded': self.num_discarded,
+            'connections': self.num_connections,
+            'requests': self.num_requests,
+        }
+
+
+class CountingHTTPConnectionPool(CountingConnectionPoolMixin,
+                                 HTTPConnectionPool):
+    pass
+
+
+class CountingHTTPSConnectionPool(CountingConnectionPoolMixin,
+                                  HTTPSConnectionPool):
+    pass
 
 
 class SeedHTTPAdapter(HTTPAdapter):
     """
-    HTTPAdapter child class to implement global timeouts
+    HTTPAdapter child class to implement global and per endpoint timeouts,
+    and to keep statistics on its connection pools
+
+    Timeouts can either be a number of seconds, or a ``(connect, read)``
+    tuple. A timeout given for a single request takes precedence.
     """
 
-    def __init__(self, timeout=None, *args, **kwargs):
+    def __init__(self, timeout=None, endpoint_timeouts=(), *args, **kwargs):
         self.timeout = timeout
+        self.endpoint_timeouts = endpoint_timeouts
         super(SeedHTTPAdapter, self).__init__(*args, **kwargs)
 
+    def init_poolmanager(self, *args, **kwargs):
+        super(SeedHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool,
+        }
+
     def send(self, *args, **kwargs):
-        kwargs['timeout'] = self.timeout
+        if kwargs.get('timeout') is None:
+            request = args[0] if args else kwargs.get('request')
+            kwargs['timeout'] = self.get_timeout(request)
         return super(SeedHTTPAdapter, self).send(*args, **kwargs)
 
+    def get_timeout(self, request):
+        if request is None:
+            return self.timeout
+        return get_endpoint_timeout(
+            self.endpoint_timeouts, request.method, request.url,
+            default=self.timeout)
+
+    def pool_stats(self):
+        """
+        Returns the statistics of each of the connection pools of this
+        adapter, keyed by ``scheme://host:port``. Each contains the number of
+        connections that are ``in_use``, ``idle`` and that were ``discarded``
+        because the pool was full.
+        """
+        stats = {}
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            try:
+                pool = pools[key]
+            except KeyError:
+                continue
+            if isinstance(pool, CountingConnectionPoolMixin):
+                stats['%s://%s:%s' % (pool.scheme, pool.host, pool.port)] = \
+                    pool.stats()
+        return stats
+
+
+class SeedHTTPServiceClient(HTTPServiceClient):
+    """
+    HTTPServiceClient child class that leaves the retries of its adapters as
+    they were mounted, instead of resetting them before every request
+    """
+
+    def pre_send(self, request_params):
+        return request_params
+
+
+class SeedJSONServiceClient(JSONServiceClient):
+    """
+    JSONServiceClient child class that leaves the retries of its adapters as
+    they were mounted, instead of resetting them before every request, and
+    that encodes and decodes JSON with a pluggable codec.
+
+    :param json_codec:
+        (optional) The codec to use, as accepted by
+        :func:`seed_services_client.json_codec.get_codec`. Defaults to the
+        default codec at the time of each request.
+
+    :param LRUCache validator_cache:
+        (optional) A cache for the decoded bodies of responses to GETs made
+        with ``conditional=True``, that have an ``ETag`` or
+        ``Last-Modified`` header. Later conditional GETs of the same url
+        send ``If-None-Match`` or ``If-Modified-Since``, and the cached body
+        is returned if the server responds with a 304. Cached bodies are
+        shared between callers, and should be treated as read only. Other
+        GETs, like the pages of lists, aren't cached.
+
+    :param SingleFlight single_flight:
+        (optional) Coalesces identical GETs that are made at the same time
+        into a single request.
+
+    :param RateLimiter rate_limiter:
+        (optional) Limits the rate of requests, blocking each request until
+        it may be sent. Requests are matched to limits by their path
+        relative to ``url``.
+
+    Responses to requests made with ``stream=True`` are returned as they
+    are, for the caller to read the body from.
+    """
+
+    def __init__(self, *args, **kwargs):
+        json_codec = kwargs.pop('json_codec', None)
+        self.validator_cache = kwargs.pop('validator_cache', None)
+        self.single_flight = kwargs.pop('single_flight', None)
+        self.rate_limiter = kwargs.pop('rate_limiter', None)
+        super(SeedJSONServiceClient, self).__init__(*args, **kwargs)
+        self.json_codec = None if json_codec is None else get_codec(json_codec)
+
+    def request(self, method, path, **kwargs):
+        if self.single_flight is None or method.upper() != 'GET' or \
+                kwargs.get('stream'):
+            return self.send_request(method, path, **kwargs)
+
+        def send():
+            return self.send_request(method, path, **kwargs)
+
+        return self.single_flight.do(
+            get_request_key(method, path, kwargs), send)
+
+    def send_request(self, method, path, **kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(method, path)
+        return super(SeedJSONServiceClient, self).request(
+            method, path, **kwargs)
+
+    def get_codec(self):
+        return self.json_codec or get_codec()
+
+    @staticmethod
+    def get_validator_key(request_params):
+        params = request_params.get('params') or {}
+        return (
+            request_params['url'],
+            tuple(sorted((k, str(v)) for k, v in params.items())),
+            (request_params.get('headers') or {}).get('Authorization'),
+        )
+
+    def pre_send(self, request_params):
+        if 'data' in request_params:
+            request_params['data'] = self.get_codec().dumps(
+                request_params['data'])
+        conditional = request_params.pop('conditional', False)
+        if conditional and self.validator_cache is not None and \
+                request_params['method'].upper() == 'GET' and \
+                not request_params.get('stream'):
+            self.add_validators(request_params)
+        return request_params
+
+    def add_validators(self, request_params):
+        """
+        Adds the conditional headers for a cached response to the request,
+        and keeps the cached response to return if the server responds with
+        a 304.
+        """
+        key = self.get_validator_key(request_params)
+        request_params['validator_key'] = key
+        entry = self.validator_cache.get(key, MISSING)
+        if entry is MISSING:
+            return
+        etag, last_modified, _ = entry
+        headers = request_params.setdefault('headers', {})
+        if etag is not None:
+            headers['If-None-Match'] = etag
+        if last_modified is not None:
+            headers['If-Modified-Since'] = last_modified
+        request_params['validator_entry'] = entry
+        request_params['expected_response_codes'] = list(
+            request_params.get('expected_response_codes', [])) + [304]
+
+    def post_send(self, response, **kwargs):
+        response = HTTPServiceClient.post_send(self, response, **kwargs)
+        if kwargs.get('stream'):
+            return response
+        if response.status_code == 304 and 'validator_entry' in kwargs:
+            return kwargs['validator_entry'][2]
+        if not response.content:
+            content = None
+        else:
+            content = self.get_codec().loads(response.content)
+        if 'validator_key' in kwargs and response.status_code == 200:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag is not None or last_modified is not None:
+                self.validator_cache.set(
+                    kwargs['validator_key'], (etag, last_modified, content))
+        return content
+
 
 class SeedServicesApiClient(object):
     """
@@ -39,40 +275,166 @@ class SeedServicesApiClient(object):
     :param retries:
         (optional) The number of times to retry an HTTP request
 
+    :param RetryPolicy retry_policy:
+        (optional) The policy for retrying HTTP requests, which takes the
+        place of ``retries``
+
     :param timeout:
-        (optional) The number of seconds for a request to timeout,
-        defaults to 65 seconds
+        (optional) The number of seconds for a request to timeout, or a
+        ``(connect, read)`` tuple of seconds, defaults to 65 seconds
+
+    :param dict endpoint_timeouts:
+        (optional) Timeouts to use instead of ``timeout`` for some endpoints,
+        keyed by the path prefix of the endpoint, or by an ``(HTTP method,
+        path prefix)`` tuple. For example, ``{'/identities/': (1, 5),
+        ('POST', '/reports/'): (1, 600)}``. The most specific endpoint that
+        matches a request is used.
+
+    :param int pool_connections:
+        (optional) The number of connection pools to cache, defaults to 10
+
+    :param int pool_maxsize:
+        (optional) The maximum number of connections to keep in each pool,
+        defaults to 10. Set this to at least the number of threads that
+        share the client.
+
+    :param bool pool_block:
+        (optional) Whether to block when no connection is available in a
+        pool, instead of opening a connection that is discarded once it is
+        no longer used. Defaults to False.
+
+    :param bool share_transport:
+        (optional) Whether to share sessions, and so connection pools, with
+        the other clients created for the same URL, token and settings.
+        Retry policies with the same settings count as the same, but the
+        caches, ``single_flight`` and ``rate_limiter`` must be the same
+        instances. Defaults to False. Ignored if either session is given.
+
+    :param TransportRegistry transport_registry:
+        (optional) The registry to get shared sessions from, defaults to the
+        registry shared by the whole process.
+
+    :param json_codec:
+        (optional) The codec to encode and decode JSON with, a codec or one
+        of ``'json'``, ``'orjson'``, ``'ujson'`` or ``'auto'`` for the
+        fastest one installed. Defaults to the codec set with
+        :func:`seed_services_client.json_codec.set_default_codec`.
+
+    :param LRUCache validator_cache:
+        (optional) A cache for the responses of single reference resources,
+        like message sets and schedules, with an ``ETag`` or
+        ``Last-Modified`` header, which are then fetched with conditional
+        requests and served from the cache while they haven't changed.
+
+    :param SingleFlight single_flight:
+        (optional) Coalesces identical GETs that are made at the same time,
+        from any of the threads using this client, into a single request.
+        The same instance can be given to many clients.
+
+    :param RateLimiter rate_limiter:
+        (optional) Limits the rate of requests to the service, for example
+        ``RateLimiter(rate=20, limits={('POST', '/outbound/'): 5})``.
+        Requests over the rate wait until they may be sent, instead of
+        failing. The same instance can be given to many clients, to limit
+        their requests together.
 
     """
 
     def __init__(self, auth_token, api_url, session=None, session_http=None,
-                 retries=0, timeout=65):
+                 retries=0, timeout=65, pool_connections=None,
+                 pool_maxsize=None, pool_block=None, share_transport=False,
+                 transport_registry=None, retry_policy=None,
+                 endpoint_timeouts=None, json_codec=None,
+                 validator_cache=None, single_flight=None,
+                 rate_limiter=None):
 
         headers = {
             'Authorization': 'Token ' + auth_token,
             'User-Agent': 'seed-services-client v{0}'.format(client_version),
         }
 
-        if session is None:
-            session = JSONServiceClient(url=api_url,
-                                        headers=copy.deepcopy(headers))
-        self.session = session
-
-        if session_http is None:
-            session_http = HTTPServiceClient(url=api_url,
-                                             headers=copy.deepcopy(headers))
-
-        self.session_http = session_http
-
         http_adapter_kwargs = {}
 
-        if retries > 0:
+        if retry_policy is not None:
+            http_adapter_kwargs['max_retries'] = retry_policy
+        elif retries > 0:
             http_adapter_kwargs['max_retries'] = retries
 
+        if isinstance(timeout, list):
+            timeout = tuple(timeout)
         if timeout is not None:
             http_adapter_kwargs['timeout'] = timeout
 
+        if endpoint_timeouts:
+            http_adapter_kwargs['endpoint_timeouts'] = \
+                resolve_endpoint_timeouts(api_url, endpoint_timeouts)
+
+        if pool_connections is not None:
+            http_adapter_kwargs['pool_connections'] = pool_connections
+
+        if pool_maxsize is not None:
+            http_adapter_kwargs['pool_maxsize'] = pool_maxsize
+
+        if pool_block is not None:
+            http_adapter_kwargs['pool_block'] = pool_block
+
+        def create_sessions():
+            return self.create_sessions(
+                api_url, headers, http_adapter_kwargs, session=session,
+                session_http=session_http, json_codec=json_codec,
+                validator_cache=validator_cache, single_flight=single_flight,
+                rate_limiter=rate_limiter)
+
+        if share_transport and session is None and session_http is None:
+            if transport_registry is None:
+                transport_registry = default_registry
+            settings = dict(http_adapter_kwargs)
+            if 'max_retries' in settings:
+                settings['max_retries'] = get_retry_key(
+                    settings['max_retries'])
+            key = (api_url, auth_token, tuple(sorted(settings.items())),
+                   json_codec, validator_cache, single_flight, rate_limiter)
+            self.session, self.session_http = \
+                transport_registry.get_sessions(key, create_sessions)
+        else:
+            self.session, self.session_http = create_sessions()
+
+    @staticmethod
+    def create_sessions(api_url, headers, http_adapter_kwargs, session=None,
+                        session_http=None, json_codec=None,
+                        validator_cache=None, single_flight=None,
+                        rate_limiter=None):
+        """
+        Creates the sessions that aren't given, and mounts adapters created
+        with ``http_adapter_kwargs`` on the JSON session. Returns a
+        ``(session, session_http)`` tuple.
+        """
+        if session is None:
+            session = SeedJSONServiceClient(url=api_url,
+                                            headers=copy.deepcopy(headers),
+                                            json_codec=json_codec,
+                                            validator_cache=validator_cache,
+                                            single_flight=single_flight,
+                                            rate_limiter=rate_limiter)
+
+        if session_http is None:
+            session_http = SeedHTTPServiceClient(
+                url=api_url, headers=copy.deepcopy(headers))
+
         http = SeedHTTPAdapter(**http_adapter_kwargs)
         https = SeedHTTPAdapter(**http_adapter_kwargs)
-        self.session.mount('http://', http)
-        self.session.mount('https://', https)
+        session.mount('http://', http)
+        session.mount('https://', https)
+
+        return session, session_http
+
+    def pool_stats(self):
+        """
+        Returns the statistics of each of the connection pools used by this
+        client, keyed by ``scheme://host:port``.
+        """
+        stats = {}
+        for adapter in self.session.adapters.values():
+            if isinstance(adapter, SeedHTTPAdapter):
+                stats.update(adapter.pool_stats())
+        return stats
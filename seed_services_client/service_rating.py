@@ -8,9 +8,9 @@ class ServiceRatingApiClient(SeedServicesApiClient):
     """
 
     # Invites
-    def get_invites(self, params=None):
+    def get_invites(self, params=None, **kwargs):
         return {"results": get_paginated_response(self.session,
-                '/invite/', params=params)}
+                '/invite/', params=params, **kwargs)}
 
     def get_invite(self, invite_id):
         return self.session.get('/invite/%s/' % invite_id)
@@ -27,9 +27,9 @@ class ServiceRatingApiClient(SeedServicesApiClient):
         return {"success": True}
 
     # Ratings
-    def get_ratings(self, params=None):
+    def get_ratings(self, params=None, **kwargs):
         return {"results": get_paginated_response(self.session,
-                '/rating/', params=params)}
+                '/rating/', params=params, **kwargs)}
 
     def get_rating(self, rating_id):
         return self.session.get('/rating/%s/' % rating_id)
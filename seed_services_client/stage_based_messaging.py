@@ -1,3 +1,4 @@
+from .models import Message, Subscription
 from .seed_services import SeedServicesApiClient
 from .utils import get_paginated_response
 
@@ -18,52 +19,142 @@ class StageBasedMessagingApiClient(SeedServicesApiClient):
     :param HTTPServiceClient session_https:
         An instance of HTTPServiceClient to use
 
+    :param CatalogCache catalog_cache:
+        (optional) A cache for message sets, schedules and message set
+        languages, which are then only fetched again once they expire or the
+        cache is invalidated.
+
+    :param MessageIndex message_index:
+        (optional) An index of messages for :meth:`get_indexed_message`,
+        which is kept up to date with the messages created, updated and
+        deleted through this client.
+
     """
 
-    def get_schedules(self, params=None):
-        return {"results": get_paginated_response(self.session, '/schedule/',
-                params=params)}
+    def __init__(self, auth_token, api_url, session=None,
+                 catalog_cache=None, message_index=None, **kwargs):
+        super(StageBasedMessagingApiClient, self).__init__(
+            auth_token, api_url, session=session, **kwargs)
+        self.catalog_cache = catalog_cache
+        self.message_index = message_index
+
+    def get_catalog(self, key, loader):
+        if self.catalog_cache is None:
+            return loader()
+        return self.catalog_cache.get(key, loader)
+
+    def get_catalog_list(self, url, params=None, **kwargs):
+        """
+        Returns the results of all pages of a catalog list, from the catalog
+        cache if there is one. Lists fetched with any other arguments, which
+        change the form of the results, aren't cached.
+        """
+        if self.catalog_cache is None or kwargs:
+            return get_paginated_response(self.session, url, params=params,
+                                          **kwargs)
+
+        def load():
+            return list(get_paginated_response(self.session, url,
+                                               params=params))
+
+        key = (url, tuple(sorted((k, str(v))
+                                 for k, v in (params or {}).items())))
+        return iter(self.catalog_cache.get(key, load))
+
+    def get_schedules(self, params=None, **kwargs):
+        return {"results": self.get_catalog_list(
+            '/schedule/', params=params, **kwargs)}
 
     def get_schedule(self, schedule_id):
-        return self.session.get('/schedule/%s/' % schedule_id)
+        return self.get_catalog(
+            ('schedule', schedule_id),
+            lambda: self.session.get('/schedule/%s/' % schedule_id,
+                                     conditional=True))
 
-    def get_messagesets(self, params=None):
-        return {"results": get_paginated_response(self.session, '/messageset/',
-                params=params)}
+    def get_messagesets(self, params=None, **kwargs):
+        return {"results": self.get_catalog_list(
+            '/messageset/', params=params, **kwargs)}
 
     def get_messageset(self, messageset_id):
-        return self.session.get('/messageset/%s/' % messageset_id)
+        return self.get_catalog(
+            ('messageset', messageset_id),
+            lambda: self.session.get('/messageset/%s/' % messageset_id,
+                                     conditional=True))
 
     def get_messageset_languages(self):
-        return self.session.get('/messageset_languages/')
+        return self.get_catalog(
+            ('messageset_languages',),
+            lambda: self.session.get('/messageset_languages/',
+                                     conditional=True))
 
-    def get_subscription(self, subscription):
-        return self.session.get('/subscriptions/%s/' % subscription)
+    def get_subscription(self, subscription, model=False):
+        result = self.session.get('/subscriptions/%s/' % subscription)
+        return Subscription.from_dict(result) if model else result
 
-    def get_subscriptions(self, params=None):
+    def get_subscriptions(self, params=None, model=False, **kwargs):
+        model = Subscription if model else None
         return {"results": get_paginated_response(self.session,
-                '/subscriptions/', params=params)}
+                '/subscriptions/', params=params, model=model, **kwargs)}
 
-    def get_messages(self, params=None):
+    def get_messages(self, params=None, model=False, **kwargs):
         return {"results": get_paginated_response(self.session, '/message/',
-                params=params)}
-
-    def get_message(self, message_id):
-        return self.session.get('/message/%s/' % message_id)
+                params=params, model=Message if model else None, **kwargs)}
+
+    def get_message(self, message_id, model=False):
+        result = self.session.get('/message/%s/' % message_id)
+        return Message.from_dict(result) if model else result
+
+    def get_indexed_message(self, messageset, sequence_number, lang):
+        """
+        Returns the message of a message set with the sequence number and
+        language, or None if there isn't one.
+
+        With a message index, all of the messages of the message set are
+        loaded in one go the first time, and looked up locally after that.
+        """
+        if self.message_index is None:
+            params = {"messageset": messageset,
+                      "sequence_number": sequence_number, "lang": lang}
+            return next(self.get_messages(params=params)["results"], None)
+
+        index = self.message_index
+        if index.needs_refresh(messageset):
+            self.load_indexed_messages(messageset)
+        return index.get(messageset, sequence_number, lang)
+
+    def load_indexed_messages(self, messageset):
+        """
+        Loads the messages of a message set into the message index, only
+        fetching the messages updated since the last load if it has already
+        been loaded.
+        """
+        def fetch(params):
+            return self.get_messages(params=params)["results"]
+
+        self.message_index.refresh(messageset, fetch)
 
     def delete_message(self, message_id):
-        return self.session.delete('/message/%s/' % message_id)
+        result = self.session.delete('/message/%s/' % message_id)
+        if self.message_index is not None:
+            self.message_index.remove(message_id)
+        return result
 
     def update_message(self, message_id, data=None):
-        return self.session.patch(
+        result = self.session.patch(
             '/message/{0}/'.format(message_id),
             data=data)
+        if self.message_index is not None:
+            self.message_index.add(result)
+        return result
 
     def delete_binarycontent(self, binarycontent_id):
         return self.session.delete('/binarycontent/%s/' % binarycontent_id)
 
     def create_message(self, message):
-        return self.session.post('/message/', data=message)
+        result = self.session.post('/message/', data=message)
+        if self.message_index is not None:
+            self.message_index.add(result)
+        return result
 
     def create_binarycontent(self, content):
         return self.session_http.post('/binarycontent/', files=content).json()
@@ -78,9 +169,9 @@ class StageBasedMessagingApiClient(SeedServicesApiClient):
     def resend_subscription(self, subscription):
         return self.session.post('/subscriptions/%s/resend' % subscription)
 
-    def get_failed_tasks(self, params=None):
+    def get_failed_tasks(self, params=None, **kwargs):
         return {"results": get_paginated_response(self.session,
-                '/failed-tasks/', params=params)}
+                '/failed-tasks/', params=params, **kwargs)}
 
     def requeue_failed_tasks(self):
         return self.session.post('/failed-tasks/')
@@ -0,0 +1,179 @@
+import json
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS identities (
+    id TEXT PRIMARY KEY,
+    version INTEGER,
+    communicate_through TEXT,
+    operator TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    details TEXT,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS addresses (
+    identity_id TEXT NOT NULL,
+    address_type TEXT NOT NULL,
+    address TEXT NOT NULL,
+    is_default INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS addresses_address
+    ON addresses (address_type, address);
+CREATE INDEX IF NOT EXISTS addresses_identity_id
+    ON addresses (identity_id);
+CREATE INDEX IF NOT EXISTS identities_updated_at
+    ON identities (updated_at);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class IdentityMirror(object):
+    """
+    Mirrors the identities in the identity store into a local SQLite
+    database, so that they can be queried without fetching them all again.
+
+    The first sync fetches every identity. After that, only identities
+    updated since the last complete sync started are fetched, so that
+    identities updated on pages that were already read during a sync are
+    fetched again by the next one.
+
+    :param IdentityStoreApiClient client:
+        The client to fetch the identities with.
+
+    :param str path:
+        The path of the SQLite database file, or ``:memory:``.
+
+    :param str watermark_param:
+        (optional) The identities filter for identities updated at or after
+        a time, defaults to ``updated_from``.
+
+    :param int batch_size:
+        (optional) The number of identities to write in each transaction,
+        defaults to 500.
+
+    :param float overlap:
+        (optional) The number of seconds before the start of a sync to fetch
+        identities from on the next sync, to allow for the difference
+        between the local clock and the identity store's. Defaults to 300.
+
+    """
+
+    def __init__(self, client, path, watermark_param='updated_from',
+                 batch_size=500, overlap=300, clock=time.time):
+        self.client = client
+        self.watermark_param = watermark_param
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self.clock = clock
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    @property
+    def watermark(self):
+        row = self.db.execute(
+            "SELECT value FROM sync_state WHERE key = 'watermark'").fetchone()
+        return row[0] if row else None
+
+    def sync(self, params=None, **kwargs):
+        """
+        Fetches the identities updated since the last sync, or all of them
+        on the first sync, and writes them to the database. Returns the
+        number of identities written.
+
+        The watermark is only moved on once every identity has been written,
+        so an interrupted sync is picked up again from the same place.
+        """
+        params = dict(params or {})
+        watermark = self.watermark
+        if watermark is not None:
+            params[self.watermark_param] = watermark
+        started_at = self.clock()
+
+        identities = self.client.get_identities(
+            params=params, **kwargs)['results']
+        count = 0
+        batch = []
+        for identity in identities:
+            batch.append(identity)
+            if len(batch) >= self.batch_size:
+                count += self.write(batch)
+                batch = []
+        count += self.write(batch)
+
+        watermark = time.strftime(
+            '%Y-%m-%dT%H:%M:%SZ', time.gmtime(started_at - self.overlap))
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO sync_state (key, value) "
+                "VALUES ('watermark', ?)", (watermark,))
+        return count
+
+    def write(self, identities):
+        """
+        Writes identities to the database in a single transaction, replacing
+        any existing copies of them.
+        """
+        with self.db:
+            for identity in identities:
+                details = identity.get('details') or {}
+                self.db.execute(
+                    "INSERT OR REPLACE INTO identities (id, version, "
+                    "communicate_through, operator, created_at, updated_at, "
+                    "details, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+                        identity['id'],
+                        identity.get('version'),
+                        identity.get('communicate_through'),
+                        identity.get('operator'),
+                        identity.get('created_at'),
+                        identity.get('updated_at'),
+                        json.dumps(details),
+                        json.dumps(identity),
+                    ))
+                self.db.execute(
+                    "DELETE FROM addresses WHERE identity_id = ?",
+                    (identity['id'],))
+                self.db.executemany(
+                    "INSERT INTO addresses (identity_id, address_type, "
+                    "address, is_default) VALUES (?, ?, ?, ?)",
+                    self.get_addresses(identity['id'], details))
+        return len(identities)
+
+    @staticmethod
+    def get_addresses(identity_id, details):
+        addresses = details.get('addresses') or {}
+        for address_type, values in addresses.items():
+            for address, flags in (values or {}).items():
+                is_default = bool((flags or {}).get('default', False))
+                yield (identity_id, address_type, address, is_default)
+
+    def get_identity(self, identity_id):
+        """
+        Returns the mirrored identity with the id, or None if there isn't
+        one.
+        """
+        row = self.db.execute(
+            "SELECT data FROM identities WHERE id = ?",
+            (identity_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_identities_by_address(self, address_type, address):
+        """
+        Returns a list of the mirrored identities with the address.
+        """
+        rows = self.db.execute(
+            "SELECT data FROM identities WHERE id IN ("
+            "SELECT identity_id FROM addresses "
+            "WHERE address_type = ? AND address = ?)",
+            (address_type, address))
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM identities").fetchone()[0]
+
+    def close(self):
+        self.db.close()
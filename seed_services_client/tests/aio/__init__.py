@@ -0,0 +1,66 @@
+import asyncio
+import json
+from unittest import TestCase
+
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+except ImportError:  # pragma: no cover
+    web = None
+
+
+class AioTestCase(TestCase):
+    """
+    Runs a local HTTP server that replies to requests with the responses
+    added through :meth:`add_response`, and records the requests it gets.
+    """
+
+    def setUp(self):
+        if web is None:
+            self.skipTest('aiohttp is not installed')
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.responses = {}
+        self.calls = []
+
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', self.handle)
+        self.server = TestServer(app, loop=self.loop)
+        self.run_async(self.server.start_server())
+        self.url = str(self.server.make_url('/api/v1'))
+
+    def tearDown(self):
+        self.run_async(self.server.close())
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def add_response(self, method, path_qs, data=None, status=200,
+                     headers=None):
+        """
+        Adds a response for the given request. Responses added for the same
+        request are returned in turn, with the last one repeated.
+        """
+        self.responses.setdefault((method, path_qs), []).append(
+            (status, data, headers))
+
+    async def handle(self, request):
+        body = await request.read()
+        self.calls.append((request.method, request.path_qs, body))
+        responses = self.responses.get((request.method, request.path_qs))
+        if not responses:
+            status, data, headers = 404, {"detail": "Not found."}, None
+        elif len(responses) > 1:
+            status, data, headers = responses.pop(0)
+        else:
+            status, data, headers = responses[0]
+        if data is None:
+            return web.Response(status=status, headers=headers)
+        return web.Response(
+            status=status, text=json.dumps(data), headers=headers,
+            content_type='application/json')
+
+    async def collect(self, iterator):
+        return [item async for item in iterator]
@@ -0,0 +1,74 @@
+import asyncio
+from unittest import TestCase
+
+from seed_services_client.aio.coalescing import SingleFlight
+
+
+class TestSingleFlight(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def test_coalesces_concurrent_calls(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        async def func():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"id": 1}
+
+        async def call_all():
+            return await asyncio.gather(
+                *[single_flight.do('key', func) for _ in range(3)])
+
+        results = self.loop.run_until_complete(call_all())
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"id": 1}] * 3)
+        self.assertEqual(len(set(id(r) for r in results)), 3)
+        self.assertEqual(single_flight.stats(),
+                         {'calls': 1, 'coalesced': 2, 'in_flight': 0})
+
+    def test_followers_copy_result_before_leader_changes_it(self):
+        single_flight = SingleFlight()
+
+        async def func():
+            await asyncio.sleep(0.01)
+            return {"name": "original"}
+
+        async def leader():
+            result = await single_flight.do('key', func)
+            result["name"] = "changed by leader"
+            return result
+
+        async def call_all():
+            return await asyncio.gather(
+                leader(), single_flight.do('key', func),
+                single_flight.do('key', func))
+
+        results = self.loop.run_until_complete(call_all())
+
+        self.assertEqual(results, [
+            {"name": "changed by leader"},
+            {"name": "original"},
+            {"name": "original"},
+        ])
+
+    def test_error_raised_to_all_callers(self):
+        single_flight = SingleFlight()
+
+        async def func():
+            await asyncio.sleep(0.01)
+            raise ValueError()
+
+        async def call_all():
+            return await asyncio.gather(
+                *[single_flight.do('key', func) for _ in range(3)],
+                return_exceptions=True)
+
+        results = self.loop.run_until_complete(call_all())
+
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        self.assertEqual(single_flight.stats()['in_flight'], 0)
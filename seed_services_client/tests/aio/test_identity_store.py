@@ -0,0 +1,61 @@
+from seed_services_client.aio.identity_store import IdentityStoreApiClient
+from seed_services_client.aio.seed_services import Transport
+
+from . import AioTestCase
+
+
+class TestIdentityStoreClient(AioTestCase):
+
+    def setUp(self):
+        super(TestIdentityStoreClient, self).setUp()
+        self.transport = Transport()
+        self.api = IdentityStoreApiClient(
+            "NO", self.url, transport=self.transport)
+
+    def tearDown(self):
+        self.run_async(self.transport.close())
+        super(TestIdentityStoreClient, self).tearDown()
+
+    def test_get_identity_none(self):
+        result = self.run_async(self.api.get_identity("identity-1"))
+        self.assertEqual(result, None)
+        self.assertEqual(self.calls[0][:2],
+                         ('GET', '/api/v1/identities/identity-1/'))
+
+    def test_get_identity_found(self):
+        self.add_response('GET', '/api/v1/identities/identity-1/',
+                          {"id": "identity-1", "details": {}})
+
+        result = self.run_async(self.api.get_identity("identity-1"))
+
+        self.assertEqual(result, {"id": "identity-1", "details": {}})
+
+    def test_get_identity_address(self):
+        self.add_response(
+            'GET', '/api/v1/identities/identity-1/addresses/msisdn?'
+            'default=True', {"results": [{"address": "+27123"}]})
+
+        result = self.run_async(self.api.get_identity_address("identity-1"))
+
+        self.assertEqual(result, "+27123")
+
+    def test_get_identity_by_address(self):
+        self.add_response(
+            'GET', '/api/v1/identities/search/?'
+            'details__addresses__msisdn=%2B27123',
+            {"next": None, "results": [{"id": "identity-1"}]})
+
+        async def search():
+            result = await self.api.get_identity_by_address(
+                "msisdn", "+27123")
+            return await self.collect(result["results"])
+
+        self.assertEqual(self.run_async(search()), [{"id": "identity-1"}])
+
+    def test_create_identity(self):
+        self.add_response('POST', '/api/v1/identities/', {"id": "identity-1"},
+                          status=201)
+
+        result = self.run_async(self.api.create_identity({"details": {}}))
+
+        self.assertEqual(result, {"id": "identity-1"})
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import time
+
+from seed_services_client.aio.coalescing import SingleFlight
+from seed_services_client.aio.seed_services import (
+    HTTPServiceError,
+    SeedServicesApiClient,
+    Transport,
+)
+from seed_services_client.ratelimit import RateLimiter
+from seed_services_client.retry import RetryPolicy
+
+from . import AioTestCase
+
+
+class TestSeedServicesApiClient(AioTestCase):
+
+    def setUp(self):
+        super(TestSeedServicesApiClient, self).setUp()
+        self.transport = Transport()
+        self.api = SeedServicesApiClient(
+            "token", self.url, transport=self.transport)
+
+    def tearDown(self):
+        self.run_async(self.transport.close())
+        super(TestSeedServicesApiClient, self).tearDown()
+
+    def test_headers_are_set(self):
+        self.add_response('GET', '/api/v1/foo/', {"foo": "bar"})
+
+        self.assertEqual(self.run_async(self.api.session.get('/foo/')),
+                         {"foo": "bar"})
+        self.assertEqual(self.api.session.headers['Authorization'],
+                         'Token token')
+        self.assertTrue(self.api.session.headers['User-Agent'].startswith(
+            'seed-services-client v'))
+
+    def test_data_is_encoded(self):
+        self.add_response('POST', '/api/v1/foo/', {"id": 1}, status=201)
+
+        result = self.run_async(
+            self.api.session.post('/foo/', data={"foo": 1}))
+
+        self.assertEqual(result, {"id": 1})
+        method, path_qs, body = self.calls[0]
+        self.assertEqual(json.loads(body.decode('utf-8')), {"foo": 1})
+
+    def test_empty_response(self):
+        self.add_response('DELETE', '/api/v1/foo/1/', status=204)
+
+        result = self.run_async(self.api.session.delete('/foo/1/'))
+        self.assertEqual(result, None)
+
+    def test_unexpected_response(self):
+        with self.assertRaises(HTTPServiceError) as cm:
+            self.run_async(self.api.session.get('/foo/'))
+        self.assertEqual(cm.exception.status_code, 404)
+        self.assertEqual(cm.exception.details, {"detail": "Not found."})
+        self.assertEqual(cm.exception.response.status_code, 404)
+        self.assertEqual(cm.exception.response.url, self.url + '/foo/')
+        self.assertEqual(cm.exception.response.json(),
+                         {"detail": "Not found."})
+
+    def test_params_are_encoded(self):
+        self.add_response(
+            'GET', '/api/v1/foo/?active=True&limit=10&id=1&id=2', {"foo": 1})
+
+        result = self.run_async(self.api.session.get('/foo/', params={
+            'active': True, 'limit': 10, 'id': [1, 2], 'skip': None}))
+
+        self.assertEqual(result, {"foo": 1})
+
+    def test_expected_response_codes(self):
+        result = self.run_async(self.api.session.get(
+            '/foo/', expected_response_codes=[404]))
+        self.assertEqual(result, {"detail": "Not found."})
+
+    def test_clients_share_transport(self):
+        other = SeedServicesApiClient(
+            "token", self.url, transport=self.transport)
+        self.assertIs(other.session.transport, self.api.session.transport)
+
+    def test_retry_policy(self):
+        self.add_response('GET', '/api/v1/foo/', {}, status=503)
+        self.add_response('GET', '/api/v1/foo/', {}, status=429,
+                          headers={'Retry-After': '0'})
+        self.add_response('GET', '/api/v1/foo/', {"foo": "bar"})
+        api = SeedServicesApiClient(
+            "token", self.url, transport=self.transport,
+            retry_policy=RetryPolicy(backoff_factor=0))
+
+        result = self.run_async(api.session.get('/foo/'))
+
+        self.assertEqual(result, {"foo": "bar"})
+        self.assertEqual(len(self.calls), 3)
+
+    def test_retry_policy_exhausted(self):
+        self.add_response('GET', '/api/v1/foo/', {}, status=503)
+        api = SeedServicesApiClient(
+            "token", self.url, transport=self.transport,
+            retry_policy=RetryPolicy(total=2, backoff_factor=0))
+
+        with self.assertRaises(HTTPServiceError) as cm:
+            self.run_async(api.session.get('/foo/'))
+        self.assertEqual(cm.exception.status_code, 503)
+        self.assertEqual(len(self.calls), 3)
+
+    def test_retry_policy_non_idempotent(self):
+        self.add_response('POST', '/api/v1/foo/', {}, status=503)
+        api = SeedServicesApiClient(
+            "token", self.url, transport=self.transport,
+            retry_policy=RetryPolicy(backoff_factor=0))
+
+        with self.assertRaises(HTTPServiceError):
+            self.run_async(api.session.post('/foo/', data={}))
+        self.assertEqual(len(self.calls), 1)
+
+    def test_single_flight(self):
+        self.add_response('GET', '/api/v1/messageset/42/', {"id": 42})
+        single_flight = SingleFlight()
+        api = SeedServicesApiClient(
+            "token", self.url, transport=self.transport,
+            single_flight=single_flight)
+
+        async def get_all():
+            return await asyncio.gather(
+                *[api.session.get('/messageset/42/') for _ in range(3)])
+
+        results = self.run_async(get_all())
+
+        self.assertEqual(results, [{"id": 42}] * 3)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(single_flight.stats(),
+                         {'calls': 1, 'coalesced': 2, 'in_flight': 0})
+
+    def test_rate_limiter(self):
+        self.add_response('GET', '/api/v1/foo/', {"foo": "bar"})
+        api = SeedServicesApiClient(
+            "token", self.url, transport=self.transport,
+            rate_limiter=RateLimiter(rate=20, capacity=1))
+
+        async def get_all():
+            return await asyncio.gather(
+                *[api.session.get('/foo/') for _ in range(3)])
+
+        start = time.time()
+        results = self.run_async(get_all())
+
+        self.assertEqual(results, [{"foo": "bar"}] * 3)
+        self.assertEqual(len(self.calls), 3)
+        self.assertGreaterEqual(time.time() - start, 0.09)
@@ -0,0 +1,69 @@
+from seed_services_client.aio.seed_services import (
+    SeedServicesApiClient,
+    Transport,
+)
+from seed_services_client.aio.utils import get_paginated_response
+
+from . import AioTestCase
+
+
+class TestUtils(AioTestCase):
+
+    def setUp(self):
+        super(TestUtils, self).setUp()
+        self.transport = Transport()
+        self.api = SeedServicesApiClient(
+            "NO", self.url, transport=self.transport)
+
+    def tearDown(self):
+        self.run_async(self.transport.close())
+        super(TestUtils, self).tearDown()
+
+    def add_pages(self, pages, count=None):
+        for index, (query, ids) in enumerate(pages):
+            next_url = None
+            if index < len(pages) - 1:
+                next_url = self.url + "/tests/" + pages[index + 1][0]
+            data = {
+                "next": next_url,
+                "previous": None,
+                "results": [{"id": i} for i in ids]
+            }
+            if count is not None:
+                data["count"] = count
+            self.add_response('GET', "/api/v1/tests/" + query, data)
+
+    def test_get_paginated_response_multiple_pages(self):
+        """
+        The get_paginated_response function should return the content for all
+        the pages.
+        """
+        self.add_pages([
+            ("", [1, 2]),
+            ("?cursor=1", [3, 4]),
+            ("?cursor=2", [5]),
+        ])
+
+        res = get_paginated_response(self.api.session, "/tests/")
+
+        self.assertEqual([r["id"] for r in self.run_async(self.collect(res))],
+                         [1, 2, 3, 4, 5])
+        self.assertEqual(len(self.calls), 3)
+
+    def test_get_paginated_response_concurrency(self):
+        """
+        If the first page has a count, the remaining pages should be fetched
+        concurrently and returned in order.
+        """
+        self.add_pages([
+            ("", [1, 2]),
+            ("?page=2", [3, 4]),
+            ("?page=3", [5]),
+        ], count=5)
+
+        res = get_paginated_response(
+            self.api.session, "/tests/", concurrency=2)
+
+        self.assertEqual([r["id"] for r in self.run_async(self.collect(res))],
+                         [1, 2, 3, 4, 5])
+        self.assertEqual(len(self.calls), 3)
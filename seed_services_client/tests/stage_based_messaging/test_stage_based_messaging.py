@@ -1,6 +1,7 @@
 from unittest import TestCase
 import responses
 
+from seed_services_client.cache import CatalogCache, LRUCache
 from seed_services_client.stage_based_messaging \
     import StageBasedMessagingApiClient
 
@@ -525,3 +526,73 @@ class TestStageBasedMessagingClient(TestCase):
         self.assertEqual(result["accepted"], True)
         self.assertEqual(len(responses.calls), 1)
         self.assertEqual(responses.calls[0].request.url, url)
+
+    @responses.activate
+    def test_catalog_cache(self):
+        api = StageBasedMessagingApiClient(
+            "NO", "http://sbm.example.org/api/v1",
+            catalog_cache=CatalogCache(ttl=60))
+        responses.add(responses.GET,
+                      "http://sbm.example.org/api/v1/messageset/1/",
+                      json={"id": 1, "default_schedule": 2}, status=200)
+        responses.add(responses.GET,
+                      "http://sbm.example.org/api/v1/schedule/2/",
+                      json={"id": 2, "hour": "8"}, status=200)
+        responses.add(responses.GET,
+                      "http://sbm.example.org/api/v1/messageset/",
+                      json={"next": None, "previous": None,
+                            "results": [{"id": 1}]}, status=200)
+
+        for i in range(3):
+            messageset = api.get_messageset(1)
+            schedule = api.get_schedule(messageset["default_schedule"])
+            self.assertEqual(schedule["hour"], "8")
+            self.assertEqual(list(api.get_messagesets()["results"]),
+                             [{"id": 1}])
+        self.assertEqual(len(responses.calls), 3)
+
+        api.catalog_cache.invalidate()
+        api.get_messageset(1)
+        self.assertEqual(len(responses.calls), 4)
+
+    @responses.activate
+    def test_validator_cache(self):
+        api = StageBasedMessagingApiClient(
+            "NO", "http://sbm.example.org/api/v1",
+            validator_cache=LRUCache())
+        responses.add(responses.GET,
+                      "http://sbm.example.org/api/v1/messageset/1/",
+                      json={"id": 1}, headers={"ETag": '"v1"'}, status=200)
+        responses.add(responses.GET,
+                      "http://sbm.example.org/api/v1/subscriptions/",
+                      json={"next": None, "previous": None,
+                            "results": [{"id": "sub"}]},
+                      headers={"ETag": '"v2"'}, status=200)
+
+        api.get_messageset(1)
+        api.get_messageset(1)
+        list(api.get_subscriptions()["results"])
+
+        headers = [call.request.headers for call in responses.calls]
+        self.assertEqual([h.get("If-None-Match") for h in headers],
+                         [None, '"v1"', None])
+        self.assertEqual(len(api.session.validator_cache), 1)
+
+    @responses.activate
+    def test_catalog_cache_skipped_with_kwargs(self):
+        api = StageBasedMessagingApiClient(
+            "NO", "http://sbm.example.org/api/v1",
+            catalog_cache=CatalogCache(ttl=60))
+        responses.add(responses.GET,
+                      "http://sbm.example.org/api/v1/messageset/",
+                      json={"next": None, "previous": None,
+                            "results": [{"id": 1, "short_name": "a"}]},
+                      status=200)
+
+        records = list(api.get_messagesets(fields=["id"])["results"])
+        self.assertEqual([r.id for r in records], [1])
+        self.assertEqual(list(api.get_messagesets()["results"]),
+                         [{"id": 1, "short_name": "a"}])
+        self.assertEqual(list(api.get_messagesets()["results"]),
+                         [{"id": 1, "short_name": "a"}])
+        self.assertEqual(len(responses.calls), 2)
@@ -1,6 +1,11 @@
+import json
+import threading
+import time
+
 import responses
 
 from seed_services_client import StageBasedMessagingApiClient
+from seed_services_client.cache import MessageIndex
 from unittest import TestCase
 
 
@@ -125,3 +130,164 @@ class TestStageBasedMessagingClientMessage(TestCase):
         self.assertEqual(
             responses.calls[0].request.url,
             'http://sbm.example.org/api/v1/message/1/')
+
+
+def message(message_id, sequence_number, lang, updated_at):
+    return {
+        "id": message_id,
+        "messageset": 1,
+        "sequence_number": sequence_number,
+        "lang": lang,
+        "text_content": "message %s content" % message_id,
+        "updated_at": updated_at,
+    }
+
+
+class TestStageBasedMessagingClientMessageIndex(TestCase):
+
+    def setUp(self):
+        self.clock = [0]
+        self.api = StageBasedMessagingApiClient(
+            "token", "http://sbm.example.org/api/v1",
+            message_index=MessageIndex(refresh_interval=60,
+                                       clock=lambda: self.clock[0]))
+
+    def add_messages(self, query, messages):
+        responses.add(
+            responses.GET, "http://sbm.example.org/api/v1/message/" + query,
+            json={"next": None, "previous": None, "results": messages},
+            match_querystring=True)
+
+    @responses.activate
+    def test_get_indexed_message(self):
+        self.add_messages("?messageset=1", [
+            message(1, 1, "eng_ZA", "2016-09-23T14:12:09.876036Z"),
+            message(2, 1, "zul_ZA", "2016-09-24T14:12:09.876036Z"),
+            message(3, 2, "eng_ZA", "2016-09-23T14:12:09.876036Z"),
+        ])
+
+        self.assertEqual(
+            self.api.get_indexed_message(1, 1, "zul_ZA")["id"], 2)
+        self.assertEqual(
+            self.api.get_indexed_message(1, 2, "eng_ZA")["id"], 3)
+        self.assertEqual(self.api.get_indexed_message(1, 3, "eng_ZA"), None)
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_get_indexed_message_refresh(self):
+        self.add_messages("?messageset=1", [
+            message(1, 1, "eng_ZA", "2016-09-23T14:12:09.876036Z"),
+        ])
+        self.add_messages(
+            "?messageset=1&updated_at__gte=2016-09-23T14%3A12%3A09.876036Z", [
+                message(1, 2, "eng_ZA", "2016-09-25T14:12:09.876036Z"),
+            ])
+
+        self.api.get_indexed_message(1, 1, "eng_ZA")
+        self.clock[0] = 60
+
+        self.assertEqual(self.api.get_indexed_message(1, 1, "eng_ZA"), None)
+        self.assertEqual(
+            self.api.get_indexed_message(1, 2, "eng_ZA")["id"], 1)
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_index_updated_by_client(self):
+        self.add_messages("?messageset=1", [
+            message(1, 1, "eng_ZA", "2016-09-23T14:12:09.876036Z"),
+            message(2, 2, "eng_ZA", "2016-09-23T14:12:09.876036Z"),
+        ])
+        responses.add(responses.POST, "http://sbm.example.org/api/v1/message/",
+                      json=message(3, 3, "eng_ZA", None), status=201)
+        responses.add(responses.PATCH,
+                      "http://sbm.example.org/api/v1/message/1/",
+                      json=message(1, 4, "eng_ZA", None), status=200)
+        responses.add(responses.DELETE,
+                      "http://sbm.example.org/api/v1/message/2/", status=204)
+
+        self.api.get_indexed_message(1, 1, "eng_ZA")
+        self.api.create_message({"messageset": 1})
+        self.api.update_message(1, {"sequence_number": 4})
+        self.api.delete_message(2)
+
+        self.assertEqual(self.api.get_indexed_message(1, 1, "eng_ZA"), None)
+        self.assertEqual(self.api.get_indexed_message(1, 2, "eng_ZA"), None)
+        self.assertEqual(
+            self.api.get_indexed_message(1, 3, "eng_ZA")["id"], 3)
+        self.assertEqual(
+            self.api.get_indexed_message(1, 4, "eng_ZA")["id"], 1)
+        self.assertEqual(len(responses.calls), 4)
+
+        self.api.message_index.invalidate(1)
+        self.assertEqual(len(self.api.message_index), 0)
+
+    @responses.activate
+    def test_index_message_moved_to_other_messageset(self):
+        self.add_messages("?messageset=1", [
+            message(7, 1, "eng_ZA", "2016-09-23T14:12:09.876036Z"),
+        ])
+        moved = dict(message(7, 1, "eng_ZA", None), messageset=2)
+        responses.add(responses.PATCH,
+                      "http://sbm.example.org/api/v1/message/7/",
+                      json=moved, status=200)
+
+        self.api.get_indexed_message(1, 1, "eng_ZA")
+        self.api.update_message(7, {"messageset": 2})
+
+        self.assertEqual(self.api.get_indexed_message(1, 1, "eng_ZA"), None)
+        self.assertEqual(len(self.api.message_index), 0)
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_concurrent_loads_coalesced_without_locking_index(self):
+        index = self.api.message_index
+        checked = []
+
+        def get(request):
+            # The index isn't locked while the messages are fetched
+            check = threading.Thread(
+                target=lambda: checked.append(index.needs_refresh(2)))
+            check.start()
+            check.join(5)
+            deadline = time.time() + 5
+            while index._refreshes.coalesced < 2 and time.time() < deadline:
+                time.sleep(0.001)
+            return (200, {}, json.dumps({
+                "next": None, "previous": None, "results": [
+                    message(1, 1, "eng_ZA", "2016-09-23T14:12:09.876036Z"),
+                ]}))
+
+        responses.add_callback(
+            responses.GET, "http://sbm.example.org/api/v1/message/",
+            callback=get)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                self.api.get_indexed_message(1, 1, "eng_ZA")["id"]))
+            for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [1, 1, 1])
+        self.assertEqual(checked, [True])
+        self.assertEqual(len(responses.calls), 1)
+
+    def test_needs_refresh_not_loaded(self):
+        index = MessageIndex()
+        self.assertTrue(index.needs_refresh(1))
+        index.load(1, [])
+        self.assertFalse(index.needs_refresh(1))
+        index.invalidate()
+        self.assertTrue(index.needs_refresh(1))
+
+    @responses.activate
+    def test_get_indexed_message_without_index(self):
+        api = StageBasedMessagingApiClient(
+            "token", "http://sbm.example.org/api/v1")
+        self.add_messages("?messageset=1&sequence_number=2&lang=eng_ZA", [
+            message(3, 2, "eng_ZA", "2016-09-23T14:12:09.876036Z"),
+        ])
+
+        self.assertEqual(api.get_indexed_message(1, 2, "eng_ZA")["id"], 3)
@@ -0,0 +1,196 @@
+from unittest import TestCase
+
+from seed_services_client.cache import (
+    MISSING,
+    AddressIndex,
+    CatalogCache,
+    LRUCache,
+)
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache(TestCase):
+
+    def test_get_set(self):
+        cache = LRUCache()
+        self.assertIs(cache.get('a'), MISSING)
+        self.assertEqual(cache.get('a', 'default'), 'default')
+
+        cache.set('a', None)
+        self.assertEqual(cache.get('a'), None)
+        self.assertEqual(cache.stats(), {
+            'hits': 1, 'misses': 2, 'evictions': 0, 'size': 1, 'maxsize': 10000
+        })
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIs(cache.get('b'), MISSING)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = LRUCache(ttl=10, clock=clock)
+        cache.set('a', 1)
+        cache.set('b', 2, ttl=20)
+
+        clock.now = 10
+        self.assertIs(cache.get('a'), MISSING)
+        self.assertEqual(cache.get('b'), 2)
+        self.assertEqual(len(cache), 1)
+
+    def test_invalidate_tag(self):
+        cache = LRUCache()
+        cache.set('a', 1, tag='x')
+        cache.set('b', 2, tag='x')
+        cache.set('c', 3, tag='y')
+
+        cache.invalidate_tag('x')
+
+        self.assertIs(cache.get('a'), MISSING)
+        self.assertIs(cache.get('b'), MISSING)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_delete_and_clear(self):
+        cache = LRUCache()
+        cache.set('a', 1, tag='x')
+        cache.set('b', 2)
+
+        cache.delete('a')
+        self.assertIs(cache.get('a'), MISSING)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+
+class TestAddressIndex(TestCase):
+
+    def identity(self, identity_id, *msisdns):
+        return {"id": identity_id, "details": {"addresses": {
+            "msisdn": dict((msisdn, {}) for msisdn in msisdns)}}}
+
+    def test_set_and_get(self):
+        index = AddressIndex()
+        self.assertEqual(index.get('msisdn', '+27001'), None)
+
+        index.set('msisdn', '+27001', ['a', 'b'])
+        index.set('msisdn', '+27002', [])
+        self.assertEqual(index.get('msisdn', '+27001'), ('a', 'b'))
+        self.assertEqual(index.get('msisdn', '+27002'), None)
+        self.assertEqual(len(index), 1)
+
+        index.set('msisdn', '+27001', [])
+        self.assertEqual(index.get('msisdn', '+27001'), None)
+        self.assertEqual(len(index), 0)
+
+    def test_add_identity(self):
+        index = AddressIndex()
+        index.add_identity(self.identity('a', '+27001', '+27002'))
+        index.add_identity(self.identity('b', '+27001'))
+        index.add_identity(self.identity('b', '+27001'))
+        index.add_identity({"id": "c", "details": {}})
+
+        self.assertEqual(index.get('msisdn', '+27001'), ('a', 'b'))
+        self.assertEqual(index.get('msisdn', '+27002'), ('a',))
+
+    def test_add_identity_replaces_old_addresses(self):
+        index = AddressIndex()
+        index.set('msisdn', '+27001', ['a', 'b'])
+        index.add_identity(self.identity('a', '+27001', '+27002'))
+        index.add_identity(self.identity('a', '+27003'))
+
+        self.assertEqual(index.get('msisdn', '+27001'), ('b',))
+        self.assertEqual(index.get('msisdn', '+27002'), None)
+        self.assertEqual(index.get('msisdn', '+27003'), ('a',))
+
+    def test_remove_identity(self):
+        index = AddressIndex()
+        index.add_identity(self.identity('a', '+27001', '+27002'))
+        index.add_identity(self.identity('b', '+27001', '+27003'))
+        index.remove_identity('a')
+
+        self.assertEqual(index.get('msisdn', '+27001'), None)
+        self.assertEqual(index.get('msisdn', '+27002'), None)
+        self.assertEqual(index.get('msisdn', '+27003'), ('b',))
+
+        index.remove('msisdn', '+27003')
+        self.assertEqual(len(index), 0)
+
+    def test_evicts_least_recently_used(self):
+        index = AddressIndex(maxsize=2)
+        index.set('msisdn', '+27001', ['a'])
+        index.set('msisdn', '+27002', ['b'])
+        index.get('msisdn', '+27001')
+        index.set('msisdn', '+27003', ['c'])
+
+        self.assertEqual(index.get('msisdn', '+27001'), ('a',))
+        self.assertEqual(index.get('msisdn', '+27002'), None)
+        self.assertEqual(index.get('msisdn', '+27003'), ('c',))
+
+
+class TestCatalogCache(TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = CatalogCache(ttl=10, stale_ttl=20, clock=self.clock)
+        self.loads = []
+
+    def loader(self, value):
+        def load():
+            self.loads.append(value)
+            return value
+        return load
+
+    def test_fresh(self):
+        self.assertEqual(self.cache.get('a', self.loader(1)), 1)
+        self.clock.now = 9
+        self.assertEqual(self.cache.get('a', self.loader(2)), 1)
+        self.assertEqual(self.loads, [1])
+
+    def test_stale_while_revalidate(self):
+        self.cache.get('a', self.loader(1))
+        self.clock.now = 15
+        thread = self.cache.refresh_in_background
+        threads = []
+        self.cache.refresh_in_background = \
+            lambda *args: threads.append(thread(*args))
+
+        self.assertEqual(self.cache.get('a', self.loader(2)), 1)
+        threads[0].join()
+        self.assertEqual(self.cache.get('a', self.loader(3)), 2)
+        self.assertEqual(self.loads, [1, 2])
+
+    def test_stale_refresh_error(self):
+        def fail():
+            raise ValueError()
+
+        self.cache.get('a', self.loader(1))
+        self.clock.now = 15
+        self.cache.refresh_in_background('a', fail).join()
+        self.assertEqual(self.cache.get('a', self.loader(2)), 1)
+
+    def test_expired(self):
+        self.cache.get('a', self.loader(1))
+        self.clock.now = 30
+        self.assertEqual(self.cache.get('a', self.loader(2)), 2)
+        self.assertEqual(self.loads, [1, 2])
+
+    def test_invalidate(self):
+        self.cache.get('a', self.loader(1))
+        self.cache.get('b', self.loader(2))
+        self.cache.invalidate('a')
+        self.assertEqual(len(self.cache), 1)
+        self.cache.invalidate()
+        self.assertEqual(len(self.cache), 0)
@@ -0,0 +1,137 @@
+import threading
+import time
+from unittest import TestCase
+
+import responses
+
+from seed_services_client.coalescing import SingleFlight
+from seed_services_client.seed_services import SeedServicesApiClient
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.001)
+
+
+class TestSingleFlight(TestCase):
+
+    def call_concurrently(self, single_flight, func, count):
+        results = []
+        errors = []
+
+        def call():
+            try:
+                results.append(single_flight.do('key', func))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_coalesces_concurrent_calls(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        def func():
+            calls.append(1)
+            wait_for(lambda: single_flight.coalesced == 4)
+            return {"id": 1}
+
+        results, errors = self.call_concurrently(single_flight, func, 5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"id": 1}] * 5)
+        self.assertEqual(len(set(id(r) for r in results)), 5)
+        self.assertEqual(single_flight.stats(),
+                         {'calls': 1, 'coalesced': 4, 'in_flight': 0})
+
+    def test_followers_copy_result_before_leader_changes_it(self):
+        single_flight = SingleFlight()
+        original = {"name": "original"}
+        results = []
+
+        def func():
+            wait_for(lambda: single_flight.coalesced == 2)
+            return original
+
+        def call():
+            result = single_flight.do('key', func)
+            if result is original:
+                result["name"] = "changed by leader"
+            else:
+                results.append(result)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(original, {"name": "changed by leader"})
+        self.assertEqual(results, [{"name": "original"}] * 2)
+        self.assertIsNot(results[0], results[1])
+
+    def test_error_raised_to_all_callers(self):
+        single_flight = SingleFlight()
+
+        def func():
+            wait_for(lambda: single_flight.coalesced == 2)
+            raise ValueError()
+
+        results, errors = self.call_concurrently(single_flight, func, 3)
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 3)
+
+    def test_sequential_calls_not_coalesced(self):
+        single_flight = SingleFlight()
+        self.assertEqual(single_flight.do('key', lambda: 1), 1)
+        self.assertEqual(single_flight.do('key', lambda: 2), 2)
+        self.assertEqual(single_flight.stats()['calls'], 2)
+
+
+class TestClientSingleFlight(TestCase):
+
+    @responses.activate
+    def test_concurrent_gets_coalesced(self):
+        single_flight = SingleFlight()
+        api = SeedServicesApiClient("token", "http://api/",
+                                    single_flight=single_flight)
+
+        def get(request):
+            wait_for(lambda: single_flight.coalesced == 2)
+            return (200, {}, '{"id": 42}')
+
+        responses.add_callback(responses.GET, "http://api/messageset/42/",
+                               callback=get)
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    api.session.get('/messageset/42/')))
+            for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [{"id": 42}] * 3)
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_posts_not_coalesced(self):
+        single_flight = SingleFlight()
+        api = SeedServicesApiClient("token", "http://api/",
+                                    single_flight=single_flight)
+        responses.add(responses.POST, "http://api/things/", json={})
+
+        api.session.post('/things/', data={})
+        api.session.post('/things/', data={})
+
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(single_flight.stats()['calls'], 0)
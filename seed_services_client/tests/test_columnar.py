@@ -0,0 +1,58 @@
+import math
+from unittest import TestCase, skipIf
+
+from seed_services_client import columnar
+from seed_services_client.columnar import ColumnCollector, collect_columns
+from seed_services_client.models import Outbound
+
+OUTBOUNDS = [
+    {"to_addr": "+27001", "delivered": True, "attempts": 1, "cost": 0.5},
+    {"to_addr": "+27002", "delivered": False, "attempts": None},
+    Outbound(to_addr="+27003", delivered=True, attempts=3),
+]
+TYPES = {"delivered": "bool", "attempts": "int", "cost": "float"}
+FIELDS = ["to_addr", "delivered", "attempts", "cost"]
+
+
+class TestColumnCollector(TestCase):
+
+    def test_collect_columns(self):
+        collector = collect_columns(iter(OUTBOUNDS), FIELDS, types=TYPES)
+
+        self.assertEqual(len(collector), 3)
+        self.assertEqual(collector.columns["to_addr"],
+                         ["+27001", "+27002", "+27003"])
+        self.assertEqual(list(collector.columns["delivered"]), [1, 0, 1])
+        self.assertEqual(list(collector.columns["attempts"]), [1, 0, 3])
+        self.assertEqual(list(collector.valid["attempts"]), [1, 0, 1])
+        self.assertEqual(collector.columns["cost"][0], 0.5)
+        self.assertTrue(math.isnan(collector.columns["cost"][1]))
+        self.assertEqual(collector.nulls["cost"], 2)
+
+    def test_unknown_type(self):
+        collector = ColumnCollector(["to_addr"])
+        collector.append({"to_addr": "+27001"})
+        self.assertEqual(collector.columns["to_addr"], ["+27001"])
+
+    @skipIf(columnar.numpy is None, "numpy is not installed")
+    def test_to_numpy(self):
+        arrays = collect_columns(OUTBOUNDS, FIELDS, types=TYPES).to_numpy()
+
+        self.assertEqual(arrays["delivered"].tolist(), [True, False, True])
+        self.assertEqual(arrays["attempts"].tolist(), [1, None, 3])
+        self.assertEqual(arrays["to_addr"].tolist(),
+                         ["+27001", "+27002", "+27003"])
+
+    @skipIf(columnar.pyarrow is None, "pyarrow is not installed")
+    def test_to_arrow(self):
+        table = collect_columns(OUTBOUNDS, FIELDS, types=TYPES).to_arrow()
+
+        self.assertEqual(table.column_names, FIELDS)
+        self.assertEqual(table.column("attempts").to_pylist(), [1, None, 3])
+
+    @skipIf(columnar.pandas is None, "pandas is not installed")
+    def test_to_pandas(self):
+        df = collect_columns(OUTBOUNDS, FIELDS, types=TYPES).to_pandas()
+
+        self.assertEqual(list(df.columns), FIELDS)
+        self.assertEqual(len(df), 3)
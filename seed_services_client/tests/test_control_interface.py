@@ -1,6 +1,7 @@
 from unittest import TestCase
 import responses
 
+from seed_services_client.seed_services import SeedServicesApiClient
 from seed_services_client.control_interface import ControlInterfaceApiClient
 
 
@@ -10,6 +11,10 @@ class TestControlInterfaceClient(TestCase):
         self.api = ControlInterfaceApiClient("NO",
                                              "http://ci.example.org/api/v1")
 
+    def test_inherited_from_base_api_class(self):
+        self.assertTrue(
+            issubclass(ControlInterfaceApiClient, SeedServicesApiClient))
+
     @responses.activate
     def test_get_user_service_tokens_one_page(self):
         # setup
@@ -1,6 +1,7 @@
 from unittest import TestCase
 import responses
 
+from seed_services_client.seed_services import SeedServicesApiClient
 from seed_services_client.hub import HubApiClient
 
 
@@ -10,6 +11,9 @@ class TestHubClient(TestCase):
         self.api = HubApiClient("NO",
                                 "http://hub.example.org/api/v1")
 
+    def test_inherited_from_base_api_class(self):
+        self.assertTrue(issubclass(HubApiClient, SeedServicesApiClient))
+
     @responses.activate
     def test_get_registrations_one_page(self):
         # setup
@@ -1,8 +1,12 @@
+from demands import HTTPServiceError
 from mock import patch
 from unittest import TestCase
+import json
 import responses
 
+from seed_services_client.cache import AddressIndex, LRUCache
 from seed_services_client.identity_store import IdentityStoreApiClient
+from seed_services_client.models import Identity
 from seed_services_client.seed_services import SeedServicesApiClient
 
 
@@ -435,6 +439,31 @@ class TestIdentityStoreClient(TestCase):
         self.assertEqual(responses.calls[1].request.url,
                         "http://id.example.org/api/v1/identities/?cursor=1")  # noqa
 
+    @responses.activate
+    def test_identity_list_prefetch_pages(self):
+        # setup
+        responses.add(responses.GET,
+                      "http://id.example.org/api/v1/identities/",
+                      json={
+                          "next": "http://id.example.org/api/v1/identities/"
+                                  "?cursor=1",
+                          "previous": None,
+                          "results": [{"id": "identity-1"}]
+                      }, status=200, match_querystring=True)
+        responses.add(responses.GET,
+                      "http://id.example.org/api/v1/identities/?cursor=1",
+                      json={
+                          "next": None,
+                          "previous": None,
+                          "results": [{"id": "identity-2"}]
+                      }, status=200, match_querystring=True)
+        # Execute
+        result = self.api.get_identities(prefetch_pages=2)
+        # Check
+        self.assertEqual([r["id"] for r in result["results"]],
+                         ["identity-1", "identity-2"])
+        self.assertEqual(len(responses.calls), 2)
+
     @responses.activate
     def test_update_identity_details(self):
         # Setup
@@ -654,3 +683,423 @@ class TestIdentityStoreClient(TestCase):
             responses.calls[0].request.url,
             'http://id.example.org/api/v1/optin/'
         )
+
+    def cached_api(self):
+        return IdentityStoreApiClient(
+            "NO", "http://id.example.org/api/v1",
+            identity_cache=LRUCache(maxsize=10, ttl=60))
+
+    @responses.activate
+    def test_get_identity_cached(self):
+        api = self.cached_api()
+        responses.add(responses.GET,
+                      "http://id.example.org/api/v1/identities/uuid/",
+                      json={"id": "uuid"}, status=200)
+        responses.add(responses.GET,
+                      "http://id.example.org/api/v1/identities/missing/",
+                      json={"detail": "Not found."}, status=404)
+
+        self.assertEqual(api.get_identity("uuid"), {"id": "uuid"})
+        self.assertEqual(api.get_identity("uuid"), {"id": "uuid"})
+        self.assertEqual(api.get_identity("missing"), None)
+        self.assertEqual(api.get_identity("missing"), None)
+
+        self.assertEqual(len(responses.calls), 2)
+        stats = api.identity_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+
+    @responses.activate
+    def test_get_identity_address_cached(self):
+        api = self.cached_api()
+        url = ('http://id.example.org/api/v1/identities/uuid'
+               '/addresses/msisdn?default=True')
+        responses.add(responses.GET, url,
+                      json={'results': [{'address': '+27000000000'}]},
+                      status=200, match_querystring=True)
+
+        self.assertEqual(api.get_identity_address("uuid"), '+27000000000')
+        self.assertEqual(api.get_identity_address("uuid"), '+27000000000')
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_update_identity_invalidates_cache(self):
+        api = self.cached_api()
+        responses.add(responses.GET,
+                      "http://id.example.org/api/v1/identities/uuid/",
+                      json={"id": "uuid"}, status=200)
+        responses.add(responses.PATCH,
+                      "http://id.example.org/api/v1/identities/uuid/",
+                      json={"id": "uuid"}, status=200)
+
+        api.get_identity("uuid")
+        api.update_identity("uuid", data={"details": {}})
+        api.get_identity("uuid")
+
+        self.assertEqual([call.request.method for call in responses.calls],
+                         ['GET', 'PATCH', 'GET'])
+
+    @responses.activate
+    def test_create_optout_and_optin_invalidate_cache(self):
+        api = self.cached_api()
+        url = ('http://id.example.org/api/v1/identities/uuid'
+               '/addresses/msisdn?default=True')
+        responses.add(responses.GET, url,
+                      json={'results': [{'address': '+27000000000'}]},
+                      status=200, match_querystring=True)
+        responses.add(responses.POST, 'http://id.example.org/api/v1/optout/',
+                      json={}, status=201)
+        responses.add(responses.POST, 'http://id.example.org/api/v1/optin/',
+                      json={}, status=201)
+
+        api.get_identity_address("uuid")
+        api.create_optout({"identity": "uuid", "address": "+27000000000"})
+        api.get_identity_address("uuid")
+        api.create_optin({"identity": "uuid", "address": "+27000000000"})
+        api.get_identity_address("uuid")
+
+        self.assertEqual([call.request.method for call in responses.calls],
+                         ['GET', 'POST', 'GET', 'POST', 'GET'])
+
+    def indexed_api(self):
+        return IdentityStoreApiClient(
+            "NO", "http://id.example.org/api/v1",
+            identity_cache=LRUCache(maxsize=10, ttl=60),
+            address_index=AddressIndex())
+
+    @responses.activate
+    def test_get_identity_by_address_indexed(self):
+        api = self.indexed_api()
+        identity = {"id": "uuid", "details": {"addresses": {
+            "msisdn": {"+27001": {}}}}}
+        responses.add(
+            responses.GET,
+            "http://id.example.org/api/v1/identities/search/"
+            "?details__addresses__msisdn=%2B27001",
+            json={"next": None, "previous": None, "results": [identity]},
+            status=200, match_querystring=True)
+
+        for i in range(3):
+            result = api.get_identity_by_address("msisdn", "+27001")
+            self.assertEqual(list(result["results"]), [identity])
+
+        # The search fills in the index and caches the identity
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(api.address_index.get("msisdn", "+27001"),
+                         ("uuid",))
+
+    @responses.activate
+    def test_get_identity_fills_address_index(self):
+        api = self.indexed_api()
+        identity = {"id": "uuid", "details": {"addresses": {
+            "msisdn": {"+27001": {"default": True}}}}}
+        responses.add(responses.GET,
+                      "http://id.example.org/api/v1/identities/uuid/",
+                      json=identity, status=200)
+
+        api.get_identity("uuid")
+        result = api.get_identity_by_address("msisdn", "+27001")
+
+        self.assertEqual(list(result["results"]), [identity])
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_get_identity_by_address_index_missing_identity(self):
+        api = self.indexed_api()
+        api.address_index.set("msisdn", "+27001", ["gone"])
+        api.identity_cache.set(("identity", "gone"), None, tag="gone")
+        responses.add(
+            responses.GET,
+            "http://id.example.org/api/v1/identities/search/"
+            "?details__addresses__msisdn=%2B27001",
+            json={"next": None, "previous": None, "results": []},
+            status=200, match_querystring=True)
+
+        result = api.get_identity_by_address("msisdn", "+27001")
+
+        self.assertEqual(list(result["results"]), [])
+        self.assertEqual(api.address_index.get("msisdn", "+27001"), None)
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_get_identity_by_address_index_identity_not_cached(self):
+        api = self.indexed_api()
+        identity = {"id": "uuid", "details": {"addresses": {
+            "msisdn": {"+27001": {}}}}}
+        api.address_index.set("msisdn", "+27001", ["uuid"])
+        responses.add(
+            responses.GET,
+            "http://id.example.org/api/v1/identities/search/"
+            "?details__addresses__msisdn=%2B27001",
+            json={"next": None, "previous": None, "results": [identity]},
+            status=200, match_querystring=True)
+
+        result = api.get_identity_by_address("msisdn", "+27001")
+
+        # A single search instead of fetching the identity
+        self.assertEqual(list(result["results"]), [identity])
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(
+            responses.calls[0].request.path_url,
+            "/api/v1/identities/search/?details__addresses__msisdn=%2B27001")
+
+    def test_address_index_needs_identity_cache(self):
+        with self.assertRaises(ValueError):
+            IdentityStoreApiClient("NO", "http://id.example.org/api/v1",
+                                   address_index=AddressIndex())
+
+    @responses.activate
+    def test_get_identity_by_address_empty_search_not_indexed(self):
+        api = self.indexed_api()
+        identity = {"id": "uuid", "details": {"addresses": {
+            "msisdn": {"+27001": {}}}}}
+        url = ("http://id.example.org/api/v1/identities/search/"
+               "?details__addresses__msisdn=%2B27001")
+        responses.add(
+            responses.GET, url,
+            json={"next": None, "previous": None, "results": []},
+            status=200, match_querystring=True)
+        responses.add(
+            responses.GET, url,
+            json={"next": None, "previous": None, "results": [identity]},
+            status=200, match_querystring=True)
+
+        result = api.get_identity_by_address("msisdn", "+27001")
+        self.assertEqual(list(result["results"]), [])
+        result = api.get_identity_by_address("msisdn", "+27001")
+        self.assertEqual(list(result["results"]), [identity])
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_get_identity_by_address_indexed_with_fields(self):
+        api = self.indexed_api()
+        identity = {"id": "uuid", "version": 1, "details": {"addresses": {
+            "msisdn": {"+27001": {}}}}}
+        responses.add(
+            responses.GET,
+            "http://id.example.org/api/v1/identities/search/"
+            "?details__addresses__msisdn=%2B27001",
+            json={"next": None, "previous": None, "results": [identity]},
+            status=200, match_querystring=True)
+
+        for i in range(2):
+            result = api.get_identity_by_address(
+                "msisdn", "+27001", fields=["id", "version"])
+            self.assertEqual(list(result["results"]), [("uuid", 1)])
+
+        # Searches with fields don't use the index, but do fill it in
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(api.address_index.get("msisdn", "+27001"),
+                         ("uuid",))
+
+        result = api.get_identity_by_address(
+            "msisdn", "+27001", fields=["version"])
+        self.assertEqual(list(result["results"]), [(1,)])
+        self.assertEqual(api.address_index.get("msisdn", "+27001"),
+                         ("uuid",))
+
+    @responses.activate
+    def test_get_identity_by_address_index_address_changed(self):
+        api = self.indexed_api()
+        api.address_index.set("msisdn", "+27001", ["uuid"])
+        api.identity_cache.set(("identity", "uuid"), {
+            "id": "uuid", "details": {"addresses": {
+                "msisdn": {"+27999": {}}}}}, tag="uuid")
+        responses.add(
+            responses.GET,
+            "http://id.example.org/api/v1/identities/search/"
+            "?details__addresses__msisdn=%2B27001",
+            json={"next": None, "previous": None, "results": []},
+            status=200, match_querystring=True)
+
+        result = api.get_identity_by_address("msisdn", "+27001")
+
+        self.assertEqual(list(result["results"]), [])
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(api.address_index.get("msisdn", "+27001"), None)
+
+    @responses.activate
+    def test_update_identity_evicts_address_index(self):
+        api = self.indexed_api()
+        api.address_index.set("msisdn", "+27001", ["uuid"])
+        responses.add(responses.PATCH,
+                      "http://id.example.org/api/v1/identities/uuid/",
+                      json={"id": "uuid"}, status=200)
+
+        api.update_identity("uuid", data={"details": {}})
+
+        self.assertEqual(api.address_index.get("msisdn", "+27001"), None)
+
+    @responses.activate
+    def test_get_identities_bulk(self):
+        for uid in ["uuid-1", "uuid-2"]:
+            responses.add(responses.GET,
+                          "http://id.example.org/api/v1/identities/%s/" % uid,
+                          json={"id": uid}, status=200)
+        responses.add(responses.GET,
+                      "http://id.example.org/api/v1/identities/missing/",
+                      json={"detail": "Not found."}, status=404)
+        responses.add(responses.GET,
+                      "http://id.example.org/api/v1/identities/error/",
+                      json={"detail": "Server error"}, status=500)
+
+        result = self.api.get_identities_bulk(
+            ["uuid-1", "uuid-2", "missing", "uuid-1", "error"],
+            concurrency=2)
+
+        self.assertEqual(result["results"], {
+            "uuid-1": {"id": "uuid-1"},
+            "uuid-2": {"id": "uuid-2"},
+            "missing": None,
+        })
+        self.assertEqual(list(result["errors"].keys()), ["error"])
+        self.assertIsInstance(result["errors"]["error"], HTTPServiceError)
+        self.assertEqual(len(responses.calls), 4)
+
+    @responses.activate
+    def test_create_identities_bulk(self):
+        def create(request):
+            data = json.loads(request.body)
+            if data["details"]["name"] == "bad":
+                return (400, {}, json.dumps({"details": ["invalid"]}))
+            data["id"] = data["details"]["name"]
+            return (201, {}, json.dumps(data))
+
+        responses.add_callback(responses.POST,
+                               "http://id.example.org/api/v1/identities/",
+                               callback=create)
+
+        identities = ({"details": {"name": name}}
+                      for name in ["a", "bad", "c", "d"])
+        results = list(self.api.create_identities_bulk(
+            identities, concurrency=2, rate_limit=1000))
+
+        self.assertEqual([r["data"]["details"]["name"] for r in results],
+                         ["a", "bad", "c", "d"])
+        self.assertEqual([r["result"] and r["result"]["id"] for r in results],
+                         ["a", None, "c", "d"])
+        self.assertEqual(results[0]["error"], None)
+        self.assertIsInstance(results[1]["error"], HTTPServiceError)
+        self.assertEqual(len(responses.calls), 4)
+
+    def test_get_default_address(self):
+        identity = {"id": "uuid", "details": {"addresses": {"msisdn": {
+            "+27001": {"optedout": True, "default": True},
+            "+27002": {},
+            "+27003": {"default": True},
+        }}}}
+        self.assertEqual(
+            IdentityStoreApiClient.get_default_address(identity), "+27003")
+        self.assertEqual(
+            IdentityStoreApiClient.get_default_address(identity, "email"),
+            None)
+
+    @responses.activate
+    def test_get_identity_addresses(self):
+        api = self.cached_api()
+        responses.add(responses.GET,
+                      "http://id.example.org/api/v1/identities/cached/",
+                      json={"id": "cached", "details": {"addresses": {
+                          "msisdn": {"+27001": {"default": True}}}}},
+                      status=200)
+        api.get_identity("cached")
+        for uid, results in [("uuid-1", [{"address": "+27002"}]),
+                             ("uuid-2", [])]:
+            responses.add(
+                responses.GET,
+                "http://id.example.org/api/v1/identities/%s"
+                "/addresses/msisdn?default=True" % uid,
+                json={"results": results}, status=200, match_querystring=True)
+
+        result = api.get_identity_addresses(
+            ["cached", "uuid-1", "uuid-2", "uuid-1"], concurrency=2)
+
+        self.assertEqual(result, {"results": {
+            "cached": "+27001",
+            "uuid-1": "+27002",
+            "uuid-2": None,
+        }, "errors": {}})
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_get_identity_addresses_errors(self):
+        api = self.cached_api()
+        responses.add(responses.GET,
+                      "http://id.example.org/api/v1/identities/gone/",
+                      json={"detail": "Not found."}, status=404)
+        api.get_identity("gone")
+        responses.add(
+            responses.GET,
+            "http://id.example.org/api/v1/identities/uuid-1"
+            "/addresses/msisdn?default=True",
+            json={"results": [{"address": "+27001"}]}, status=200,
+            match_querystring=True)
+        responses.add(
+            responses.GET,
+            "http://id.example.org/api/v1/identities/broken"
+            "/addresses/msisdn?default=True",
+            json={"detail": "Error"}, status=500, match_querystring=True)
+
+        result = api.get_identity_addresses(["gone", "uuid-1", "broken"])
+
+        self.assertEqual(result["results"], {"gone": None, "uuid-1": "+27001"})
+        self.assertEqual(list(result["errors"]), ["broken"])
+        self.assertEqual(result["errors"]["broken"].response.status_code, 500)
+        self.assertEqual(len(responses.calls), 3)
+
+    def add_language_searches(self):
+        for language, ids in [("eng_ZA", ["uuid-1", "uuid-2"]),
+                              ("afr_ZA", ["uuid-2", "uuid-3"]),
+                              ("zul_ZA", [])]:
+            responses.add(
+                responses.GET,
+                "http://id.example.org/api/v1/identities/search/"
+                "?details__preferred_language=%s" % language,
+                json={"next": None, "previous": None,
+                      "results": [{"id": i, "version": 1} for i in ids]},
+                status=200, match_querystring=True)
+
+    @responses.activate
+    def test_search_identities_bulk(self):
+        self.add_language_searches()
+
+        result = self.api.search_identities_bulk(
+            "details__preferred_language",
+            ["eng_ZA", "afr_ZA", "zul_ZA", "eng_ZA"], concurrency=2)
+
+        self.assertEqual(sorted(i["id"] for i in result["results"]),
+                         ["uuid-1", "uuid-2", "uuid-3"])
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_search_identities_bulk_model_and_fields(self):
+        self.add_language_searches()
+
+        result = self.api.search_identities_bulk(
+            "details__preferred_language", ["eng_ZA", "afr_ZA"], model=True)
+        self.assertEqual(sorted(i.id for i in result["results"]),
+                         ["uuid-1", "uuid-2", "uuid-3"])
+
+        result = self.api.search_identities_bulk(
+            "details__preferred_language", ["eng_ZA", "afr_ZA"],
+            fields=["id"])
+        self.assertEqual(sorted(i.id for i in result["results"]),
+                         ["uuid-1", "uuid-2", "uuid-3"])
+
+        with self.assertRaises(ValueError):
+            self.api.search_identities_bulk(
+                "details__preferred_language", ["eng_ZA"],
+                fields=["version"])
+
+    @responses.activate
+    def test_get_identity_model(self):
+        api = self.cached_api()
+        identity = {"id": "uuid", "details": {"name": "test"}}
+        responses.add(responses.GET,
+                      "http://id.example.org/api/v1/identities/uuid/",
+                      json=identity, status=200)
+
+        result = api.get_identity("uuid", model=True)
+        self.assertIsInstance(result, Identity)
+        self.assertEqual(result.details, {"name": "test"})
+        self.assertEqual(api.get_identity("uuid"), identity)
+        self.assertEqual(len(responses.calls), 1)
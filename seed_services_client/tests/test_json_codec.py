@@ -0,0 +1,71 @@
+import datetime
+import json
+from unittest import TestCase, skipIf
+
+import responses
+
+from seed_services_client import json_codec
+from seed_services_client.json_codec import (
+    OrjsonCodec,
+    StdlibCodec,
+    get_codec,
+    set_default_codec,
+)
+from seed_services_client.seed_services import SeedServicesApiClient
+
+
+class TestJSONCodec(TestCase):
+
+    def tearDown(self):
+        set_default_codec(None)
+
+    def test_stdlib_codec(self):
+        codec = StdlibCodec()
+        date = datetime.date(2017, 1, 1)
+        self.assertEqual(json.loads(codec.dumps({"date": date})),
+                         {"date": "2017-01-01"})
+        self.assertEqual(codec.loads(b'{"a": 1}'), {"a": 1})
+        self.assertEqual(codec.loads('{"a": 1}'), {"a": 1})
+
+    def test_get_codec(self):
+        self.assertIsInstance(get_codec(), StdlibCodec)
+        self.assertIsInstance(get_codec('json'), StdlibCodec)
+        codec = StdlibCodec()
+        self.assertIs(get_codec(codec), codec)
+        self.assertRaises(ValueError, get_codec, 'unknown')
+
+    @skipIf(json_codec.orjson is None, "orjson is not installed")
+    def test_auto_codec(self):
+        self.assertIsInstance(get_codec('auto'), OrjsonCodec)
+
+    def test_set_default_codec(self):
+        codec = StdlibCodec()
+        set_default_codec(codec)
+        self.assertIs(get_codec(), codec)
+        set_default_codec(None)
+        self.assertIsInstance(get_codec(), StdlibCodec)
+
+    @responses.activate
+    def test_client_codec(self):
+        calls = []
+
+        class RecordingCodec(StdlibCodec):
+            def dumps(self, obj):
+                calls.append('dumps')
+                return super(RecordingCodec, self).dumps(obj)
+
+            def loads(self, data):
+                calls.append('loads')
+                return super(RecordingCodec, self).loads(data)
+
+        responses.add(responses.POST, "http://example.org/api/v1/things/",
+                      json={"id": 1}, status=201)
+        api = SeedServicesApiClient("NO", "http://example.org/api/v1",
+                                    json_codec=RecordingCodec())
+
+        result = api.session.post('/things/', data={"name": "thing"})
+
+        self.assertEqual(result, {"id": 1})
+        self.assertEqual(calls, ['dumps', 'loads'])
+        self.assertEqual(json.loads(responses.calls[0].request.body),
+                         {"name": "thing"})
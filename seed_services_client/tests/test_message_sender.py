@@ -5,6 +5,7 @@ import re
 
 from seed_services_client.message_sender \
     import MessageSenderApiClient
+from seed_services_client.models import Outbound
 
 
 class TestMessageSenderClient(TestCase):
@@ -148,6 +149,75 @@ class TestMessageSenderClient(TestCase):
             "http://ms.example.org/api/v1/outbound/?cursor=1"
         )
 
+    @responses.activate
+    def test_get_outbounds_concurrency(self):
+        for page, results in enumerate([['addr1', 'addr2'], ['addr3']]):
+            query = "?page=%s" % (page + 1) if page else ""
+            responses.add(
+                responses.GET,
+                "http://ms.example.org/api/v1/outbound/%s" % query,
+                json={
+                    "count": 3,
+                    "next": "http://ms.example.org/api/v1/outbound/?page=2"
+                            if not page else None,
+                    "previous": None,
+                    "results": [{'to_addr': addr} for addr in results],
+                },
+                status=200, content_type='application/json',
+                match_querystring=True
+            )
+        # Execute
+        result = self.api.get_outbounds(concurrency=4)
+
+        # Check
+        self.assertEqual(list(result["results"]), [
+            {'to_addr': 'addr1'}, {'to_addr': 'addr2'}, {'to_addr': 'addr3'}])
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_get_outbounds_fields(self):
+        responses.add(
+            responses.GET,
+            "http://ms.example.org/api/v1/outbound/",
+            json={
+                "next": None,
+                "previous": None,
+                "results": [
+                    {'to_addr': 'addr1', 'delivered': True, 'content': 'a'},
+                    {'to_addr': 'addr2', 'delivered': False, 'content': 'b'},
+                ],
+            },
+            status=200, content_type='application/json')
+        # Execute
+        result = self.api.get_outbounds(fields=['to_addr', 'delivered'])
+
+        # Check
+        results = list(result["results"])
+        self.assertEqual(results, [('addr1', True), ('addr2', False)])
+        self.assertEqual(results[1].delivered, False)
+
+    @responses.activate
+    def test_get_outbounds_model(self):
+        responses.add(
+            responses.GET,
+            "http://ms.example.org/api/v1/outbound/",
+            json={
+                "next": None,
+                "previous": None,
+                "results": [
+                    {'to_addr': 'addr1', 'metadata': {'voice': True}},
+                ],
+            },
+            status=200, content_type='application/json')
+        # Execute
+        result = self.api.get_outbounds(model=True)
+
+        # Check
+        [outbound] = list(result["results"])
+        self.assertIsInstance(outbound, Outbound)
+        self.assertEqual(outbound.to_addr, 'addr1')
+        self.assertEqual(outbound.metadata, {'voice': True})
+
     @responses.activate
     def test_get_inbounds_single_page(self):
         inbounds = {
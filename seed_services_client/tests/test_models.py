@@ -0,0 +1,58 @@
+from unittest import TestCase
+
+from seed_services_client.models import Identity, Outbound
+
+
+IDENTITY = {
+    "id": "4275a063-3129-45ac-853b-0d64aaefd8c5",
+    "version": 1,
+    "details": {
+        "default_addr_type": "msisdn",
+        "addresses": {"msisdn": {"+26773000000": {}}},
+    },
+    "communicate_through": None,
+    "operator": None,
+    "created_at": "2016-04-21T09:11:05.725680Z",
+    "created_by": 2,
+    "updated_at": "2016-06-15T15:09:05.333526Z",
+    "updated_by": 2,
+}
+
+
+class TestModels(TestCase):
+
+    def test_round_trip(self):
+        identity = Identity.from_dict(IDENTITY)
+        self.assertEqual(identity.to_dict(), IDENTITY)
+        self.assertEqual(identity.id, IDENTITY["id"])
+        self.assertEqual(identity.details, IDENTITY["details"])
+
+    def test_slots(self):
+        identity = Identity.from_dict(IDENTITY)
+        self.assertFalse(hasattr(identity, '__dict__'))
+        self.assertRaises(AttributeError, setattr, identity, 'other', 1)
+
+    def test_json_fields_kept_encoded(self):
+        identity = Identity.from_dict(IDENTITY)
+        self.assertIsInstance(identity._details, str)
+
+        details = identity.details
+        details["default_addr_type"] = "email"
+        self.assertEqual(identity.details["default_addr_type"], "msisdn")
+
+        identity.details = details
+        self.assertEqual(identity.details["default_addr_type"], "email")
+
+    def test_missing_and_extra_fields(self):
+        outbound = Outbound(id="1", to_addr="+27001", new_field=True)
+        self.assertEqual(outbound.content, None)
+        self.assertEqual(outbound.metadata, None)
+        self.assertRaises(AttributeError, getattr, outbound, 'new_field')
+        self.assertEqual(outbound.to_dict(), {
+            "id": "1", "to_addr": "+27001", "new_field": True})
+
+    def test_equality(self):
+        self.assertEqual(Outbound(id="1"), Outbound(id="1"))
+        self.assertNotEqual(Outbound(id="1"), Outbound(id="2"))
+        self.assertNotEqual(Outbound(id="1"), {"id": "1"})
+        self.assertEqual(repr(Outbound(id="1")), "<Outbound 1>")
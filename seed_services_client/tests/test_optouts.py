@@ -0,0 +1,161 @@
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+
+import responses
+from demands import HTTPServiceError
+
+from seed_services_client.identity_store import IdentityStoreApiClient
+from seed_services_client.optouts import BloomFilter, OptOutSnapshot
+
+OPTOUTS_URL = "http://id.example.org/api/v1/optouts/search/"
+
+
+def optout(identity, address, created_at):
+    return {
+        "id": "optout-%s" % identity,
+        "optout_type": "stop",
+        "identity": identity,
+        "address_type": "msisdn",
+        "address": address,
+        "created_at": created_at,
+    }
+
+
+class TestBloomFilter(TestCase):
+
+    def test_contains(self):
+        bloom = BloomFilter(capacity=100, error_rate=0.01)
+        for i in range(100):
+            bloom.add("+2700%d" % i)
+
+        for i in range(100):
+            self.assertTrue("+2700%d" % i in bloom)
+        false_positives = sum(
+            1 for i in range(1000) if "+2799%d" % i in bloom)
+        self.assertTrue(false_positives < 50)
+
+
+class TestOptOutSnapshot(TestCase):
+
+    def setUp(self):
+        self.api = IdentityStoreApiClient("NO", "http://id.example.org/api/v1")
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def add_optouts(self, query, optouts):
+        responses.add(
+            responses.GET, OPTOUTS_URL + query,
+            json={"next": None, "previous": None, "results": optouts},
+            match_querystring=True)
+
+    @responses.activate
+    def test_refresh(self):
+        self.add_optouts("?optout_type=stop", [
+            optout("id-1", "+27001", "2017-01-27T10:00:00.000000Z"),
+            optout("id-2", "+27002", "2017-01-28T10:00:00.000000Z"),
+        ])
+        self.add_optouts(
+            "?optout_type=stop"
+            "&created_at__gte=2017-01-28T10%3A00%3A00.000000Z",
+            [
+                optout("id-2", "+27002", "2017-01-28T10:00:00.000000Z"),
+                optout("id-3", "+27003", "2017-01-29T10:00:00.000000Z"),
+            ])
+
+        snapshot = OptOutSnapshot(self.api, params={"optout_type": "stop"})
+        self.assertEqual(snapshot.refresh(), 2)
+        self.assertTrue(snapshot.is_opted_out("+27001"))
+        self.assertTrue(snapshot.is_opted_out(identity="id-2"))
+        self.assertFalse(snapshot.is_opted_out("+27003"))
+
+        self.assertEqual(snapshot.refresh(), 2)
+        self.assertTrue(snapshot.is_opted_out("+27003"))
+        self.assertEqual(snapshot.watermark, "2017-01-29T10:00:00.000000Z")
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_refresh_fails_part_way(self):
+        responses.add(
+            responses.GET, OPTOUTS_URL + "?optout_type=stop",
+            json={"next": OPTOUTS_URL + "?optout_type=stop&cursor=2",
+                  "previous": None, "results": [
+                      optout("id-2", "+27002", "2017-01-28T10:00:00.000000Z"),
+                  ]},
+            match_querystring=True)
+        responses.add(
+            responses.GET, OPTOUTS_URL + "?optout_type=stop&cursor=2",
+            json={"detail": "Error"}, status=500, match_querystring=True)
+
+        snapshot = OptOutSnapshot(self.api, params={"optout_type": "stop"})
+        self.assertRaises(HTTPServiceError, snapshot.refresh)
+
+        # The opt outs that were fetched are kept, but the next refresh
+        # starts from the beginning again
+        self.assertTrue(snapshot.is_opted_out("+27002"))
+        self.assertEqual(snapshot.watermark, None)
+
+    def test_bloom_filter_grows(self):
+        snapshot = OptOutSnapshot(self.api, capacity=2)
+        for i in range(5):
+            snapshot.add(optout("id-%d" % i, "+2700%d" % i, None))
+
+        self.assertEqual(snapshot.bloom.capacity, 8)
+        for i in range(5):
+            self.assertTrue(snapshot.is_opted_out("+2700%d" % i))
+
+    def test_remove(self):
+        snapshot = OptOutSnapshot(self.api)
+        snapshot.add(optout("id-1", "+27001", None))
+        snapshot.remove(address="+27001", identity="id-1")
+
+        self.assertFalse(snapshot.is_opted_out("+27001"))
+        self.assertFalse(snapshot.is_opted_out(identity="id-1"))
+
+    def test_save_and_load(self):
+        path = os.path.join(self.tmpdir, "optouts.json")
+        snapshot = OptOutSnapshot(self.api, params={"optout_type": "stop"})
+        snapshot.add(optout("id-1", "+27001", "2017-01-27T10:00:00.000000Z"))
+        snapshot.save(path)
+
+        loaded = OptOutSnapshot(self.api, params={"optout_type": "stop"})
+        loaded.load(path)
+        self.assertTrue(loaded.is_opted_out("+27001"))
+        self.assertTrue(loaded.is_opted_out(identity="id-1"))
+        self.assertEqual(loaded.watermark, "2017-01-27T10:00:00.000000Z")
+        self.assertEqual(os.listdir(self.tmpdir), ["optouts.json"])
+
+        other = OptOutSnapshot(self.api, params={"optout_type": "forget"})
+        self.assertRaises(ValueError, other.load, path)
+
+    def test_save_waits_for_refresh(self):
+        path = os.path.join(self.tmpdir, "optouts.json")
+        fetching = threading.Event()
+        release = threading.Event()
+
+        class Client(object):
+            def get_optouts(self, params=None):
+                def results():
+                    yield optout("id-1", "+27001", None)
+                    fetching.set()
+                    release.wait(5)
+                    yield optout("id-2", "+27002", None)
+                return {"results": results()}
+
+        snapshot = OptOutSnapshot(Client())
+        refresh = threading.Thread(target=snapshot.refresh)
+        refresh.start()
+        fetching.wait(5)
+        save = threading.Thread(target=snapshot.save, args=(path,))
+        save.start()
+        save.join(0.05)
+        self.assertFalse(os.path.exists(path))
+
+        release.set()
+        refresh.join()
+        save.join()
+        loaded = OptOutSnapshot(Client())
+        loaded.load(path)
+        self.assertTrue(loaded.is_opted_out("+27002"))
@@ -0,0 +1,163 @@
+import threading
+from unittest import TestCase
+
+import responses
+
+from seed_services_client.ratelimit import RateLimiter, TokenBucket
+from seed_services_client.seed_services import SeedServicesApiClient
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket(TestCase):
+
+    def test_allows_burst_up_to_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, capacity=3, clock=clock)
+
+        self.assertEqual([bucket.reserve() for _ in range(3)], [0, 0, 0])
+        self.assertEqual(bucket.reserve(), 0.5)
+
+    def test_waiting_requests_spaced_evenly(self):
+        clock = FakeClock()
+        bucket = TokenBucket(4, capacity=1, clock=clock)
+
+        self.assertEqual([bucket.reserve() for _ in range(4)],
+                         [0, 0.25, 0.5, 0.75])
+
+    def test_refills_at_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2, capacity=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+
+        clock.now += 0.5
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0.5)
+
+    def test_does_not_refill_past_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(10, capacity=2, clock=clock)
+
+        clock.now += 60
+        self.assertEqual([bucket.reserve() for _ in range(3)],
+                         [0, 0, 0.1])
+
+    def test_capacity_defaults_to_rate(self):
+        self.assertEqual(TokenBucket(5).capacity, 5)
+        self.assertEqual(TokenBucket(0.5).capacity, 1)
+
+    def test_thread_safe(self):
+        clock = FakeClock()
+        bucket = TokenBucket(10, capacity=10, clock=clock)
+        delays = []
+
+        def reserve():
+            for _ in range(50):
+                delays.append(bucket.reserve())
+
+        threads = [threading.Thread(target=reserve) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(delays), 200)
+        self.assertAlmostEqual(max(delays), 19.0)
+        self.assertEqual(len(set(delays)), 191)
+
+
+class TestRateLimiter(TestCase):
+
+    def test_not_limited_by_default(self):
+        limiter = RateLimiter()
+        self.assertEqual(limiter.get_bucket('GET', '/identities/'), None)
+        self.assertEqual(limiter.reserve('GET', '/identities/'), 0)
+
+    def test_default_bucket(self):
+        limiter = RateLimiter(rate=1, clock=FakeClock())
+        self.assertEqual(limiter.reserve('GET', '/identities/'), 0)
+        self.assertEqual(limiter.reserve('POST', '/outbound/'), 1)
+
+    def test_endpoint_buckets(self):
+        limiter = RateLimiter(rate=10, limits={
+            '/outbound/': 5,
+            ('POST', '/outbound/'): (1, 2),
+            '/outbound/search/': 20,
+        })
+
+        default = limiter.get_bucket('GET', '/identities/')
+        outbound = limiter.get_bucket('GET', '/outbound/')
+        post_outbound = limiter.get_bucket('post', 'outbound/?to_addr=1')
+        search = limiter.get_bucket('POST', '/outbound/search/')
+
+        self.assertEqual((default.rate, default.capacity), (10, 10))
+        self.assertEqual((outbound.rate, outbound.capacity), (5, 5))
+        self.assertEqual((post_outbound.rate, post_outbound.capacity),
+                         (1, 2))
+        self.assertEqual((search.rate, search.capacity), (20, 20))
+
+    def test_endpoint_without_default(self):
+        limiter = RateLimiter(limits={'/outbound/': 5})
+        self.assertEqual(limiter.get_bucket('GET', '/identities/'), None)
+        self.assertNotEqual(limiter.get_bucket('GET', '/outbound/'), None)
+
+    def test_acquire_sleeps(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=2, capacity=1, clock=clock,
+                              sleep=clock.sleep)
+
+        for _ in range(3):
+            limiter.acquire('GET', '/identities/')
+
+        self.assertEqual(clock.sleeps, [0.5, 0.5])
+
+
+class TestClientRateLimiter(TestCase):
+
+    @responses.activate
+    def test_requests_limited(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=2, capacity=1, clock=clock,
+                              sleep=clock.sleep,
+                              limits={('POST', '/outbound/'): (1, 1)})
+        api = SeedServicesApiClient("token", "http://api/",
+                                    rate_limiter=limiter)
+        responses.add(responses.GET, "http://api/identities/", json={})
+        responses.add(responses.POST, "http://api/outbound/", json={})
+
+        api.session.get('/identities/')
+        api.session.get('/identities/')
+        api.session.post('/outbound/', data={})
+        api.session.post('/outbound/', data={})
+
+        self.assertEqual(len(responses.calls), 4)
+        self.assertEqual(clock.sleeps, [0.5, 1])
+
+    @responses.activate
+    def test_limiter_shared_between_clients(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=1, clock=clock, sleep=clock.sleep)
+        api1 = SeedServicesApiClient("token", "http://api1/",
+                                     rate_limiter=limiter)
+        api2 = SeedServicesApiClient("token", "http://api2/",
+                                     rate_limiter=limiter)
+        responses.add(responses.GET, "http://api1/identities/", json={})
+        responses.add(responses.GET, "http://api2/identities/", json={})
+
+        api1.session.get('/identities/')
+        api2.session.get('/identities/')
+
+        self.assertEqual(clock.sleeps, [1])
@@ -0,0 +1,62 @@
+from mock import patch
+from unittest import TestCase
+
+from seed_services_client.retry import RetryPolicy, get_retry_key
+
+
+class TestRetryPolicy(TestCase):
+
+    def test_retries_status_codes_for_idempotent_methods(self):
+        policy = RetryPolicy()
+
+        self.assertTrue(policy.is_retry('GET', 503))
+        self.assertTrue(policy.is_retry('PUT', 429))
+        self.assertTrue(policy.is_retry('DELETE', 502))
+        self.assertFalse(policy.is_retry('GET', 500))
+        self.assertFalse(policy.is_retry('POST', 503))
+        self.assertFalse(policy.is_retry('PATCH', 503))
+
+    def test_retry_non_idempotent(self):
+        policy = RetryPolicy(retry_non_idempotent=True)
+
+        self.assertTrue(policy.is_retry('POST', 503))
+        self.assertTrue(policy.is_method_retryable('PATCH'))
+
+    def test_custom_status_codes(self):
+        policy = RetryPolicy(status_forcelist=[500])
+
+        self.assertTrue(policy.is_retry('GET', 500))
+        self.assertFalse(policy.is_retry('GET', 503))
+
+    def test_new_keeps_settings(self):
+        policy = RetryPolicy(total=5, jitter=0.2).new(total=4)
+
+        self.assertEqual(policy.total, 4)
+        self.assertEqual(policy.jitter, 0.2)
+        self.assertFalse(policy.is_method_retryable('POST'))
+        self.assertFalse(policy.raise_on_status)
+
+    @patch('seed_services_client.retry.random.random')
+    def test_get_retry_backoff_time(self, patch_random):
+        patch_random.return_value = 0.5
+        policy = RetryPolicy(backoff_factor=1, jitter=0.5)
+
+        self.assertEqual(policy.get_retry_backoff_time(1), 0)
+        self.assertEqual(policy.get_retry_backoff_time(2), 1.5)
+        self.assertEqual(policy.get_retry_backoff_time(3), 3)
+
+    def test_get_retry_backoff_time_without_jitter(self):
+        policy = RetryPolicy(backoff_factor=1, jitter=0)
+
+        self.assertEqual(policy.get_retry_backoff_time(4), 8)
+        self.assertEqual(policy.get_retry_backoff_time(100), 120)
+
+    def test_get_retry_key(self):
+        self.assertEqual(get_retry_key(RetryPolicy(total=3)),
+                         get_retry_key(RetryPolicy(total=3)))
+        self.assertNotEqual(get_retry_key(RetryPolicy(total=3)),
+                            get_retry_key(RetryPolicy(total=3, jitter=0)))
+        self.assertNotEqual(
+            get_retry_key(RetryPolicy()),
+            get_retry_key(RetryPolicy(status_forcelist=[500])))
+        self.assertEqual(get_retry_key(3), 3)
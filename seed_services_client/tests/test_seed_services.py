@@ -1,12 +1,15 @@
 import responses
 
-from mock import patch
+from mock import Mock, patch
 from unittest import TestCase
 
 from seed_services_client.seed_services import (
     SeedHTTPAdapter,
     SeedServicesApiClient,
 )
+from seed_services_client.cache import LRUCache
+from seed_services_client.retry import RetryPolicy
+from seed_services_client.transport import TransportRegistry
 
 
 class TestSeedHTTPAdapter(TestCase):
@@ -17,6 +20,31 @@ class TestSeedHTTPAdapter(TestCase):
         adapter.send()
         patch_adapter_send.assert_called_with(timeout=10)
 
+    @patch("requests.adapters.HTTPAdapter.send")
+    def test_keeps_timeout_given_for_request(self, patch_adapter_send):
+        adapter = SeedHTTPAdapter(timeout=10)
+        adapter.send(timeout=(1, 2))
+        patch_adapter_send.assert_called_with(timeout=(1, 2))
+
+    @patch("requests.adapters.HTTPAdapter.send")
+    def test_uses_endpoint_timeouts(self, patch_adapter_send):
+        adapter = SeedHTTPAdapter(timeout=10, endpoint_timeouts=(
+            ('POST', '/api/reports/', (1, 600)),
+            (None, '/api/', 5),
+        ))
+
+        request = Mock(method='POST', url='http://api/api/reports/')
+        adapter.send(request, timeout=None)
+        patch_adapter_send.assert_called_with(request, timeout=(1, 600))
+
+        request = Mock(method='GET', url='http://api/api/reports/')
+        adapter.send(request, timeout=None)
+        patch_adapter_send.assert_called_with(request, timeout=5)
+
+        request = Mock(method='GET', url='http://api/other/')
+        adapter.send(request, timeout=None)
+        patch_adapter_send.assert_called_with(request, timeout=10)
+
 
 class TestSeedServicesApiClient(TestCase):
 
@@ -30,6 +58,20 @@ class TestSeedServicesApiClient(TestCase):
         self.api = SeedServicesApiClient("token", "http://api/", timeout=5)
         patch_adapter.assert_called_with(timeout=5)
 
+    @patch("seed_services_client.seed_services.SeedHTTPAdapter")
+    def test_endpoint_timeouts_passed_if_set(self, patch_adapter):
+        self.api = SeedServicesApiClient(
+            "token", "http://api/api/v1/", timeout=(1, 30),
+            endpoint_timeouts={
+                '/identities/': 2,
+                ('post', 'reports/'): [1, 600],
+            })
+        patch_adapter.assert_called_with(
+            timeout=(1, 30), endpoint_timeouts=(
+                (None, '/api/v1/identities/', 2),
+                ('POST', '/api/v1/reports/', (1, 600)),
+            ))
+
     def test_number_of_retries_default(self):
         self.api = SeedServicesApiClient("token", "http://api/")
 
@@ -46,6 +88,26 @@ class TestSeedServicesApiClient(TestCase):
         self.assertEqual(
             self.api.session.adapters['http://'].max_retries.total, 5)
 
+    @responses.activate
+    def test_number_of_retries_kept_after_request(self):
+        responses.add(responses.GET, 'http://api/foo', json={})
+
+        self.api = SeedServicesApiClient("token", "http://api/", retries=5)
+        self.api.session.get('/foo')
+
+        self.assertEqual(
+            self.api.session.adapters['http://'].max_retries.total, 5)
+
+    def test_retry_policy_can_be_configured(self):
+        policy = RetryPolicy(total=4)
+        self.api = SeedServicesApiClient(
+            "token", "http://api/", retries=2, retry_policy=policy)
+
+        self.assertIs(self.api.session.adapters['https://'].max_retries,
+                      policy)
+        self.assertIs(self.api.session.adapters['http://'].max_retries,
+                      policy)
+
     @responses.activate
     def test_user_agent_header_is_set(self):
         responses.add(responses.GET, 'http://api/foo')
@@ -59,3 +121,169 @@ class TestSeedServicesApiClient(TestCase):
             user_agent_header.startswith('seed-services-client v'),
             True
         )
+
+    @patch("seed_services_client.seed_services.SeedHTTPAdapter")
+    def test_pool_size_passed_if_set(self, patch_adapter):
+        self.api = SeedServicesApiClient(
+            "token", "http://api/", pool_connections=2, pool_maxsize=64,
+            pool_block=True)
+        patch_adapter.assert_called_with(
+            timeout=65, pool_connections=2, pool_maxsize=64, pool_block=True)
+
+    def test_pool_size_can_be_configured(self):
+        self.api = SeedServicesApiClient(
+            "token", "http://api/", pool_maxsize=64)
+
+        self.assertEqual(
+            self.api.session.adapters['https://']._pool_maxsize, 64)
+        self.assertEqual(
+            self.api.session.adapters['http://']._pool_maxsize, 64)
+
+    def test_pool_stats(self):
+        self.api = SeedServicesApiClient(
+            "token", "http://api/", pool_maxsize=1)
+        self.assertEqual(self.api.pool_stats(), {})
+
+        adapter = self.api.session.adapters['http://']
+        pool = adapter.poolmanager.connection_from_url('http://api/')
+        first = pool._get_conn()
+        second = pool._get_conn()
+        self.assertEqual(self.api.pool_stats()['http://api:80']['in_use'], 2)
+
+        pool._put_conn(first)
+        pool._put_conn(second)
+        self.assertEqual(self.api.pool_stats(), {
+            'http://api:80': {
+                'maxsize': 1,
+                'in_use': 0,
+                'idle': 1,
+                'discarded': 1,
+                'connections': 2,
+                'requests': 0,
+            }
+        })
+
+    def test_share_transport(self):
+        registry = TransportRegistry()
+        self.api = SeedServicesApiClient(
+            "token", "http://api/", share_transport=True,
+            transport_registry=registry)
+        other = SeedServicesApiClient(
+            "token", "http://api/", share_transport=True,
+            transport_registry=registry)
+
+        self.assertIs(self.api.session, other.session)
+        self.assertIs(self.api.session_http, other.session_http)
+
+    def test_share_transport_timeout_list(self):
+        registry = TransportRegistry()
+        self.api = SeedServicesApiClient(
+            "token", "http://api/", timeout=[1, 5], share_transport=True,
+            transport_registry=registry)
+        other = SeedServicesApiClient(
+            "token", "http://api/", timeout=(1, 5), share_transport=True,
+            transport_registry=registry)
+
+        self.assertIs(self.api.session, other.session)
+
+    def test_share_transport_same_retry_settings(self):
+        registry = TransportRegistry()
+        self.api = SeedServicesApiClient(
+            "token", "http://api/", share_transport=True,
+            retry_policy=RetryPolicy(total=3), transport_registry=registry)
+        other = SeedServicesApiClient(
+            "token", "http://api/", share_transport=True,
+            retry_policy=RetryPolicy(total=3), transport_registry=registry)
+        different = SeedServicesApiClient(
+            "token", "http://api/", share_transport=True,
+            retry_policy=RetryPolicy(total=5), transport_registry=registry)
+
+        self.assertIs(self.api.session, other.session)
+        self.assertIsNot(self.api.session, different.session)
+        self.assertEqual(len(registry), 2)
+
+    def test_share_transport_different_settings(self):
+        registry = TransportRegistry()
+        self.api = SeedServicesApiClient(
+            "token", "http://api/", share_transport=True,
+            transport_registry=registry)
+        other_token = SeedServicesApiClient(
+            "other", "http://api/", share_transport=True,
+            transport_registry=registry)
+        other_timeout = SeedServicesApiClient(
+            "token", "http://api/", timeout=5, share_transport=True,
+            transport_registry=registry)
+
+        self.assertIsNot(self.api.session, other_token.session)
+        self.assertIsNot(self.api.session, other_timeout.session)
+        self.assertEqual(len(registry), 3)
+
+    def test_transport_not_shared_by_default(self):
+        self.api = SeedServicesApiClient("token", "http://api/")
+        other = SeedServicesApiClient("token", "http://api/")
+
+        self.assertIsNot(self.api.session, other.session)
+
+    @responses.activate
+    def test_validator_cache(self):
+        def get(request):
+            if request.headers.get('If-None-Match') == '"v1"':
+                return (304, {}, '')
+            return (200, {'ETag': '"v1"'}, '{"name": "messageset"}')
+
+        responses.add_callback(responses.GET, "http://api/messageset/1/",
+                               callback=get)
+        self.api = SeedServicesApiClient(
+            "token", "http://api/", validator_cache=LRUCache())
+
+        for i in range(2):
+            self.assertEqual(
+                self.api.session.get('/messageset/1/', conditional=True),
+                {"name": "messageset"})
+
+        self.assertEqual([call.response.status_code
+                          for call in responses.calls], [200, 304])
+        self.assertNotIn('If-None-Match', responses.calls[0].request.headers)
+        self.assertEqual(responses.calls[1].request.headers['If-None-Match'],
+                         '"v1"')
+
+    @responses.activate
+    def test_validator_cache_last_modified(self):
+        modified = 'Wed, 21 Oct 2015 07:28:00 GMT'
+        responses.add(responses.GET, "http://api/schedule/1/?a=1",
+                      json={"id": 1}, headers={'Last-Modified': modified},
+                      match_querystring=True)
+        responses.add(responses.GET, "http://api/schedule/1/?a=2",
+                      json={"id": 2}, match_querystring=True)
+        self.api = SeedServicesApiClient(
+            "token", "http://api/", validator_cache=LRUCache())
+
+        self.api.session.get('/schedule/1/', params={'a': 1},
+                             conditional=True)
+        self.api.session.get('/schedule/1/', params={'a': 2},
+                             conditional=True)
+        self.api.session.get('/schedule/1/', params={'a': 2},
+                             conditional=True)
+        self.api.session.get('/schedule/1/', params={'a': 1},
+                             conditional=True)
+
+        headers = [call.request.headers for call in responses.calls]
+        self.assertEqual([h.get('If-Modified-Since') for h in headers],
+                         [None, None, None, modified])
+        self.assertEqual(len(self.api.session.validator_cache), 1)
+
+    @responses.activate
+    def test_validator_cache_only_conditional_gets(self):
+        responses.add(responses.GET, "http://api/message/",
+                      json={"next": None, "results": []},
+                      headers={'ETag': '"v1"'})
+        self.api = SeedServicesApiClient(
+            "token", "http://api/", validator_cache=LRUCache())
+
+        self.api.session.get('/message/')
+        self.api.session.get('/message/')
+
+        headers = [call.request.headers for call in responses.calls]
+        self.assertEqual([h.get('If-None-Match') for h in headers],
+                         [None, None])
+        self.assertEqual(len(self.api.session.validator_cache), 0)
@@ -0,0 +1,81 @@
+from unittest import TestCase
+
+import responses
+
+from seed_services_client.identity_store import IdentityStoreApiClient
+from seed_services_client.sync import IdentityMirror
+
+IDENTITIES_URL = "http://id.example.org/api/v1/identities/"
+
+
+def identity(identity_id, msisdn, updated_at, version=1):
+    return {
+        "id": identity_id,
+        "version": version,
+        "details": {
+            "default_addr_type": "msisdn",
+            "addresses": {"msisdn": {msisdn: {"default": True}}},
+        },
+        "communicate_through": None,
+        "operator": None,
+        "created_at": "2016-04-21T09:11:05.725680Z",
+        "updated_at": updated_at,
+    }
+
+
+class TestIdentityMirror(TestCase):
+
+    def setUp(self):
+        self.api = IdentityStoreApiClient("NO", "http://id.example.org/api/v1")
+        self.clock = [1466176145.0]  # 2016-06-17T15:09:05Z
+        self.mirror = IdentityMirror(self.api, ":memory:", batch_size=2,
+                                     overlap=60, clock=lambda: self.clock[0])
+        self.addCleanup(self.mirror.close)
+
+    def add_identities(self, query, identities):
+        responses.add(
+            responses.GET, IDENTITIES_URL + query,
+            json={"next": None, "previous": None, "results": identities},
+            match_querystring=True)
+
+    @responses.activate
+    def test_sync(self):
+        self.add_identities("", [
+            identity("id-1", "+27001", "2016-06-15T15:09:05.333526Z"),
+            identity("id-2", "+27002", "2016-06-17T15:09:05.333526Z"),
+            identity("id-3", "+27002", "2016-06-16T15:09:05.333526Z"),
+        ])
+
+        self.assertEqual(self.mirror.sync(), 3)
+        self.assertEqual(self.mirror.count(), 3)
+        # The watermark is the start of the sync, less the overlap
+        self.assertEqual(self.mirror.watermark, "2016-06-17T15:08:05Z")
+        self.assertEqual(self.mirror.get_identity("id-1")["id"], "id-1")
+        self.assertEqual(self.mirror.get_identity("missing"), None)
+        self.assertEqual(
+            sorted(i["id"] for i in self.mirror.get_identities_by_address(
+                "msisdn", "+27002")),
+            ["id-2", "id-3"])
+
+    @responses.activate
+    def test_sync_incremental(self):
+        self.add_identities("", [
+            identity("id-1", "+27001", "2016-06-15T15:09:05.333526Z"),
+        ])
+        self.add_identities(
+            "?updated_from=2016-06-17T15%3A08%3A05Z", [
+                identity("id-1", "+27009", "2016-06-18T15:09:05.333526Z",
+                         version=2),
+            ])
+
+        self.mirror.sync()
+        self.clock[0] += 86400
+        self.assertEqual(self.mirror.sync(), 1)
+
+        self.assertEqual(self.mirror.count(), 1)
+        self.assertEqual(self.mirror.get_identity("id-1")["version"], 2)
+        self.assertEqual(
+            self.mirror.get_identities_by_address("msisdn", "+27001"), [])
+        self.assertEqual(
+            len(self.mirror.get_identities_by_address("msisdn", "+27009")), 1)
+        self.assertEqual(self.mirror.watermark, "2016-06-18T15:08:05Z")
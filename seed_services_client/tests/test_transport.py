@@ -0,0 +1,31 @@
+from mock import Mock
+from unittest import TestCase
+
+from seed_services_client.transport import TransportRegistry
+
+
+class TestTransportRegistry(TestCase):
+
+    def test_factory_called_once_per_key(self):
+        registry = TransportRegistry()
+        factory = Mock(side_effect=lambda: (Mock(), Mock()))
+
+        first = registry.get_sessions('key', factory)
+        second = registry.get_sessions('key', factory)
+        other = registry.get_sessions('other', factory)
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertEqual(factory.call_count, 2)
+        self.assertEqual(len(registry), 2)
+
+    def test_clear(self):
+        registry = TransportRegistry()
+        session, session_http = registry.get_sessions(
+            'key', lambda: (Mock(), Mock()))
+
+        registry.clear()
+
+        session.close.assert_called_once_with()
+        session_http.close.assert_called_once_with()
+        self.assertEqual(len(registry), 0)
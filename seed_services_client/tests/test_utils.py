@@ -1,7 +1,18 @@
 import responses
+import time
+from demands import HTTPServiceError
 from unittest import TestCase
+from seed_services_client.models import Outbound
 from seed_services_client.seed_services import SeedServicesApiClient
-from seed_services_client.utils import get_paginated_response
+from seed_services_client.utils import (
+    concurrent_chain,
+    get_endpoint_timeout,
+    get_paginated_response,
+    iter_json_results,
+    resolve_endpoint_timeouts,
+    throttle,
+    unique,
+)
 
 
 class TestApiClient(SeedServicesApiClient):
@@ -13,6 +24,74 @@ class TestUtils(TestCase):
         self.api = TestApiClient(
             "NO", "http://test.example.org/api/v1")
 
+    def test_concurrent_chain(self):
+        """
+        The items of every iterator should be returned.
+        """
+        results = concurrent_chain(
+            lambda n: iter(range(n)), [1, 2, 3], concurrency=2, buffer_size=1)
+        self.assertEqual(sorted(results), [0, 0, 0, 1, 1, 2])
+
+    def test_concurrent_chain_error(self):
+        """
+        An exception raised by a call should be raised to the caller.
+        """
+        def fail(n):
+            yield n
+            raise ValueError(n)
+
+        results = concurrent_chain(fail, [1, 2], concurrency=2)
+        self.assertRaises(ValueError, list, results)
+
+    def test_throttle(self):
+        """
+        Calls over the rate should wait for their turn.
+        """
+        now = [100.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+
+        throttled = throttle(lambda x: x * 2, 4, clock=lambda: now[0],
+                             sleep=sleep)
+        self.assertEqual([throttled(i) for i in range(3)], [0, 2, 4])
+        self.assertEqual(sleeps, [0.25, 0.5])
+
+        now[0] = 101.0
+        throttled(3)
+        self.assertEqual(len(sleeps), 2)
+
+    def test_unique(self):
+        """
+        Duplicate items should be skipped, keeping the original order.
+        """
+        self.assertEqual(list(unique([3, 1, 3, 2, 1])), [3, 1, 2])
+
+    def test_endpoint_timeouts(self):
+        """
+        The most specific endpoint timeout that matches a request should be
+        used, or the default if none of them match.
+        """
+        timeouts = resolve_endpoint_timeouts(
+            "http://test.example.org/api/v1", {
+                "/tests/": 1,
+                "/tests/slow/": 2,
+                ("GET", "/tests/slow/"): 3,
+            })
+
+        self.assertEqual(get_endpoint_timeout(
+            timeouts, "GET", "http://test.example.org/api/v1/tests/slow/1/"),
+            3)
+        self.assertEqual(get_endpoint_timeout(
+            timeouts, "POST", "http://test.example.org/api/v1/tests/slow/"),
+            2)
+        self.assertEqual(get_endpoint_timeout(
+            timeouts, "GET", "http://test.example.org/api/v1/tests/?a=1"), 1)
+        self.assertEqual(get_endpoint_timeout(
+            timeouts, "GET", "http://test.example.org/api/v1/other/",
+            default=(1, 5)), (1, 5))
+
     @responses.activate
     def test_get_paginated_response_single_page(self):
         """
@@ -95,3 +174,262 @@ class TestUtils(TestCase):
             {"id": 4, "content": "content_for_4"},
             {"id": 5, "content": "content_for_5"},
         ])
+
+    def add_pages(self, count):
+        for cursor in range(count):
+            next_url = None
+            if cursor < count - 1:
+                next_url = "http://test.example.org/api/v1/tests/?cursor=%s" \
+                    % (cursor + 1)
+            url = "http://test.example.org/api/v1/tests/"
+            if cursor > 0:
+                url += "?cursor=%s" % cursor
+            responses.add(
+                responses.GET, url,
+                json={
+                    "next": next_url,
+                    "previous": None,
+                    "results": [{"id": cursor * 2 + 1}, {"id": cursor * 2 + 2}]
+                },
+                status=200, content_type='application/json',
+                match_querystring=True
+            )
+
+    @responses.activate
+    def test_get_paginated_response_prefetch_pages(self):
+        """
+        Prefetching pages should return the content for all the pages in
+        their original order.
+        """
+        self.add_pages(3)
+
+        res = get_paginated_response(
+            self.api.session, "/tests/", prefetch_pages=2)
+        self.assertEqual(
+            [r["id"] for r in res], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_get_paginated_response_prefetch_pages_closed_early(self):
+        """
+        Closing the iterator early should stop fetching further pages.
+        """
+        self.add_pages(5)
+
+        res = get_paginated_response(
+            self.api.session, "/tests/", prefetch_pages=1)
+        self.assertEqual(next(res), {"id": 1})
+        res.close()
+        # Give the background thread a chance to notice that it was stopped
+        time.sleep(0.3)
+
+        # At most the current page, one buffered page and one page that was
+        # waiting for space in the buffer should have been fetched
+        self.assertTrue(len(responses.calls) <= 3)
+
+    @responses.activate
+    def test_get_paginated_response_prefetch_pages_error(self):
+        """
+        Errors raised while fetching pages in the background should be
+        raised to the caller once it reaches that page.
+        """
+        responses.add(
+            responses.GET,
+            "http://test.example.org/api/v1/tests/",
+            json={
+                "next": "http://test.example.org/api/v1/tests/?cursor=1",
+                "previous": None,
+                "results": [{"id": 1}]
+            },
+            status=200, content_type='application/json',
+            match_querystring=True
+        )
+        responses.add(
+            responses.GET,
+            "http://test.example.org/api/v1/tests/?cursor=1",
+            json={"detail": "Server error"},
+            status=500, content_type='application/json',
+            match_querystring=True
+        )
+
+        res = get_paginated_response(
+            self.api.session, "/tests/", prefetch_pages=2)
+        self.assertEqual(next(res), {"id": 1})
+        self.assertRaises(HTTPServiceError, next, res)
+
+    def add_counted_pages(self, pages):
+        """
+        Adds a page of results with a total count for each ``(query, ids)``
+        tuple in ``pages``, each linking to the next page.
+        """
+        count = sum(len(ids) for _, ids in pages)
+        for index, (query, ids) in enumerate(pages):
+            next_url = None
+            if index < len(pages) - 1:
+                next_url = "http://test.example.org/api/v1/tests/" + \
+                    pages[index + 1][0]
+            responses.add(
+                responses.GET, "http://test.example.org/api/v1/tests/" + query,
+                json={
+                    "count": count,
+                    "next": next_url,
+                    "previous": None,
+                    "results": [{"id": i} for i in ids]
+                },
+                status=200, content_type='application/json',
+                match_querystring=True
+            )
+
+    @responses.activate
+    def test_get_paginated_response_concurrency_page_number(self):
+        """
+        If the first page has a count and uses page numbers, the remaining
+        pages should be fetched concurrently and returned in order.
+        """
+        self.add_counted_pages([
+            ("", [1, 2]),
+            ("?page=2", [3, 4]),
+            ("?page=3", [5, 6]),
+            ("?page=4", [7]),
+        ])
+
+        res = get_paginated_response(
+            self.api.session, "/tests/", concurrency=2)
+        self.assertEqual([r["id"] for r in res], [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(len(responses.calls), 4)
+
+    @responses.activate
+    def test_get_paginated_response_concurrency_limit_offset(self):
+        """
+        If the first page has a count and uses limit and offset, the
+        remaining pages should be fetched concurrently and returned in order.
+        """
+        self.add_counted_pages([
+            ("?limit=2", [1, 2]),
+            ("?limit=2&offset=2", [3, 4]),
+            ("?limit=2&offset=4", [5]),
+        ])
+
+        res = get_paginated_response(
+            self.api.session, "/tests/", params={"limit": 2}, concurrency=2)
+        self.assertEqual([r["id"] for r in res], [1, 2, 3, 4, 5])
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_get_paginated_response_concurrency_unordered(self):
+        """
+        If the pages don't need to be ordered, all the items should still be
+        returned.
+        """
+        self.add_counted_pages([
+            ("", [1, 2]),
+            ("?page=2", [3, 4]),
+            ("?page=3", [5]),
+        ])
+
+        res = get_paginated_response(
+            self.api.session, "/tests/", concurrency=2, ordered=False)
+        self.assertEqual(sorted(r["id"] for r in res), [1, 2, 3, 4, 5])
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_get_paginated_response_concurrency_cursor(self):
+        """
+        If the pages can't be addressed directly, the next links should be
+        followed instead.
+        """
+        self.add_pages(3)
+
+        res = get_paginated_response(
+            self.api.session, "/tests/", concurrency=2)
+        self.assertEqual([r["id"] for r in res], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(len(responses.calls), 3)
+
+    def test_iter_json_results(self):
+        """
+        The items should be parsed however the body is split into chunks,
+        and the rest of the fields added to the page.
+        """
+        body = (u'{"count": 12345, "results": [{"id": 1, "name": "\u00e9"}, '
+                u'7, [], {"id": 1234567}], "next": "http://x/?cursor=1"}')
+        body = body.encode('utf-8')
+        for size in [1, 2, 5, len(body)]:
+            chunks = [body[i:i + size] for i in range(0, len(body), size)]
+            page = {}
+            results = list(iter_json_results(chunks, page))
+            self.assertEqual(results, [
+                {"id": 1, "name": u"\u00e9"}, 7, [], {"id": 1234567}])
+            self.assertEqual(page, {
+                "count": 12345, "next": "http://x/?cursor=1"})
+
+    def test_iter_json_results_empty(self):
+        page = {}
+        self.assertEqual(list(iter_json_results([b'{}'], page)), [])
+        self.assertEqual(
+            list(iter_json_results([b'{"results": [], "next": null}'], page)),
+            [])
+        self.assertEqual(page, {"next": None})
+
+    def test_iter_json_results_incremental(self):
+        """
+        Each item should be returned as soon as its chunk has been read.
+        """
+        read = []
+
+        def chunks():
+            for chunk in [b'{"results": [{"id": 1},', b' {"id": 2}]}']:
+                read.append(chunk)
+                yield chunk
+
+        results = iter_json_results(chunks(), {})
+        self.assertEqual(next(results), {"id": 1})
+        self.assertEqual(len(read), 1)
+
+    def test_iter_json_results_invalid(self):
+        self.assertRaises(
+            ValueError, list, iter_json_results([b'{"results": [1, 2'], {}))
+        self.assertRaises(
+            ValueError, list, iter_json_results([b'[1, 2]'], {}))
+
+    @responses.activate
+    def test_get_paginated_response_stream(self):
+        """
+        Streaming should return the content for all the pages in order.
+        """
+        self.add_pages(3)
+
+        res = get_paginated_response(self.api.session, "/tests/", stream=True)
+        self.assertEqual([r["id"] for r in res], [1, 2, 3, 4, 5, 6])
+        self.assertEqual(len(responses.calls), 3)
+
+    def test_get_paginated_response_stream_concurrency(self):
+        res = get_paginated_response(
+            self.api.session, "/tests/", stream=True, concurrency=2)
+        self.assertRaises(ValueError, list, res)
+
+    def test_get_paginated_response_model_and_fields(self):
+        for kwargs in [{"fields": ["id"]}, {"fields_param": "only"}]:
+            res = get_paginated_response(
+                self.api.session, "/tests/", model=Outbound, **kwargs)
+            self.assertRaises(ValueError, list, res)
+
+    @responses.activate
+    def test_get_paginated_response_fields(self):
+        """
+        Each item should be trimmed to a record of the fields asked for.
+        """
+        responses.add(
+            responses.GET,
+            "http://test.example.org/api/v1/tests/?only=id%2Cto_addr",
+            json={"next": None, "previous": None, "results": [
+                {"id": 1, "to_addr": "+27001", "content": "Hello"},
+                {"id": 2, "content": "Goodbye"},
+            ]},
+            status=200, match_querystring=True)
+
+        res = list(get_paginated_response(
+            self.api.session, "/tests/", fields=["id", "to_addr"],
+            fields_param="only"))
+        self.assertEqual(res, [(1, "+27001"), (2, None)])
+        self.assertEqual(res[0].to_addr, "+27001")
+        self.assertIs(type(res[0]), type(res[1]))
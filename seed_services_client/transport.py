@@ -0,0 +1,42 @@
+import threading
+
+
+class TransportRegistry(object):
+    """
+    Hands out sessions that are shared between clients, so that all the
+    clients created for the same service reuse the same connection pools
+    and keep-alive connections.
+
+    Sessions are created by the factory given the first time that a key is
+    asked for, and returned as is for that key after that.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get_sessions(self, key, factory):
+        """
+        Returns the sessions stored for ``key``, calling ``factory`` to
+        create them if there aren't any yet.
+        """
+        with self._lock:
+            if key not in self._sessions:
+                self._sessions[key] = factory()
+            return self._sessions[key]
+
+    def clear(self):
+        """
+        Closes and forgets all of the sessions in the registry.
+        """
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for shared in sessions.values():
+            for session in shared:
+                session.close()
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+default_registry = TransportRegistry()
@@ -1,16 +1,584 @@
+import codecs
+import collections
+import json
+import math
+import re
+import threading
+import time
 
-def get_paginated_response(session, url, params={}, **kwargs):
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+try:
+    import queue
+    from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+except ImportError:  # Python 2
+    import Queue as queue
+    from urllib import urlencode
+    from urlparse import parse_qsl, urlsplit, urlunsplit
+
+
+def get_pages(session, url, params={}, **kwargs):
     """
-    Get the results of all pages of a response. Returns an iterator
-    that returns each of the items.
+    Get each page of a response in turn. Returns an iterator that returns
+    each of the decoded pages.
     """
     while url is not None:
+        # We remove part of the url that the session already has
+        url = url.replace(session.url, '')
         data = session.get(url, params=params, **kwargs)
-        for result in data.get('results', []):
-            yield result
+        yield data
         url = data.get('next', None)
-        if url is not None:
-            # We remove part of the url that the session already has
-            url = url.replace(session.url, '')
         # params are included in the next url
         params = {}
+
+
+class JSONStream(object):
+    """
+    Reads JSON values one at a time from an iterator over chunks of UTF-8
+    encoded bytes, only keeping the part of the document that hasn't been
+    read yet in memory.
+    """
+
+    decoder = json.JSONDecoder()
+    whitespace = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = u''
+        self.pos = 0
+        self.eof = False
+
+    def read(self):
+        """
+        Adds the next chunk to the buffer. Returns False once there are no
+        chunks left.
+        """
+        if self.eof:
+            return False
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self.text_decoder.decode(b'', final=True)
+        else:
+            text = self.text_decoder.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skips whitespace, and returns the next character without reading
+        it, or an empty string at the end of the document.
+        """
+        while True:
+            self.pos = self.whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read():
+                return u''
+
+    def expect(self, chars):
+        """
+        Reads the next character, which must be one of ``chars``.
+        """
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError('Expected one of %r but found %r' % (
+                chars, self.buffer[self.pos:self.pos + 20]))
+        self.pos += 1
+        return char
+
+    def value(self):
+        """
+        Reads and decodes the next complete JSON value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if not self.read():
+                    raise
+                continue
+            # A value at the end of the buffer could be a number that
+            # carries on in the next chunk
+            if end == len(self.buffer) and self.read():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_results(chunks, page):
+    """
+    Parses a page of a response from an iterator over chunks of its body.
+    Returns an iterator that returns each item of the ``results`` of the
+    page as soon as it has been read, and that adds the rest of the fields
+    of the page, like ``next``, to the ``page`` dictionary.
+    """
+    stream = JSONStream(chunks)
+    stream.expect(u'{')
+    if stream.peek() == u'}':
+        return
+    while True:
+        key = stream.value()
+        stream.expect(u':')
+        if key == u'results' and stream.peek() == u'[':
+            stream.expect(u'[')
+            if stream.peek() == u']':
+                stream.expect(u']')
+            else:
+                while True:
+                    yield stream.value()
+                    if stream.expect(u',]') == u']':
+                        break
+        else:
+            page[key] = stream.value()
+        if stream.expect(u',}') == u'}':
+            return
+
+
+def get_streamed_results(session, url, params={}, chunk_size=65536,
+                         **kwargs):
+    """
+    Get the results of all pages of a response, parsing each item of a page
+    as its body is downloaded instead of decoding the whole page at once.
+    Returns an iterator that returns each of the items.
+    """
+    while url is not None:
+        # We remove part of the url that the session already has
+        url = url.replace(session.url, '')
+        response = session.get(url, params=params, stream=True, **kwargs)
+        page = {}
+        try:
+            for result in iter_json_results(
+                    response.iter_content(chunk_size), page):
+                yield result
+        finally:
+            response.close()
+        url = page.get('next', None)
+        # params are included in the next url
+        params = {}
+
+
+def resolve_endpoint_timeouts(api_url, endpoint_timeouts):
+    """
+    Resolves a dictionary of timeouts keyed by path prefix, or by an
+    ``(HTTP method, path prefix)`` tuple, with the paths relative to
+    ``api_url``. Returns a tuple of ``(method, path prefix, timeout)``
+    tuples, with the most specific endpoints first.
+    """
+    base_path = urlsplit(api_url).path.rstrip('/')
+    resolved = []
+    for key, timeout in endpoint_timeouts.items():
+        method, prefix = key if isinstance(key, tuple) else (None, key)
+        if method is not None:
+            method = method.upper()
+        if isinstance(timeout, list):
+            timeout = tuple(timeout)
+        resolved.append(
+            (method, '%s/%s' % (base_path, prefix.lstrip('/')), timeout))
+    resolved.sort(
+        key=lambda endpoint: (len(endpoint[1]), endpoint[0] is not None),
+        reverse=True)
+    return tuple(resolved)
+
+
+def get_endpoint_timeout(endpoint_timeouts, method, url, default=None):
+    """
+    Returns the timeout of the first of the resolved ``endpoint_timeouts``
+    that matches the request, or ``default`` if none of them match.
+    """
+    path = urlsplit(url).path
+    for endpoint_method, prefix, timeout in endpoint_timeouts:
+        if endpoint_method in (None, method) and path.startswith(prefix):
+            return timeout
+    return default
+
+
+def get_page_urls(data):
+    """
+    Build the urls of all the pages that follow the first page of a
+    response, using the total ``count`` and ``next`` link of that first
+    page. Returns None if the response doesn't have a count, or uses a
+    pagination style (such as cursor pagination) that doesn't allow pages
+    to be addressed directly.
+    """
+    count = data.get('count', None)
+    url = data.get('next', None)
+    if count is None or url is None or not data.get('results'):
+        return None
+
+    scheme, netloc, path, query, fragment = urlsplit(url)
+    query = parse_qsl(query, keep_blank_values=True)
+    keys = [key for key, _ in query]
+
+    page_size = len(data.get('results', []))
+
+    if 'page' in keys:
+        key = 'page'
+        start = int(dict(query)['page'])
+        stop = int(math.ceil(float(count) / page_size)) + 1
+        step = 1
+    elif 'offset' in keys:
+        key = 'offset'
+        start = int(dict(query)['offset'])
+        stop = count
+        step = int(dict(query).get('limit', page_size)) or page_size
+    else:
+        return None
+
+    urls = []
+    for value in range(start, stop, step):
+        page_query = [(k, value if k == key else v) for k, v in query]
+        urls.append(urlunsplit(
+            (scheme, netloc, path, urlencode(page_query), fragment)))
+    return urls
+
+
+def unique(iterable):
+    """
+    Returns an iterator over the items of ``iterable``, skipping any item
+    that has already been returned.
+    """
+    seen = set()
+    for item in iterable:
+        if item not in seen:
+            seen.add(item)
+            yield item
+
+
+def concurrent_map(func, iterable, concurrency=10, ordered=True):
+    """
+    Call ``func`` with each item of ``iterable`` on a pool of
+    ``concurrency`` threads. Returns an iterator that returns an
+    ``(item, future)`` tuple for each call once it has completed, in the
+    order of ``iterable`` if ``ordered`` is set, otherwise in the order
+    that the calls complete.
+
+    Items are taken from ``iterable`` lazily, so that only a bounded number
+    of calls are pending at any time. Closing the returned iterator cancels
+    the calls that haven't started yet.
+    """
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    items = iter(iterable)
+    pending = collections.OrderedDict()
+    window = concurrency * 2
+
+    def submit():
+        for item in items:
+            pending[executor.submit(func, item)] = item
+            if len(pending) >= window:
+                return
+
+    try:
+        submit()
+        while pending:
+            if ordered:
+                future = next(iter(pending))
+                wait([future])
+                done = [future]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future
+            submit()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def concurrent_chain(func, iterable, concurrency=10, buffer_size=100):
+    """
+    Call ``func`` with each item of ``iterable`` on a pool of
+    ``concurrency`` threads, where ``func`` returns an iterator. Returns an
+    iterator that returns the items of all of those iterators as they
+    arrive, in no particular order.
+
+    Up to ``buffer_size`` items are buffered ahead of the caller, so that
+    memory stays bounded however many items there are. An exception raised
+    by any of the calls is raised by the returned iterator, and closing the
+    returned iterator stops the threads.
+    """
+    items = iter(iterable)
+    items_lock = threading.Lock()
+    buffered = queue.Queue(maxsize=buffer_size)
+    stopped = threading.Event()
+    done = object()
+
+    def put(message):
+        while not stopped.is_set():
+            try:
+                buffered.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def worker():
+        try:
+            while not stopped.is_set():
+                with items_lock:
+                    item = next(items, done)
+                if item is done:
+                    break
+                for result in func(item):
+                    if not put((True, result)):
+                        return
+        except Exception as e:
+            put((False, e))
+        else:
+            put((False, None))
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    try:
+        running = len(threads)
+        while running:
+            ok, result = buffered.get()
+            if ok:
+                yield result
+            elif result is None:
+                running -= 1
+            else:
+                raise result
+    finally:
+        stopped.set()
+
+
+def throttle(func, rate, clock=time.time, sleep=time.sleep):
+    """
+    Wraps ``func`` so that it is called at most ``rate`` times a second,
+    across all of the threads calling it. Calls over the rate wait for
+    their turn.
+    """
+    interval = 1.0 / rate
+    lock = threading.Lock()
+    next_call = [None]
+
+    def throttled(*args, **kwargs):
+        with lock:
+            now = clock()
+            start = max(now, next_call[0] or now)
+            next_call[0] = start + interval
+        if start > now:
+            sleep(start - now)
+        return func(*args, **kwargs)
+
+    return throttled
+
+
+def get_fanned_out_pages(session, url, params={}, concurrency=10,
+                         ordered=True, **kwargs):
+    """
+    Get each page of a response, fetching all the pages after the first
+    one concurrently. Returns an iterator that returns each of the decoded
+    pages.
+
+    Falls back to following the ``next`` link of each page in turn if the
+    urls of the pages can't be built from the first page.
+    """
+    data = session.get(url, params=params, **kwargs)
+    yield data
+
+    urls = get_page_urls(data)
+    if urls is None:
+        pages = get_pages(session, data.get('next', None), **kwargs)
+    else:
+        pages = (future.result() for _, future in concurrent_map(
+            lambda page_url: session.get(
+                page_url.replace(session.url, ''), **kwargs),
+            urls, concurrency=concurrency, ordered=ordered))
+
+    try:
+        for data in pages:
+            yield data
+    finally:
+        pages.close()
+
+
+def prefetch(iterator, size):
+    """
+    Consume ``iterator`` on a background thread, keeping up to ``size`` of
+    its items buffered ahead of the caller. Returns an iterator that returns
+    the items in their original order.
+
+    Closing the returned iterator stops the background thread. A request
+    that is already in flight when that happens is allowed to finish, but
+    its result is discarded and no further requests are made.
+    """
+    buffered = queue.Queue(maxsize=size)
+    stopped = threading.Event()
+
+    def put(message):
+        while not stopped.is_set():
+            try:
+                buffered.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def worker():
+        try:
+            for item in iterator:
+                if not put((True, item)):
+                    return
+        except Exception as e:
+            put((False, e))
+        else:
+            put((False, None))
+
+    thread = threading.Thread(target=worker)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        while True:
+            ok, item = buffered.get()
+            if ok:
+                yield item
+            elif item is None:
+                return
+            else:
+                raise item
+    finally:
+        stopped.set()
+
+
+_record_types = {}
+
+
+def get_record_type(fields):
+    """
+    Returns a namedtuple class with ``fields``, which is only created once
+    for each set of fields. Fields that aren't valid identifiers are
+    renamed to their position, like ``_0``.
+    """
+    fields = tuple(fields)
+    record_type = _record_types.get(fields)
+    if record_type is None:
+        record_type = collections.namedtuple('Record', fields, rename=True)
+        _record_types[fields] = record_type
+    return record_type
+
+
+def get_field(item, name):
+    """
+    Returns the field ``name`` of an item of a paginated response, which can
+    be a dictionary, a :class:`seed_services_client.models.Model` or a
+    record returned when asking for ``fields``. Returns None if the item
+    doesn't have the field.
+    """
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
+
+
+def get_paginated_response(session, url, params={}, prefetch_pages=0,
+                           concurrency=0, ordered=True, stream=False,
+                           fields=None, fields_param=None, model=None,
+                           **kwargs):
+    """
+    Get the results of all pages of a response. Returns an iterator
+    that returns each of the items.
+
+    :param int prefetch_pages:
+        (optional) The number of pages to fetch ahead on a background thread
+        while the current page is being consumed. Defaults to 0, which
+        fetches each page only once the previous one has been consumed.
+
+    :param int concurrency:
+        (optional) The number of pages to fetch concurrently. If this is
+        greater than 0 and the first page has a total ``count``, the urls of
+        the remaining pages are built up front and fetched concurrently.
+        Defaults to 0, which follows the ``next`` link of each page in turn.
+
+    :param bool ordered:
+        (optional) Whether pages fetched concurrently should be returned in
+        order. Defaults to True, set to False to return the items of each
+        page as soon as it has been fetched.
+
+    :param bool stream:
+        (optional) Whether to parse the items of each page as the page is
+        downloaded, so that the first item is returned before the whole page
+        has arrived and only one item of a page is held in memory at a time.
+        Can't be combined with ``prefetch_pages`` or ``concurrency``.
+        Defaults to False.
+
+    :param list fields:
+        (optional) The fields to keep from each item. If this is set, each
+        item is returned as a namedtuple of these fields, with None for any
+        field an item doesn't have, instead of as a dictionary.
+
+    :param str fields_param:
+        (optional) The query parameter to ask the server for only
+        ``fields`` with, as a comma separated list, for endpoints that
+        support one. Defaults to None, which only trims items once they've
+        been decoded.
+
+    :param model:
+        (optional) A :class:`seed_services_client.models.Model` subclass to
+        return each item as, instead of as a dictionary. Can't be combined
+        with ``fields``.
+    """
+    if model is not None and (fields, fields_param) != (None, None):
+        raise ValueError('model cannot be combined with fields')
+
+    if model is not None:
+        results = get_paginated_response(
+            session, url, params=params, prefetch_pages=prefetch_pages,
+            concurrency=concurrency, ordered=ordered, stream=stream,
+            **kwargs)
+        try:
+            for result in results:
+                yield model.from_dict(result)
+        finally:
+            results.close()
+        return
+
+    if fields is not None:
+        fields = tuple(fields)
+        if fields_param is not None:
+            params = dict(params or {})
+            params[fields_param] = ','.join(fields)
+        record_type = get_record_type(fields)
+        results = get_paginated_response(
+            session, url, params=params, prefetch_pages=prefetch_pages,
+            concurrency=concurrency, ordered=ordered, stream=stream,
+            **kwargs)
+        try:
+            for result in results:
+                yield record_type(*[result.get(field) for field in fields])
+        finally:
+            results.close()
+        return
+
+    if stream:
+        if prefetch_pages > 0 or concurrency > 0:
+            raise ValueError(
+                'stream cannot be combined with prefetch_pages or '
+                'concurrency')
+        for result in get_streamed_results(
+                session, url, params=params, **kwargs):
+            yield result
+        return
+
+    if concurrency > 0:
+        pages = get_fanned_out_pages(
+            session, url, params=params, concurrency=concurrency,
+            ordered=ordered, **kwargs)
+    else:
+        pages = get_pages(session, url, params=params, **kwargs)
+    if prefetch_pages > 0:
+        pages = prefetch(pages, prefetch_pages)
+    try:
+        for data in pages:
+            for result in data.get('results', []):
+                yield result
+    finally:
+        pages.close()
@@ -30,11 +30,16 @@ setup(
     url='https://github.com/praekeltfoundation/seed-services-client',
     packages=[
         'seed_services_client',
+        'seed_services_client.aio',
     ],
     package_dir={'seed_services_client':
                  'seed_services_client'},
     include_package_data=True,
     install_requires=requirements,
+    extras_require={
+        'aio': ['aiohttp>=3.0.0'],
+        'columnar': ['numpy', 'pyarrow', 'pandas'],
+    },
     license="BSD",
     zip_safe=False,
     keywords='seed-services-client',
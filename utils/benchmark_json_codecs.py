@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Compares how quickly each of the installed JSON codecs decodes and encodes
+pages like the ones returned by the message sender's ``/outbound/``
+endpoint.
+
+Usage: python utils/benchmark_json_codecs.py [page size] [repeats]
+"""
+import sys
+import timeit
+import uuid
+
+from seed_services_client.json_codec import CODECS, StdlibCodec
+
+
+def outbound(i):
+    return {
+        "id": str(uuid.uuid4()),
+        "to_addr": "+2782%07d" % i,
+        "to_identity": str(uuid.uuid4()),
+        "content": "Message %d of your pregnancy messages. Remember to go "
+                   "to your clinic visits." % i,
+        "delivered": i % 3 != 0,
+        "attempts": i % 4,
+        "metadata": {"voice_speech_url": None, "default_language": "eng_ZA"},
+        "created_at": "2017-01-27T10:00:06.354178Z",
+        "updated_at": "2017-01-27T10:00:06.354178Z",
+        "channel": "SMS",
+        "resend": False,
+    }
+
+
+def main(page_size=1000, repeats=50):
+    page = {
+        "next": "http://ms.example.org/api/v1/outbound/?cursor=1",
+        "previous": None,
+        "results": [outbound(i) for i in range(page_size)],
+    }
+    encoded = StdlibCodec().dumps(page).encode('utf-8')
+    print("Page of %d outbounds, %d bytes, %d repeats" % (
+        page_size, len(encoded), repeats))
+
+    timings = {}
+    for name in sorted(CODECS):
+        try:
+            codec = CODECS[name]()
+        except ImportError:
+            print("%-8s not installed" % name)
+            continue
+        timings[name] = (
+            timeit.timeit(lambda: codec.loads(encoded), number=repeats),
+            timeit.timeit(lambda: codec.dumps(page), number=repeats),
+        )
+
+    base_loads, base_dumps = timings['json']
+    for name, (loads, dumps) in sorted(timings.items()):
+        print("%-8s loads %7.2f ms/page (%4.1fx)  "
+              "dumps %7.2f ms/page (%4.1fx)" % (
+                  name, loads * 1000 / repeats, base_loads / loads,
+                  dumps * 1000 / repeats, base_dumps / dumps))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])